@@ -14,6 +14,8 @@ def pyinstaller():
         sys.executable, "-m", "PyInstaller", "-n", "super32emu-app", "--windowed",
         "-i", "./super32emu/super32emu/resources/logo_color.ico",
         "--add-data", f"./super32emu/super32emu/resources{_}super32emu/resources",
+        "--add-data",
+        f"./super32assembler/super32assembler/generator/template.vhdl{_}super32assembler/generator",
         "--add-data", f"./examples{_}examples",
         "./super32emu/runner.py"
         ])
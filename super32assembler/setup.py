@@ -24,7 +24,6 @@ setuptools.setup(
         'console_scripts': ['super32assembler=super32assembler.__main__:main'],
     },
     install_requires=[
-        'bitstring',
         'python-dotenv',
         'docopt==0.6.2',
         'super32utils'
@@ -2,50 +2,97 @@
 Usage:
     super32assembler parse [--output=path]
                            [--architecture=single | --architecture=multi]
-                           [--generator=lines | --generator=stream] <input-file>
+                           [--generator=format] [--endianness=order] [--optimize]
+                           [--schedule] [--latencies=path]
+                           [--jobs=N] [--cache-dir=path | --no-cache]
+                           [--include=dir]... <input-file>...
+    super32assembler object [--output=path] [--jobs=N] [--cache-dir=path | --no-cache]
+                            [--include=dir]... <input-file>...
+    super32assembler link [--output=path]
+                          [--generator=format] [--endianness=order] <object-file>...
+    super32assembler disassemble [--endianness=order] <machine-code-file>...
+    super32assembler analyze [--include=dir]... <input-file>...
     super32assembler (-h | --help)
 
+Commands:
+    parse                   assemble programs into machine code
+    object                  assemble modules into relocatable object files (.obj)
+    link                    link object files into machine code
+    disassemble             print the instructions of machine code files
+    analyze                 print the basic blocks and loop nests of programs
+
 
 Options:
     -h --help               show this screen and exit
-    --output=<path>         specify the generated output file
+    --output=<path>         specify the generated output file (single input file only)
     --architecture=<type>   specify processor architecture [default: single]
-    --generator=<type>      specify output file format [default: lines]
+    --generator=<format>    specify output file format: lines, stream, bin, ihex,
+                            srec, vhdl, coe or mif [default: lines]
+    --endianness=<order>    byte order of bin, ihex and srec: big or little [default: big]
+    --optimize              remove branch chains, no-op instructions and repeated loads
+    --schedule              reorder instructions to hide pipeline stalls
+    --latencies=<path>      JSON file with the result latency of instructions
+                            or instruction groups, used by --schedule
+    --jobs=<N>              number of files assembled in parallel [default: 1]
+    --cache-dir=<path>      directory of the assembly cache
+                            (default: $SUPER32_CACHE_DIR or ~/.cache/super32assembler)
+    --no-cache              always assemble, neither read nor write the cache
+    --include=<dir>         additional directory searched for INCLUDE files
 """
 
+import os
+import sys
+from os.path import dirname
 from docopt import docopt
 from super32utils.inout.fileio import FileIO
 from super32utils.settings.settings import Settings
 from .assembler.assembler import Assembler
 from .assembler.architecture import Architectures
-from .generator.generator import Generator
+from .assembler.instructionset import INSTRUCTIONSET, InstructionSet
+from .cache.assemblycache import AssemblyCache
+from .generator.generator import EXTENSIONS, Generator, format_of
+from .preprocessor.includes import IncludeResolver
 from .preprocessor.preprocessor import Preprocessor
 
+# the assembler is started for every file of a build. modules only used by
+# options and other commands are imported where they are needed
+
 
 def single(ARGS):
     """ main entry point for python Super32 assembler
     (with single storage)
     """
 
-    Settings.load()
-    cfg = FileIO.read_json('instructionset.json')
-    input_file = FileIO.read_code(ARGS['<input-file>'])
+    generator = generator_of(ARGS)
+    cache, key = cache_lookup(ARGS, Architectures.SINGLE)
+    images = cache.get(key) if cache else None
 
-    preprocessor = Preprocessor()
-    assembler = Assembler(Architectures.SINGLE)
-    generator = Generator(ARGS['--generator'])
+    if images is None:
+        cfg = InstructionSet.load(INSTRUCTIONSET)
+        input_file = FileIO.read_code(ARGS['<input-file>'])
 
-    code_address, code, zeros_constants, symboltable, _ = preprocessor.parse(
-        input_file=input_file
-    )
-    machine_code = assembler.parse(
-        code_address=code_address,
-        code=code,
-        zeros_constants=zeros_constants,
-        commands=cfg['commands'],
-        registers=cfg['registers'],
-        symboltable=symboltable
-    )
+        preprocessor = Preprocessor(include_paths(ARGS), cache)
+        assembler = Assembler(Architectures.SINGLE)
+
+        code_address, code, zeros_constants, symboltable, _ = preprocessor.parse(
+            input_file=input_file,
+            directory=source_directory(ARGS)
+        )
+        code, symboltable = optimize(ARGS, cfg, code_address, code, symboltable)
+        machine_code = assembler.parse(
+            code_address=code_address,
+            code=code,
+            zeros_constants=zeros_constants,
+            commands=cfg.commands,
+            registers=cfg.registers,
+            symboltable=symboltable
+        )
+
+        if cache:
+            cache.put(key, [machine_code])
+    else:
+        machine_code, = images
+        report_cached(ARGS)
 
     generator.write(ARGS['--output'], machine_code)
 
@@ -55,57 +102,363 @@ def multi(ARGS):
     (with separate storages for instructions and data)
     """
 
-    Settings.load()
-    cfg = FileIO.read_json('instructionset.json')
-    input_file = FileIO.read_code(ARGS['<input-file>'])
+    generator = generator_of(ARGS)
+    cache, key = cache_lookup(ARGS, Architectures.MULTI)
+    images = cache.get(key) if cache else None
 
-    preprocessor = Preprocessor()
-    assembler = Assembler(Architectures.MULTI)
-    generator = Generator(ARGS['--generator'])
+    if images is None:
+        cfg = InstructionSet.load(INSTRUCTIONSET)
+        input_file = FileIO.read_code(ARGS['<input-file>'])
 
-    code_address, code, zeros_constants, symboltable = preprocessor.parse(
-        input_file=input_file
-    )
+        preprocessor = Preprocessor(include_paths(ARGS), cache)
+        assembler = Assembler(Architectures.MULTI)
 
-    machine_code_instructions = assembler.parse(
-        code_address=code_address,
-        code=code,
-        zeros_constants=zeros_constants,
-        commands=cfg['commands'],
-        registers=cfg['registers'],
-        symboltable=symboltable
-    )
+        code_address, code, zeros_constants, symboltable, _ = preprocessor.parse(
+            input_file=input_file,
+            directory=source_directory(ARGS)
+        )
+        code, symboltable = optimize(ARGS, cfg, code_address, code, symboltable)
+
+        machine_code_instructions = assembler.parse(
+            code_address=code_address,
+            code=code,
+            zeros_constants=zeros_constants,
+            commands=cfg.commands,
+            registers=cfg.registers,
+            symboltable=symboltable
+        )
+
+        if cache:
+            cache.put(key, [machine_code_instructions, zeros_constants])
+    else:
+        machine_code_instructions, zeros_constants = images
+        report_cached(ARGS)
 
     generator.write(ARGS['--output'][0], machine_code_instructions)
     generator.write(ARGS['--output'][1], zeros_constants)
 
 
-def main():
-    ARGS = docopt(__doc__)
+def optimize(ARGS, cfg, code_address, code, symboltable):
+    """ runs the peephole optimizer if --optimize is given and the
+    scheduler if --schedule is given. prints what they saved
+    """
+
+    if ARGS.get('--optimize'):
+        from .optimizer.peephole import PeepholeOptimizer
+        optimizer = PeepholeOptimizer(cfg.commands)
+        code, symboltable, _ = optimizer.optimize(code_address, code, symboltable)
+        print("optimized {path}: {removed} instructions removed, {branches} branches shortened, "
+              "~{cycles} cycles saved".format(
+                  path=ARGS['<input-file>'], removed=optimizer.removed_instructions,
+                  branches=optimizer.rewritten_branches, cycles=optimizer.saved_cycles))
+
+    if ARGS.get('--schedule'):
+        from .optimizer.scheduler import InstructionScheduler
+        latencies = FileIO.read_json(ARGS['--latencies']) if ARGS.get('--latencies') else None
+        scheduler = InstructionScheduler(cfg.commands, latencies)
+        code, symboltable, _ = scheduler.schedule(code_address, code, symboltable)
+        print("scheduled {path}: {before} stalls before, {after} stalls after".format(
+            path=ARGS['<input-file>'], before=scheduler.stalls_before,
+            after=scheduler.stalls_after))
+
+    return code, symboltable
+
+
+def report_cached(ARGS):
+    """ says that the optimized or scheduled code was taken from the cache,
+    the optimizer and the scheduler did not run and saved nothing this time
+    """
+
+    for option, name in (('--optimize', 'optimized'), ('--schedule', 'scheduled')):
+        if ARGS.get(option):
+            print("{name} {path}: unchanged, taken from the cache".format(
+                name=name, path=ARGS['<input-file>']))
+
+
+def relocatable(ARGS):
+    """ assembles a module into a relocatable object file """
+
+    from .linker.objectfile import ObjectModule
+
+    cfg = InstructionSet.load(INSTRUCTIONSET)
+    input_file = FileIO.read_code(ARGS['<input-file>'])
+    cache = None if ARGS.get('--no-cache') else AssemblyCache(
+        ARGS.get('--cache-dir') or AssemblyCache.default_directory())
+
+    module = ObjectModule.assemble(
+        input_file, cfg.commands, cfg.registers,
+        preprocessor=Preprocessor(include_paths(ARGS), cache),
+        directory=source_directory(ARGS)
+    )
+    module.save(ARGS['--output'])
+
+
+def link(ARGS):
+    """ links object files into one machine code file """
+
+    from .linker.linker import Linker
+    from .linker.objectfile import ObjectModule
+
+    for path in ARGS['<object-file>']:
+        if not os.path.isfile(path):
+            print("FAILED  {path}: file not found".format(path=path))
+            return 1
 
     if ARGS['--output'] is None:
-        ARGS['--output'] = ARGS['<input-file>'].rsplit('.', 1)[0] + '.o'
-
-    # choose super32 architecture
-    if ARGS['--architecture'] == 'multi':
-        OUTPUT = ARGS['--output'].rsplit('.')
-        NAME = OUTPUT[0]
-        ENDING = OUTPUT[-1]
-        ARGS['--output'] = [
-            "{filename}_{extension}.{fileending}".format(
-                filename=NAME,
-                extension='instructions',
-                fileending=ENDING
-            ),
-            "{filename}_{extension}.{fileending}".format(
-                filename=NAME,
-                extension='memory',
-                fileending=ENDING
+        ARGS['--output'] = ARGS['<object-file>'][0].rsplit('.', 1)[0] \
+            + EXTENSIONS.get(ARGS['--generator'], '.o')
+
+    cfg = InstructionSet.load(INSTRUCTIONSET)
+    linker = Linker(cfg.commands, cfg.registers)
+    generator = generator_of(ARGS)
+
+    try:
+        modules = [ObjectModule.load(path) for path in ARGS['<object-file>']]
+        machine_code, _ = linker.link(modules)
+    except Exception as e:  # pylint: disable=broad-except
+        print("FAILED  {path}: {error}".format(path=ARGS['--output'], error=e))
+        return 1
+
+    generator.write(ARGS['--output'], machine_code)
+    print("linked  {path}".format(path=ARGS['--output']))
+    return 0
+
+
+def disassemble(ARGS):
+    """ prints address, word and instruction of every used word """
+
+    from .disassembler.disassembler import Disassembler
+    from .generator.loader import Loader
+
+    cfg = InstructionSet.load(INSTRUCTIONSET)
+    disassembler = Disassembler(cfg.commands, cfg.registers)
+
+    for path in ARGS['<machine-code-file>']:
+        try:
+            machine_code = Loader(format_of(path), ARGS['--endianness']).read(path)
+        except Exception as e:  # pylint: disable=broad-except
+            print("FAILED  {path}: {error}".format(path=path, error=str(e) or type(e).__name__))
+            return 1
+
+        print("{path}:".format(path=path))
+        for address, text in disassembler.disassemble_image(machine_code):
+            print("{address:08X}  {word:08X}  {text}".format(
+                address=address, word=machine_code[address // 4], text=text))
+    return 0
+
+
+def analyze(ARGS):
+    """ prints the control flow report of every input file """
+
+    from .analysis.controlflow import ControlFlowGraph
+    from .symbols.symbolindex import SymbolIndex
+
+    cfg = InstructionSet.load(INSTRUCTIONSET)
+    failed = 0
+
+    for path in input_files(ARGS['<input-file>']):
+        file_args = dict(ARGS, **{'<input-file>': path})
+        try:
+            code_address, code, zeros_constants, symboltable, _ = Preprocessor(
+                include_paths(file_args)).parse(
+                    input_file=FileIO.read_code(path),
+                    directory=source_directory(file_args)
+                )
+            machine_code = Assembler(Architectures.SINGLE).parse(
+                code_address=code_address,
+                code=code,
+                zeros_constants=zeros_constants,
+                commands=cfg.commands,
+                registers=cfg.registers,
+                symboltable=symboltable
             )
-        ]
-        multi(ARGS)
+        except Exception as e:  # pylint: disable=broad-except
+            failed += 1
+            print("FAILED  {path}: {error}".format(path=path, error=str(e) or type(e).__name__))
+            continue
+
+        graph = ControlFlowGraph(machine_code, cfg.commands)
+        # code and the END directive
+        code_start = code_address // 4
+        code_stop = code_start + len(code) + 1
+        report_control_flow(path, graph, SymbolIndex(symboltable), code_start, code_stop)
+
+    return 1 if failed else 0
+
+
+def report_control_flow(path, graph, symbols, code_start, code_stop):
+    """ prints blocks, the loop nest, unreachable code and self-modifying stores """
+
+    loops = graph.loops()
+    print("{path}: {blocks} blocks, {instructions} instructions, {loops} loops".format(
+        path=path, blocks=len(graph.blocks), instructions=graph.instructions(),
+        loops=len(loops)))
+
+    for loop in loops:
+        print("{indent}loop {header}: depth {depth}, {blocks} blocks, {size} instructions".format(
+            indent='  ' * loop.depth, header=symbols.format(loop.header * 4),
+            depth=loop.depth, blocks=len(loop.blocks), size=loop.size))
+
+    for start, stop in graph.unreachable(code_start, code_stop):
+        words = symbols.format(start * 4)
+        if stop - start > 1:
+            words += ' .. ' + symbols.format((stop - 1) * 4)
+        print("  unreachable: {words}".format(words=words))
+
+    for store, target in graph.self_modifying():
+        print("  self-modifying: store at {store} writes code at {target}".format(
+            store=symbols.format(store * 4), target=symbols.format(target * 4)))
+
+
+def cache_lookup(ARGS, architecture):
+    """ returns the assembly cache and the key of the input file
+    and all files it includes. the cache is None if it is disabled
+    """
+
+    if ARGS.get('--no-cache'):
+        return None, None
+
+    cache = AssemblyCache(ARGS.get('--cache-dir') or AssemblyCache.default_directory())
+    includes = IncludeResolver(include_paths(ARGS), cache).dependencies(
+        FileIO.read_code(ARGS['<input-file>']), source_directory(ARGS))
+    options = architecture.name
+    if ARGS.get('--optimize'):
+        options += ' optimized'
+    if ARGS.get('--schedule'):
+        # the latency table changes the schedule like an included file
+        options += ' scheduled'
+        includes = includes + [ARGS['--latencies']] if ARGS.get('--latencies') else includes
+    key = AssemblyCache.key(
+        FileIO.read_bytes(ARGS['<input-file>']),
+        FileIO.read_bytes(INSTRUCTIONSET),
+        options,
+        *[FileIO.read_bytes(path) for path in includes]
+    )
+    return cache, key
+
+
+def generator_of(ARGS):
+    """ generator for the output format and byte order of ARGS """
+
+    source = ARGS.get('<input-file>') or ' '.join(ARGS.get('<object-file>') or [])
+    return Generator(ARGS['--generator'], ARGS.get('--endianness') or 'big', source=source)
+
+
+def include_paths(ARGS):
+    """ directories given with --include """
+
+    return ARGS.get('--include') or []
+
+
+def source_directory(ARGS):
+    """ directory of the input file, searched first for INCLUDE files """
+
+    return dirname(os.path.abspath(ARGS['<input-file>']))
+
+
+def assemble(ARGS):
+    """ assembles the single input file of ARGS.
+    returns the input file and an error message or None on success
+    """
+
+    input_path = ARGS['<input-file>']
+    if not os.path.isfile(input_path):
+        return input_path, 'file not found'
+
+    if ARGS['--output'] is None:
+        extension = '.obj' if ARGS.get('object') else EXTENSIONS.get(ARGS['--generator'], '.o')
+        ARGS['--output'] = input_path.rsplit('.', 1)[0] + extension
+
+    try:
+        # choose super32 architecture
+        if ARGS.get('object'):
+            relocatable(ARGS)
+        elif ARGS['--architecture'] == 'multi':
+            NAME, ENDING = os.path.splitext(ARGS['--output'])
+            ARGS['--output'] = [
+                "{filename}_{extension}{fileending}".format(
+                    filename=NAME,
+                    extension='instructions',
+                    fileending=ENDING
+                ),
+                "{filename}_{extension}{fileending}".format(
+                    filename=NAME,
+                    extension='memory',
+                    fileending=ENDING
+                )
+            ]
+            multi(ARGS)
+        else:
+            single(ARGS)
+    except Exception as e:  # pylint: disable=broad-except
+        return input_path, str(e) or type(e).__name__
+
+    return input_path, None
+
+
+def input_files(patterns):
+    """ expands glob patterns, the shell might not have done it """
+
+    paths = []
+    for pattern in patterns:
+        matches = []
+        if any(character in pattern for character in '*?['):
+            import glob
+            matches = sorted(glob.glob(pattern))
+        paths.extend(matches or [pattern])
+    return paths
+
+
+def main():
+    ARGS = docopt(__doc__)
+    Settings.load()
+
+    if ARGS['link']:
+        return link(ARGS)
+    if ARGS['disassemble']:
+        return disassemble(ARGS)
+    if ARGS['analyze']:
+        return analyze(ARGS)
+
+    paths = input_files(ARGS['<input-file>'])
+    if ARGS['--output'] is not None and len(paths) > 1:
+        print("--output requires a single input file", file=sys.stderr)
+        return 2
+
+    try:
+        jobs = max(1, int(ARGS['--jobs']))
+    except ValueError:
+        print("--jobs requires a number", file=sys.stderr)
+        return 2
+
+    file_args = [dict(ARGS, **{'<input-file>': path}) for path in paths]
+
+    if jobs == 1 or len(file_args) == 1:
+        results = map(assemble, file_args)
+        failed = report(results)
     else:
-        single(ARGS)
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs, initializer=Settings.load) as executor:
+            failed = report(executor.map(assemble, file_args, chunksize=4))
+
+    print("{assembled} assembled, {failed} failed".format(
+        assembled=len(paths) - failed, failed=failed))
+
+    return 1 if failed else 0
+
+
+def report(results):
+    """ prints the status of every file. returns the number of failed files """
+
+    failed = 0
+    for input_path, error in results:
+        if error is None:
+            print("ok      {path}".format(path=input_path))
+        else:
+            failed += 1
+            print("FAILED  {path}: {error}".format(path=input_path, error=error))
+    return failed
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
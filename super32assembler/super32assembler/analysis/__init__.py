@@ -0,0 +1,18 @@
+"""
+ControlFlowGraph
+
+__init__(machine_code, commands, entry=0)
+splits the code reachable from entry into basic blocks connected by BEQ
+
+dominators()
+immediate dominator of every basic block
+
+loops()
+natural loops with their nesting, outermost first
+
+unreachable(start, stop)
+ranges of words between start and stop that are never executed
+
+self_modifying()
+stores with a constant address that write to executed words
+"""
@@ -0,0 +1,268 @@
+""" Control flow analysis module """
+
+from collections import namedtuple
+from ..assembler.instructionset import InstructionSet
+from ..assembler.assembler import IMMEDIATE_MASK, OPCODE_SHIFT, RD_SHIFT, RS_SHIFT, RT_SHIFT
+
+REGISTER_MASK = 0x1F
+
+# words start to stop (exclusive) executed in sequence,
+# successors are the word indices of the following blocks
+BasicBlock = namedtuple('BasicBlock', ['start', 'stop', 'successors'])
+
+# header and word indices of all blocks of a natural loop,
+# parent is the header of the enclosing loop or None
+Loop = namedtuple('Loop', ['header', 'blocks', 'size', 'depth', 'parent'])
+
+
+class ControlFlowGraph:
+    """ Control flow graph of an assembled image
+
+    Execution starts at entry and continues with the next word unless a
+    BEQ branches. A BEQ comparing a register with itself always branches,
+    an unconditional branch to itself (the END directive) stops the
+    program. Only words reachable from entry are decoded, so constants
+    are never taken for instructions.
+    """
+
+    def __init__(self, machine_code, commands, entry=0):
+        instructionset = InstructionSet.of(commands)
+        self.__branch = set(instructionset.branch.values())
+        self.__store = instructionset.storage['SW']
+        self.__machine_code = machine_code
+        self.entry = entry
+        self.blocks = {}  # start word index -> BasicBlock
+        self.__predecessors = {}
+        self.__idom = None
+        self.__build()
+
+    def instructions(self) -> int:
+        """ number of reachable words """
+
+        return sum(block.stop - block.start for block in self.blocks.values())
+
+    def predecessors(self, start: int) -> list:
+        return self.__predecessors.get(start, [])
+
+    def dominators(self) -> dict:
+        """ immediate dominator of every block, the entry block dominates itself """
+
+        if self.__idom is None:
+            self.__idom = self.__dominators()
+        return dict(self.__idom)
+
+    def dominates(self, a: int, b: int) -> bool:
+        """ True if every path from the entry to block b passes block a """
+
+        idom = self.dominators()
+        while True:
+            if a == b:
+                return True
+            if idom[b] == b:
+                return False
+            b = idom[b]
+
+    def loops(self) -> list:
+        """ natural loops, loops sharing a header are merged.
+        sorted by nesting, every loop follows its parent """
+
+        bodies = {}
+        for start, block in self.blocks.items():
+            for successor in block.successors:
+                if self.dominates(successor, start):  # back edge
+                    body = bodies.setdefault(successor, {successor})
+                    self.__collect(start, body)
+
+        headers = sorted(bodies, key=lambda header: (-len(bodies[header]), header))
+        parents = {}
+        for i, header in enumerate(headers):
+            # the smallest enclosing loop is the last one containing the header
+            parents[header] = next(
+                (outer for outer in reversed(headers[:i]) if header in bodies[outer]), None)
+
+        loops = []
+        depths = {}
+        for header in headers:
+            parent = parents[header]
+            depths[header] = depths[parent] + 1 if parent is not None else 1
+            loops.append(Loop(
+                header,
+                frozenset(bodies[header]),
+                sum(self.blocks[start].stop - start for start in bodies[header]),
+                depths[header],
+                parent
+            ))
+        return sorted(loops, key=lambda loop: (self.__chain(loop, parents), loop.header))
+
+    def unreachable(self, start: int, stop: int) -> list:
+        """ (start, stop) word ranges between start and stop that are never executed """
+
+        ranges = []
+        position = start
+        for block_start in sorted(self.blocks):
+            block = self.blocks[block_start]
+            if block.stop <= position or block_start >= stop:
+                continue
+            if block_start > position:
+                ranges.append((position, block_start))
+            position = block.stop
+        if position < stop:
+            ranges.append((position, stop))
+        return ranges
+
+    def self_modifying(self) -> list:
+        """ (store, target) word indices of stores writing to an executed word.
+
+        only stores addressed relative to R0 are resolved and only as long as
+        no reachable instruction writes R0 """
+
+        if self.__writes_r0():
+            return []
+
+        executed = {
+            index for block in self.blocks.values() for index in range(block.start, block.stop)
+        }
+        found = []
+        for index in sorted(executed):
+            word = self.__machine_code[index]
+            if word >> OPCODE_SHIFT != self.__store or (word >> RS_SHIFT) & REGISTER_MASK:
+                continue
+            offset = self.__signed(word & IMMEDIATE_MASK)
+            if offset % 4 == 0 and offset // 4 in executed:
+                found.append((index, offset // 4))
+        return found
+
+    def __build(self):
+        """ explores all reachable words, then splits them at branch targets """
+
+        length = len(self.__machine_code)
+        leaders = {self.entry}
+        edges = {}  # branch word index -> successors
+        visited = set()
+        pending = [self.entry]
+        while pending:
+            index = pending.pop()
+            while 0 <= index < length and index not in visited:
+                visited.add(index)
+                successors = self.__successors(index, length)
+                if successors is None:
+                    index += 1
+                    continue
+                edges[index] = successors
+                leaders.update(successors)
+                leaders.add(index + 1)
+                pending.extend(successors)
+                break
+
+        for leader in sorted(leaders & visited):
+            stop = leader + 1
+            while stop in visited and stop not in leaders and stop - 1 not in edges:
+                stop += 1
+            if stop - 1 in edges:
+                successors = edges[stop - 1]
+            elif stop in visited:
+                successors = [stop]
+            else:
+                successors = []  # runs off the image
+            self.blocks[leader] = BasicBlock(leader, stop, successors)
+
+        for start, block in self.blocks.items():
+            for successor in block.successors:
+                self.__predecessors.setdefault(successor, []).append(start)
+
+    def __successors(self, index, length):
+        """ None if index continues with the next word, successors of branches otherwise """
+
+        word = self.__machine_code[index]
+        if word >> OPCODE_SHIFT not in self.__branch:
+            return None
+
+        target = index + 1 + self.__signed(word & IMMEDIATE_MASK)
+        unconditional = (word >> RS_SHIFT) & REGISTER_MASK == (word >> RT_SHIFT) & REGISTER_MASK
+        if unconditional:
+            if target == index:  # END
+                return []
+            targets = [target]
+        else:
+            targets = [index + 1, target]
+        return [target for target in dict.fromkeys(targets) if 0 <= target < length]
+
+    def __dominators(self):
+        """ iterative algorithm of Cooper, Harvey and Kennedy on the reverse postorder """
+
+        order = []
+        seen = set()
+        stack = [(self.entry, iter(self.blocks[self.entry].successors))]
+        seen.add(self.entry)
+        while stack:
+            start, successors = stack[-1]
+            successor = next(successors, None)
+            if successor is None:
+                stack.pop()
+                order.append(start)
+            elif successor not in seen:
+                seen.add(successor)
+                stack.append((successor, iter(self.blocks[successor].successors)))
+        order.reverse()
+        position = {start: i for i, start in enumerate(order)}
+
+        idom = {self.entry: self.entry}
+        changed = True
+        while changed:
+            changed = False
+            for start in order[1:]:
+                new = None
+                for predecessor in self.predecessors(start):
+                    if predecessor not in idom:
+                        continue
+                    if new is None:
+                        new = predecessor
+                        continue
+                    a, b = predecessor, new
+                    while a != b:
+                        while position[a] > position[b]:
+                            a = idom[a]
+                        while position[b] > position[a]:
+                            b = idom[b]
+                    new = a
+                if idom.get(start) != new:
+                    idom[start] = new
+                    changed = True
+        return idom
+
+    def __collect(self, start, body):
+        """ adds all blocks reaching start without passing the loop header """
+
+        pending = [start]
+        while pending:
+            block = pending.pop()
+            if block in body:
+                continue
+            body.add(block)
+            pending.extend(self.predecessors(block))
+
+    def __writes_r0(self):
+        for block in self.blocks.values():
+            for index in range(block.start, block.stop):
+                word = self.__machine_code[index]
+                opcode = word >> OPCODE_SHIFT
+                if opcode == 0:
+                    target = (word >> RD_SHIFT) & REGISTER_MASK
+                elif opcode in self.__branch or opcode == self.__store:
+                    continue
+                else:
+                    target = (word >> RT_SHIFT) & REGISTER_MASK
+                if target == 0:
+                    return True
+        return False
+
+    @staticmethod
+    def __chain(loop, parents):
+        chain = [loop.header]
+        while parents[chain[0]] is not None:
+            chain.insert(0, parents[chain[0]])
+        return chain
+
+    @staticmethod
+    def __signed(immediate):
+        return immediate - 0x10000 if immediate & 0x8000 else immediate
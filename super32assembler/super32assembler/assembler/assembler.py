@@ -4,82 +4,134 @@ Assembler Module
 
 import logging
 import re
-from bitstring import Bits
+from collections import namedtuple
+from .architecture import Architectures
+from .instructionset import InstructionSet
+from ..image.machineimage import MachineImage
 
 REG_SIZE = 4  # bytes
 
+OPCODE_SHIFT = 26
+RS_SHIFT = 21
+RT_SHIFT = 16
+RD_SHIFT = 11
+IMMEDIATE_MASK = 0xFFFF
+
+# encoded instruction, label is an unresolved label operand
+# and relative marks pc-relative (branch) label operands
+Instruction = namedtuple('Instruction', ['word', 'label', 'relative'])
+
 
 class Assembler():
     """Assembler class"""
 
     def __init__(self, architecture):
         self.__delimiters = ['(', ')', ',']
+        self.__tokenizer = re.compile(
+            "\\s*[\\s" + re.escape("".join(self.__delimiters)) + "]\\s*")
         self.__symboltable = {}
         self.__architecture = architecture
+        self.__arithmetic = {}
+        self.__storage = {}
+        self.__branch = {}
+        self.__registers = {}
 
     def parse(self, code_address, code, zeros_constants, commands, registers, symboltable):
-        """method to parse assembler code"""
+        """method to parse assembler code
+
+        returns the machine code as MachineImage
+        """
 
         bitcode = []
-        self.__symboltable = symboltable
+        self.set_instructionset(commands, registers)
+        self.set_symboltable(symboltable)
 
         for line_nr, line in enumerate(code):
             logging.debug(str(line))
-            tokens = re.split("\\s*[\\s" + re.escape("".join(self.__delimiters)) + "]\\s*", line + " ")[:-1]
-            current_address = code_address + line_nr * REG_SIZE
-            if len(tokens[0]) == 0:
+            instruction = self.encode(line)
+            if instruction is None:
                 continue
-            if tokens[0] in commands['arithmetic']:
-                bitcode = bitcode + self.__parse_arithmetic(
-                    tokens,
-                    commands['arithmetic'],
-                    registers
-                )
-            elif tokens[0] in commands['storage']:
-                bitcode = bitcode + self.__parse_storage(
-                    current_address,
-                    tokens,
-                    commands['storage'],
-                    registers
-                )
-            elif tokens[0] in commands['branch']:
-                bitcode = bitcode + self.__parse_branch(
-                    current_address,
-                    tokens,
-                    commands['branch'],
-                    registers
-                )
-            else:
-                raise Exception(
-                    "Parsing error. Command not found: " + tokens[0])
-
-        if not self.__architecture.value:  # single
-            zeros_constants = self.__generate_start(
-                code_address,
-                zeros_constants,
-                commands,
-                registers
-            )
-            machine_code = self.__generate_machinecode(
-                code_address,
-                bitcode,
-                zeros_constants
-            )
-            machine_code = self.__generate_end(
-                machine_code,
-                commands,
-                registers
-            )
-        else:
-            machine_code = bitcode
+            current_address = code_address + line_nr * REG_SIZE
+            bitcode.append(self.resolve(instruction, current_address))
+
+        return self.generate(code_address, bitcode, zeros_constants)
+
+    def set_instructionset(self, commands, registers):
+        """uses the compiled encodings of the instruction set"""
+
+        instructionset = InstructionSet.of(commands, registers)
+        self.__arithmetic = instructionset.arithmetic
+        self.__storage = instructionset.storage
+        self.__branch = instructionset.branch
+        self.__registers = instructionset.register_numbers
+
+    def set_symboltable(self, symboltable):
+        """sets the labels used to resolve label operands"""
+
+        self.__symboltable = symboltable
+
+    def encode(self, line):
+        """encodes one line of code
+
+        Label operands are left unresolved, their immediate field stays zero.
+        Returns an Instruction or None for empty lines.
+        """
+
+        tokens = self.__tokenizer.split(line + " ")[:-1]
+        if len(tokens[0]) == 0:
+            return None
+        if tokens[0] in self.__arithmetic:
+            return self.__parse_arithmetic(tokens, self.__arithmetic, self.__registers)
+        if tokens[0] in self.__storage:
+            return self.__parse_storage(tokens, self.__storage, self.__registers)
+        if tokens[0] in self.__branch:
+            return self.__parse_branch(tokens, self.__branch, self.__registers)
+        raise Exception(
+            "Parsing error. Command not found: " + tokens[0])
+
+    def resolve(self, instruction, current_address):
+        """returns the machine code of an encoded instruction placed at current_address"""
+
+        if instruction.label is None:
+            return instruction.word
+
+        address = self.__validate_label(instruction.label)
+        if instruction.relative:
+            offset = address - current_address
+            offset -= REG_SIZE
+            address = int(offset / REG_SIZE)
+
+        return instruction.word | self.__immediate(address)
+
+    def generate(self, code_address, bitcode, zeros_constants):
+        """places the machine code of the instructions into the memory image
+
+        The single architecture shares one memory between instructions and data.
+        The multi architecture gets an instruction memory of its own, it keeps
+        the addresses of the single memory but holds no data. The data memory
+        of the multi architecture are the zeros_constants of the preprocessor.
+        """
+
+        if self.__architecture == Architectures.MULTI:
+            zeros_constants = MachineImage.zeros(int(code_address / REG_SIZE) + len(bitcode) + 1)
+
+        machine_code = self.__generate_machinecode(
+            code_address,
+            bitcode,
+            zeros_constants
+        )
+        machine_code = self.__generate_start(
+            code_address,
+            machine_code
+        )
+        machine_code = self.__generate_end(code_address, bitcode, machine_code)
 
         return machine_code
 
     def __generate_machinecode(self, code_address, bitcode, zeros_constants):
         index = int(code_address / REG_SIZE)
-        machine_code = zeros_constants[:]
-        for i, bitcode_line in enumerate(bitcode, index):
-            machine_code[i] = bitcode_line
+        machine_code = zeros_constants.copy()
+        machine_code[index:index + len(bitcode)] = bitcode
         return machine_code
 
     def __validate_label(self, label):
@@ -88,138 +140,86 @@ class Assembler():
 
         return self.__symboltable.get(label)
 
-    def __validate_code_length(self, machine_code):
-        if len(machine_code) != 32:
-            raise Exception('Parsing error')
-
     def __validate_token_length(self, tokens):
         if len(tokens) != 4:
             raise Exception('Parsing error')
 
-    def __validate_bits(self, machine_code):
-        for bit in machine_code:
-            if bit not in ['0', '1']:
-                raise Exception('Parsing error')
+    @staticmethod
+    def __register(token: str, registers: dict) -> int:
+        if token not in registers:
+            raise Exception('Parsing error')
+        return registers[token]
+
+    @staticmethod
+    def __immediate(value: int) -> int:
+        """ encodes a signed 16bit immediate value """
+        if not -2**15 <= value < 2**15:
+            raise Exception('Parsing error')
+        return value & IMMEDIATE_MASK
 
     def __parse_arithmetic(self, tokens, arithmetic, registers):
         self.__validate_token_length(tokens)
 
-        for cmd in arithmetic:
-            for i, token in enumerate(tokens):
-                if token == cmd:
-                    tokens[i] = arithmetic[cmd]
-                    break
-
-        for reg in registers:
-            for i, token in enumerate(tokens):
-                if token == reg:
-                    tokens[i] = registers[reg]
-
-        self.__validate_bits(''.join(tokens))
-
-        # add 5bit dont-cares and 6bit op-code always zero
-        tokens = tokens + ['00000'] + ['000000']
+        # op-code always zero, 5bit dont-cares
+        machine_code = (self.__register(tokens[2], registers) << RS_SHIFT) \
+            | (self.__register(tokens[3], registers) << RT_SHIFT) \
+            | (self.__register(tokens[1], registers) << RD_SHIFT) \
+            | arithmetic[tokens[0]]
 
-        # rearrenge bit-order
-        order = [5, 2, 3, 1, 4, 0]
-        tokens = [tokens[i] for i in order]
+        logging.debug("{:032b}".format(machine_code))
+        return Instruction(machine_code, None, False)
 
-        machine_code = ''.join(tokens)
-        self.__validate_code_length(machine_code)
-
-        logging.debug(machine_code)
-        return [machine_code]
-
-    def __parse_storage(self, current_address, tokens, storage, registers):
+    def __parse_storage(self, tokens, storage, registers):
         self.__validate_token_length(tokens)
 
-        for cmd in storage:
-            for i, token in enumerate(tokens):
-                if token == cmd:
-                    tokens[i] = storage[cmd]
-                    break
-
-        for reg in registers:
-            for i, token in enumerate(tokens):
-                if token == reg:
-                    tokens[i] = registers[reg]
+        machine_code = (storage[tokens[0]] << OPCODE_SHIFT) \
+            | (self.__register(tokens[3], registers) << RS_SHIFT) \
+            | (self.__register(tokens[1], registers) << RT_SHIFT)
 
         label_or_number = tokens[2]
-        if self.__is_number(label_or_number):
-            offset = self.__hex_to_decimal(label_or_number)
-            tokens[2] = Bits(int=offset, length=16).bin
-        else:  # label
-            address = self.__validate_label(label_or_number)
-            tokens[2] = Bits(int=address, length=16).bin
+        if not self.__is_number(label_or_number):  # label
+            return Instruction(machine_code, label_or_number, False)
 
-        self.__validate_bits(''.join(tokens))
+        offset = self.__hex_to_decimal(label_or_number)
+        machine_code |= self.__immediate(offset)
 
-        # rearrenge bit-order
-        order = [0, 3, 1, 2]
-        tokens = [tokens[i] for i in order]
+        logging.debug("{:032b}".format(machine_code))
+        return Instruction(machine_code, None, False)
 
-        machine_code = ''.join(tokens)
-        self.__validate_code_length(machine_code)
-
-        logging.debug(machine_code)
-        return [machine_code]
-
-    def __parse_branch(self, current_address, tokens, branch, registers):
+    def __parse_branch(self, tokens, branch, registers):
         self.__validate_token_length(tokens)
 
-        for cmd in branch:
-            for i, token in enumerate(tokens):
-                if token == cmd:
-                    tokens[i] = branch[cmd]
-                    break
-
-        for reg in registers:
-            for i, token in enumerate(tokens):
-                if token == reg:
-                    tokens[i] = registers[reg]
+        machine_code = (branch[tokens[0]] << OPCODE_SHIFT) \
+            | (self.__register(tokens[2], registers) << RS_SHIFT) \
+            | (self.__register(tokens[1], registers) << RT_SHIFT)
 
         label_or_number = tokens[-1]
-        if self.__is_number(label_or_number):
-            address = self.__hex_to_decimal(label_or_number)
-            tokens[-1] = Bits(int=address, length=16).bin
-        else:  # label
-            address = self.__validate_label(label_or_number)
-            offset = address - current_address
-            offset -= REG_SIZE
-            offset = int(offset / REG_SIZE)
-            tokens[-1] = Bits(int=offset, length=16).bin
-
-        self.__validate_bits(''.join(tokens))
+        if not self.__is_number(label_or_number):  # label
+            return Instruction(machine_code, label_or_number, True)
 
-        # rearrenge bit-order
-        order = [0, 2, 1, 3]
-        tokens = [tokens[i] for i in order]
+        address = self.__hex_to_decimal(label_or_number)
+        machine_code |= self.__immediate(address)
 
-        machine_code = ''.join(tokens)
-        self.__validate_code_length(machine_code)
+        logging.debug("{:032b}".format(machine_code))
+        return Instruction(machine_code, None, False)
 
-        logging.debug(machine_code)
-        return [machine_code]
-
-    def __generate_start(self, start_address, zeros_constants, commands, registers):
+    def __generate_start(self, start_address, zeros_constants):
         branch_address = int(start_address / REG_SIZE - 1)
-        branch = self.__parse_branch(
-            0,
+        zeros_constants[0] = self.__parse_branch(
             ['BEQ', 'R30', 'R30', "{ADDRESS}".format(ADDRESS=branch_address)],
-            commands['branch'],
-            registers
-        )
-        zeros_constants[0] = ''.join(branch)
+            self.__branch,
+            self.__registers
+        ).word
         return zeros_constants
 
-    def __generate_end(self, zeros_constants, commands, registers):
-        branch = self.__parse_branch(
-            0,
+    def __generate_end(self, code_address, bitcode, zeros_constants):
+        # the END directive directly follows the code
+        index = int(code_address / REG_SIZE) + len(bitcode)
+        zeros_constants[index] = self.__parse_branch(
             ['BEQ', 'R30', 'R30', "-1"],
-            commands['branch'],
-            registers
-        )
-        zeros_constants[-1] = ''.join(branch)
+            self.__branch,
+            self.__registers
+        ).word
         return zeros_constants
 
     @staticmethod
@@ -0,0 +1,64 @@
+"""
+Assembler Diagnostics
+"""
+
+from collections import namedtuple
+from .architecture import Architectures
+from .assembler import Assembler, REG_SIZE
+from ..preprocessor.preprocessor import Preprocessor
+
+# line is the editor line of the error or None for errors of the whole file
+Diagnostic = namedtuple('Diagnostic', ['line', 'message'])
+Report = namedtuple('Report', ['diagnostics', 'symboltable', 'code_size'])
+
+
+class Diagnostics:
+    """Collects assembler errors without aborting on the first one
+
+    Every line of code is checked on its own, so one run reports all
+    faulty lines together with their editor line numbers.
+    Encodings are cached by line text between runs.
+    """
+
+    def __init__(self, commands, registers):
+        self.__assembler = Assembler(Architectures.SINGLE)
+        self.__assembler.set_instructionset(commands, registers)
+        self.__encodings = {}  # line text -> Instruction or error message
+
+    def check(self, input_file, directory=None):
+        """assembles input_file and returns a Report.
+        INCLUDE files are searched in directory"""
+
+        try:
+            code_address, code, _, symboltable, editor_line_numbers = \
+                Preprocessor().parse(input_file=input_file, directory=directory)
+        except Exception as e:  # pylint: disable=broad-except
+            return Report([Diagnostic(None, str(e))], {}, 0)
+
+        self.__assembler.set_symboltable(symboltable)
+        diagnostics = []
+        encodings = {}
+
+        for line_nr, line in enumerate(code):
+            instruction = self.__encodings.get(line)
+            if instruction is None:
+                instruction = self.__encode(line)
+            encodings[line] = instruction
+
+            try:
+                if isinstance(instruction, str):
+                    raise Exception(instruction)
+                if instruction is not None:
+                    self.__assembler.resolve(instruction, code_address + line_nr * REG_SIZE)
+            except Exception as e:  # pylint: disable=broad-except
+                diagnostics.append(Diagnostic(editor_line_numbers[line_nr], str(e)))
+
+        self.__encodings = encodings
+
+        return Report(diagnostics, symboltable, len(code) * REG_SIZE)
+
+    def __encode(self, line):
+        try:
+            return self.__assembler.encode(line)
+        except Exception as e:  # pylint: disable=broad-except
+            return str(e) or 'Parsing error'
@@ -0,0 +1,130 @@
+"""
+Instruction Set Registry
+"""
+
+import os
+from os.path import dirname, join, normpath
+from super32utils.inout.fileio import FileIO
+
+INSTRUCTIONSET = normpath(join(dirname(__file__), '..', 'instructionset.json'))
+
+GROUPS = ('arithmetic', 'storage', 'branch')
+WORD_BITS = 32
+OPCODE_BITS = 6
+REGISTER_BITS = 5
+IMMEDIATE_BITS = 16
+REGISTER_MASK = (1 << REGISTER_BITS) - 1
+IMMEDIATE_MASK = (1 << IMMEDIATE_BITS) - 1
+
+# path -> (stamp, InstructionSet), shared by all users of the process
+_INSTRUCTION_SETS = {}
+
+
+class InstructionSet:
+    """ Validated and compiled instruction set
+
+    commands and registers are the bit-string encodings of instructionset.json.
+    The encodings are compiled once into integer lookup tables in both
+    directions. load() keeps one instance per file for the whole process and
+    reads the file again only if its modification time or size changed.
+    """
+
+    def __init__(self, commands, registers):
+        self.commands = commands
+        self.registers = registers
+        self.__validate()
+
+        # mnemonic -> funct (arithmetic) or opcode (storage and branch)
+        self.arithmetic = self.__compile(commands['arithmetic'])
+        self.storage = self.__compile(commands['storage'])
+        self.branch = self.__compile(commands['branch'])
+        # register name <-> register index
+        self.register_numbers = self.__compile(registers)
+        self.register_names = {number: name for name, number in self.register_numbers.items()}
+        # funct of arithmetic and opcode of other instructions -> mnemonic
+        self.functs = {funct: name for name, funct in self.arithmetic.items()}
+        self.opcodes = {
+            opcode: name for encodings in (self.storage, self.branch)
+            for name, opcode in encodings.items()
+        }
+        # mnemonic -> group
+        self.groups = {name: group for group in GROUPS for name in commands[group]}
+        self.__branch_opcodes = set(self.branch.values())
+
+    def halts(self, word: int) -> bool:
+        """ True for an unconditional branch to itself, the word of the END directive """
+
+        rs = (word >> (WORD_BITS - OPCODE_BITS - REGISTER_BITS)) & REGISTER_MASK
+        rt = (word >> IMMEDIATE_BITS) & REGISTER_MASK
+        return word >> (WORD_BITS - OPCODE_BITS) in self.__branch_opcodes \
+            and rs == rt and word & IMMEDIATE_MASK == IMMEDIATE_MASK
+
+    @classmethod
+    def load(cls, path=INSTRUCTIONSET) -> 'InstructionSet':
+        """ the instruction set of a json file, read once per process """
+
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = _INSTRUCTION_SETS.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        cfg = FileIO.read_json(path)
+        if not isinstance(cfg, dict) or 'commands' not in cfg or 'registers' not in cfg:
+            raise Exception('Instruction set error. Missing commands or registers in ' + path)
+        instructionset = cls(cfg['commands'], cfg['registers'])
+        _INSTRUCTION_SETS[path] = (stamp, instructionset)
+        return instructionset
+
+    @classmethod
+    def of(cls, commands, registers=None) -> 'InstructionSet':
+        """ the compiled instruction set of commands and registers.
+        tables of loaded instruction sets are shared, other encodings are compiled """
+
+        for _, instructionset in _INSTRUCTION_SETS.values():
+            if instructionset.commands is commands \
+                    and (registers is None or instructionset.registers is registers):
+                return instructionset
+        return cls(commands, registers if registers is not None else {})
+
+    def __validate(self):
+        for group in GROUPS:
+            if not isinstance(self.commands.get(group), dict):
+                raise Exception('Instruction set error. Missing command group: ' + group)
+            self.__check_encodings(self.commands[group], OPCODE_BITS, group)
+        self.__check_encodings(self.registers, REGISTER_BITS, 'registers')
+
+        opcodes = {}
+        for group in ('storage', 'branch'):
+            for name, code in self.commands[group].items():
+                if int(code, 2) == 0:
+                    raise Exception(
+                        'Instruction set error. Opcode of arithmetic commands used: ' + name)
+                if code in opcodes:
+                    raise Exception(
+                        'Instruction set error. Duplicate opcode: {first}, {second}'.format(
+                            first=opcodes[code], second=name))
+                opcodes[code] = name
+
+        names = [name for group in GROUPS for name in self.commands[group]]
+        if len(names) != len(set(names)):
+            raise Exception('Instruction set error. Command in more than one group')
+
+    @staticmethod
+    def __check_encodings(encodings, bits, group):
+        seen = {}
+        for name, code in encodings.items():
+            if not isinstance(code, str) or len(code) != bits or set(code) - {'0', '1'}:
+                raise Exception('Instruction set error. Invalid encoding of {name}: {code}'.format(
+                    name=name, code=code))
+            if code in seen:
+                raise Exception(
+                    'Instruction set error. Duplicate encoding in {group}: {first}, {second}'
+                    .format(group=group, first=seen[code], second=name))
+            seen[code] = name
+
+    @staticmethod
+    def __compile(encodings: dict) -> dict:
+        """ converts the bit-string encodings of the instruction set to integers """
+        return {name: int(code, 2) for name, code in encodings.items()}
@@ -0,0 +1,265 @@
+"""
+Incremental Assembler Session
+"""
+
+import logging
+from .architecture import Architectures
+from .assembler import Assembler, REG_SIZE
+from ..preprocessor.asmdirectives import AssemblerDirectives
+from ..preprocessor.includes import IncludeResolver
+from ..preprocessor.preprocessor import Preprocessor
+
+# line kinds deciding whether an edit can change the memory layout
+IGNORED = 0
+INSTRUCTION = 1
+LAYOUT = 2
+
+
+class AssemblerSession:
+    """Incremental assembler for editors
+
+    Keeps the encoded lines of the previous run. Encodings are cached by
+    line text, label operands are tracked per label. On an update only
+    changed lines are encoded and only lines referencing moved or renamed
+    labels are resolved again. Edits that keep the memory layout (changing
+    instructions, comments or empty lines in place) skip the preprocessor.
+
+    With the multi architecture the machine code is the instruction memory,
+    the data memory is returned by data_memory().
+    """
+
+    def __init__(self, commands, registers, architecture=Architectures.SINGLE):
+        self.__architecture = architecture
+        self.__assembler = Assembler(architecture)
+        self.__assembler.set_instructionset(commands, registers)
+
+        self.__encodings = {}  # line text -> Instruction
+        self.__input_file = []
+        self.__code = []
+        self.__words = []
+        self.__references = {}  # label -> set of code indices
+        self.__relative = set()  # code indices of pc-relative label operands
+        self.__code_indices = {}  # editor line -> code index
+        self.__directory = None
+        self.__includes = {}  # included path -> stamp
+
+        self.__code_address = None
+        self.__symboltable = {}
+        self.__editor_line_numbers = []
+        self.__machine_code = None
+        self.__data_memory = None
+
+        self.encoded_lines = 0  # lines encoded during the last update
+        self.resolved_lines = 0  # label operands resolved during the last update
+
+    def update(self, input_file, directory=None):
+        """assembles the changed input file, INCLUDE files are searched in directory
+
+        returns code_address, machine_code, symboltable and editor_line_numbers
+        """
+
+        self.encoded_lines = 0
+        self.resolved_lines = 0
+
+        changed = self.__changed_lines(input_file)
+        if changed is not None and directory == self.__directory \
+                and not self.__includes_changed():
+            self.__update_lines(input_file, changed)
+        else:
+            try:
+                self.__update_layout(input_file, directory)
+            except Exception:
+                # the labels of a rejected layout must not resolve later edits
+                self.__assembler.set_symboltable(self.__symboltable)
+                raise
+
+        self.__input_file = list(input_file)
+        self.__directory = directory
+
+        logging.debug("Session: encoded {encoded} lines, resolved {resolved} labels".format(
+            encoded=self.encoded_lines, resolved=self.resolved_lines))
+
+        return (
+            self.__code_address,
+            self.__machine_code.copy(),
+            dict(self.__symboltable),
+            list(self.__editor_line_numbers)
+        )
+
+    def data_memory(self):
+        """returns the data memory of the last update,
+        None with the single architecture where data and instructions share the machine code"""
+
+        if self.__architecture != Architectures.MULTI or self.__data_memory is None:
+            return None
+        return self.__data_memory.copy()
+
+    def __changed_lines(self, input_file):
+        """returns the indices of lines changed in place without touching the layout
+        or None if the preprocessor has to run again"""
+
+        if self.__machine_code is None or len(input_file) != len(self.__input_file):
+            return None
+
+        changed = [
+            i for i, (old, new) in enumerate(zip(self.__input_file, input_file))
+            if old != new
+        ]
+
+        for i in changed:
+            kind = self.__line_kind(input_file[i])
+            if kind == LAYOUT or kind != self.__line_kind(self.__input_file[i]):
+                return None
+
+        return changed
+
+    def __includes_changed(self):
+        return any(
+            IncludeResolver.stamp(path) != stamp for path, stamp in self.__includes.items()
+        )
+
+    def __update_lines(self, input_file, changed):
+        """re-encodes lines changed in place, the layout stays untouched"""
+
+        index = self.__code_address // REG_SIZE
+        code = list(self.__code)
+        words = list(self.__words)
+        references = {label: set(lines) for label, lines in self.__references.items()}
+        relative = set(self.__relative)
+
+        for line_number in changed:
+            code_nr = self.__code_indices.get(line_number)
+            if code_nr is None:
+                continue  # comment, empty line or outside of START and END
+
+            old = self.__encodings.get(code[code_nr])
+            if old is not None and old.label is not None:
+                references.get(old.label, set()).discard(code_nr)
+                relative.discard(code_nr)
+
+            line = str.strip(input_file[line_number])
+            instruction = self.__encode(line)
+            code[code_nr] = line
+            words[code_nr] = self.__resolve(instruction, code_nr, references, relative)
+
+        for line_number in changed:
+            code_nr = self.__code_indices.get(line_number)
+            if code_nr is not None:
+                self.__machine_code[index + code_nr] = words[code_nr]
+
+        self.__code = code
+        self.__words = words
+        self.__references = references
+        self.__relative = relative
+
+    def __update_layout(self, input_file, directory):
+        """runs the preprocessor and re-encodes changed lines only"""
+
+        preprocessor = Preprocessor()
+        code_address, code, zeros_constants, symboltable, editor_line_numbers = \
+            preprocessor.parse(input_file=input_file, directory=directory)
+        self.__assembler.set_symboltable(symboltable)
+
+        old_code = self.__code
+        old_words = self.__words
+        same_address = code_address == self.__code_address
+
+        # lines in front of and behind the edit keep their encoding
+        prefix = 0
+        suffix = 0
+        if same_address:
+            limit = min(len(code), len(old_code))
+            while prefix < limit and code[prefix] == old_code[prefix]:
+                prefix += 1
+            while suffix < limit - prefix and code[-1 - suffix] == old_code[-1 - suffix]:
+                suffix += 1
+        shift = len(code) - len(old_code)
+
+        references = {}
+        for label, lines in self.__references.items():
+            kept = {i for i in lines if i < prefix} \
+                | {i + shift for i in lines if i >= len(old_code) - suffix}
+            if kept:
+                references[label] = kept
+        relative = {i for i in self.__relative if i < prefix} \
+            | {i + shift for i in self.__relative if i >= len(old_code) - suffix}
+
+        words = old_words[:prefix] \
+            + [None] * (len(code) - prefix - suffix) \
+            + (old_words[len(old_words) - suffix:] if suffix else [])
+
+        for code_nr in range(prefix, len(code) - suffix):
+            instruction = self.__encode(code[code_nr])
+            words[code_nr] = self.__resolve(instruction, code_nr, references, relative,
+                                            code_address)
+
+        # lines referencing moved or renamed labels
+        dirty = set()
+        for label in self.__symboltable.keys() | symboltable.keys():
+            if self.__symboltable.get(label) != symboltable.get(label):
+                dirty |= references.get(label, set())
+        # pc-relative operands of shifted lines
+        if shift:
+            dirty |= {i for i in relative if i >= len(code) - suffix}
+
+        for code_nr in dirty:
+            instruction = self.__encodings[code[code_nr]]
+            words[code_nr] = self.__assembler.resolve(
+                instruction, code_address + code_nr * REG_SIZE)
+            self.resolved_lines += 1
+
+        self.__machine_code = self.__assembler.generate(code_address, words, zeros_constants)
+        self.__data_memory = zeros_constants
+
+        # forget encodings of lines that were edited away
+        if len(self.__encodings) > 2 * len(code):
+            self.__encodings = {line: self.__encodings[line] for line in code}
+
+        self.__includes = {path: IncludeResolver.stamp(path) for path in preprocessor.includes}
+        self.__code_address = code_address
+        self.__code = code
+        self.__words = words
+        self.__references = references
+        self.__relative = relative
+        self.__symboltable = symboltable
+        self.__editor_line_numbers = editor_line_numbers
+        self.__code_indices = {
+            line_number: code_nr
+            for code_nr, line_number in enumerate(editor_line_numbers[:len(code)])
+        }
+
+    def __encode(self, line):
+        instruction = self.__encodings.get(line)
+        if instruction is None:
+            instruction = self.__assembler.encode(line)
+            if instruction is None:
+                raise Exception('Parsing error')
+            self.__encodings[line] = instruction
+            self.encoded_lines += 1
+        return instruction
+
+    def __resolve(self, instruction, code_nr, references, relative, code_address=None):
+        if code_address is None:
+            code_address = self.__code_address
+
+        if instruction.label is None:
+            return instruction.word
+
+        references.setdefault(instruction.label, set()).add(code_nr)
+        if instruction.relative:
+            relative.add(code_nr)
+
+        self.resolved_lines += 1
+        return self.__assembler.resolve(instruction, code_address + code_nr * REG_SIZE)
+
+    @staticmethod
+    def __line_kind(line):
+        line = str.strip(line)
+        if not line or line.startswith("'"):
+            return IGNORED
+
+        tokens = line.split(' ')
+        if ':' in line or AssemblerDirectives.lookup(tokens[0]) is not None:
+            return LAYOUT
+
+        return INSTRUCTION
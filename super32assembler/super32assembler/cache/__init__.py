@@ -0,0 +1,12 @@
+"""
+AssemblyCache
+
+key(*parts)
+content hash of source code, instruction set and options
+
+get(key)
+returns the cached machine images or None
+
+put(key, images)
+stores machine images and evicts the least recently used entries
+"""
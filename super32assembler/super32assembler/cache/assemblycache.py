@@ -0,0 +1,193 @@
+""" Content addressed on-disk cache for assembled machine images """
+
+import hashlib
+import logging
+import os
+import struct
+import sys
+from array import array
+from ..image.machineimage import MachineImage, TYPECODE, WORD_SIZE
+
+CACHE_VERSION = b'super32-cache-2'
+DEFAULT_SIZE = 64 * 2**20  # bytes
+SUFFIX = '.img'
+# the cache is scanned for eviction once per process and then after
+# every max_size / EVICT_FRACTION bytes written
+EVICT_FRACTION = 8
+
+# cache directory -> bytes written by this process since its last eviction
+_WRITTEN = {}
+
+
+class AssemblyCache:
+    """ Stores machine images under the hash of everything they were built from.
+
+    Entries are written to a temporary file and renamed into place, so
+    parallel builds never read half written entries. Once the cache grows
+    beyond max_size, the least recently used entries are evicted.
+    Writing is best effort, a cache that can not be written never fails a build.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def default_directory():
+        """ SUPER32_CACHE_DIR or the users cache directory """
+
+        directory = os.getenv('SUPER32_CACHE_DIR')
+        if directory:
+            return directory
+
+        base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'super32assembler')
+
+    @staticmethod
+    def key(*parts) -> str:
+        """ hashes source bytes, instruction set bytes and option strings """
+
+        digest = hashlib.sha256(CACHE_VERSION)
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode('utf-8')
+            digest.update(struct.pack('<Q', len(part)))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """ returns the list of cached MachineImages or None """
+
+        data = self.read(key)
+        if data is None:
+            return None
+
+        try:
+            images = self.__unpack(data)
+        except (ValueError, struct.error):
+            logging.warning("discarding corrupt cache entry: {key}".format(key=key))
+            self.discard(key)
+            return None
+
+        logging.debug("cache hit: {key}".format(key=key))
+        return images
+
+    def put(self, key, images):
+        """ stores a list of MachineImages """
+
+        self.write(key, self.__pack(images))
+
+    def read(self, key):
+        """ returns the raw bytes of an entry or None """
+
+        path = self.__path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        return data
+
+    def write(self, key, data):
+        """ stores raw bytes under key, errors are logged and ignored """
+
+        import tempfile  # only needed on cache misses
+
+        path = self.__path(key)
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(handle, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError as error:
+            if temp_path is not None:
+                self.__remove(temp_path)
+            logging.warning("cache entry not written: {error}".format(error=error))
+            return
+
+        written = _WRITTEN.get(self.directory)
+        if written is None or written + len(data) > self.max_size // EVICT_FRACTION:
+            self.evict()
+        else:
+            _WRITTEN[self.directory] = written + len(data)
+
+    def discard(self, key):
+        """ removes an entry """
+
+        self.__remove(self.__path(key))
+
+    def evict(self):
+        """ removes least recently used entries until the cache fits max_size """
+
+        _WRITTEN[self.directory] = 0
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # evicted by a concurrent build
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            self.__remove(path)
+            total -= size
+
+    def __path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:] + SUFFIX)
+
+    @staticmethod
+    def __pack(images):
+        data = [struct.pack('<I', len(images))]
+        for image in images:
+            segments = image.segments()
+            data.append(struct.pack('<II', len(image), len(segments)))
+            for address, words in segments:
+                words = array(TYPECODE, words)
+                if sys.byteorder != 'little':
+                    words.byteswap()
+                data.append(struct.pack('<II', address // WORD_SIZE, len(words)))
+                data.append(words.tobytes())
+        return b''.join(data)
+
+    @staticmethod
+    def __unpack(data):
+        images = []
+        (count,), offset = struct.unpack_from('<I', data), 4
+        for _ in range(count):
+            length, segment_count = struct.unpack_from('<II', data, offset)
+            offset += 8
+            segments = []
+            for _ in range(segment_count):
+                start, size = struct.unpack_from('<II', data, offset)
+                offset += 8
+                end = offset + size * WORD_SIZE
+                if end > len(data):
+                    raise ValueError('truncated cache entry')
+                words = array(TYPECODE)
+                words.frombytes(data[offset:end])
+                if sys.byteorder != 'little':
+                    words.byteswap()
+                segments.append((start * WORD_SIZE, words))
+                offset = end
+            if segments and segments[-1][0] // WORD_SIZE + len(segments[-1][1]) > length:
+                raise ValueError('corrupt cache entry')
+            images.append(MachineImage.from_segments(segments, length))
+        return images
+
+    @staticmethod
+    def __remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
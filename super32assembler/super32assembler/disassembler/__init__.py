@@ -0,0 +1,17 @@
+"""
+Disassembler
+
+__init__(commands, registers, symbols=None)
+builds the decode tables from the instruction set,
+symbols is an optional SymbolIndex naming branch targets and data addresses
+
+disassemble(word, address=None)
+decodes one word to assembler syntax, e.g. 'ADD R1,R2,R3'
+
+disassemble_image(machine_code)
+decodes every word of a MachineImage, returns (address, text) pairs
+
+fields(words)
+splits words into opcode, rs, rt, rd, funct and immediate arrays,
+in one vectorized pass if NumPy is installed
+"""
@@ -0,0 +1,133 @@
+""" Disassembler module """
+
+from array import array
+from collections import namedtuple
+from ..assembler.instructionset import InstructionSet
+from ..assembler.assembler import (
+    IMMEDIATE_MASK, OPCODE_SHIFT, RD_SHIFT, REG_SIZE, RS_SHIFT, RT_SHIFT
+)
+from ..image.machineimage import TYPECODE, WORD_SIZE
+
+try:
+    import numpy
+except ImportError:  # bulk decoding falls back to the array module
+    numpy = None
+
+REGISTER_MASK = 0x1F
+FUNCT_MASK = 0x3F
+
+# instruction fields of one word or of arrays of words
+Fields = namedtuple('Fields', ['opcode', 'rs', 'rt', 'rd', 'funct', 'immediate'])
+
+
+def fields(words) -> Fields:
+    """ splits 32bit words into their instruction fields.
+    returns numpy arrays if NumPy is installed, arrays of the array module otherwise """
+
+    if numpy is not None:
+        words = numpy.asarray(words, dtype=numpy.uint32)
+        return Fields(
+            words >> OPCODE_SHIFT,
+            (words >> RS_SHIFT) & REGISTER_MASK,
+            (words >> RT_SHIFT) & REGISTER_MASK,
+            (words >> RD_SHIFT) & REGISTER_MASK,
+            words & FUNCT_MASK,
+            words & IMMEDIATE_MASK,
+        )
+
+    words = array(TYPECODE, words)
+    return Fields(
+        array('B', [word >> OPCODE_SHIFT for word in words]),
+        array('B', [(word >> RS_SHIFT) & REGISTER_MASK for word in words]),
+        array('B', [(word >> RT_SHIFT) & REGISTER_MASK for word in words]),
+        array('B', [(word >> RD_SHIFT) & REGISTER_MASK for word in words]),
+        array('B', [word & FUNCT_MASK for word in words]),
+        array('H', [word & IMMEDIATE_MASK for word in words]),
+    )
+
+
+class Disassembler:
+    """ Decodes machine code back to assembler syntax
+
+    The decode tables are the inverted encodings of the instruction set.
+    Words without a matching instruction are shown as DEFINE. Branch
+    targets and storage offsets matching a label are replaced by the label
+    if a SymbolIndex is given.
+    """
+
+    def __init__(self, commands, registers, symbols=None):
+        instructionset = InstructionSet.of(commands, registers)
+        self.__arithmetic = instructionset.functs
+        self.__storage = {
+            opcode: name for opcode, name in instructionset.opcodes.items()
+            if instructionset.groups[name] == 'storage'
+        }
+        self.__branch = {
+            opcode: name for opcode, name in instructionset.opcodes.items()
+            if instructionset.groups[name] == 'branch'
+        }
+        self.__registers = instructionset.register_names
+        self.__symbols = symbols
+
+    def disassemble(self, word: int, address=None) -> str:
+        """ decodes one word, branch targets are only resolved if address is known """
+
+        opcode = word >> OPCODE_SHIFT
+        rs = self.__registers.get((word >> RS_SHIFT) & REGISTER_MASK)
+        rt = self.__registers.get((word >> RT_SHIFT) & REGISTER_MASK)
+        immediate = word & IMMEDIATE_MASK
+
+        if opcode == 0:
+            rd = self.__registers.get((word >> RD_SHIFT) & REGISTER_MASK)
+            name = self.__arithmetic.get(word & FUNCT_MASK)
+            if name is None:
+                return self.__define(word)
+            return "{name} {rd},{rs},{rt}".format(name=name, rd=rd, rs=rs, rt=rt)
+
+        if opcode in self.__storage:
+            offset = self.__label(immediate) or str(self.__signed(immediate))
+            return "{name} {rt},{offset}({rs})".format(
+                name=self.__storage[opcode], rt=rt, offset=offset, rs=rs)
+
+        if opcode in self.__branch:
+            target = None
+            if address is not None:
+                target = self.__label(address + REG_SIZE + self.__signed(immediate) * REG_SIZE)
+            return "{name} {rt},{rs},{target}".format(
+                name=self.__branch[opcode], rt=rt, rs=rs,
+                target=target or self.__signed(immediate))
+
+        return self.__define(word)
+
+    def disassemble_image(self, machine_code) -> list:
+        """ (byte address, text) of every word in the used segments of a MachineImage """
+
+        lines = []
+        decoded = {}  # word -> text of words not depending on their address
+        for segment_address, words in machine_code.segments():
+            for i, word in enumerate(words):
+                address = segment_address + i * WORD_SIZE
+                if word >> OPCODE_SHIFT in self.__branch:
+                    lines.append((address, self.disassemble(word, address)))
+                    continue
+                text = decoded.get(word)
+                if text is None:
+                    text = decoded[word] = self.disassemble(word)
+                lines.append((address, text))
+        return lines
+
+    def __label(self, address):
+        if self.__symbols is None:
+            return None
+        symbol = self.__symbols.lookup(address)
+        if symbol is None or symbol[1]:
+            return None
+        return symbol[0]
+
+    @staticmethod
+    def __define(word):
+        return "DEFINE ${:08X}".format(word)
+
+    @staticmethod
+    def __signed(immediate):
+        return immediate - 0x10000 if immediate & 0x8000 else immediate
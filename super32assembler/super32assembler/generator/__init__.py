@@ -1,9 +1,13 @@
 """
 Generator
 
-__init__(generator)
-generator defines output format of the parsed machine-code
+__init__(generator, endianness='big')
+generator defines output format of the parsed machine-code:
+lines, stream, bin, ihex or srec
 
 write(path, machine_code)
 write machine-code to file with specified format (generator)
+
+Loader(loader, endianness='big').read(path)
+read machine-code written by a generator of the same format
 """
@@ -1,24 +1,273 @@
 """ File format generator module """
 
+import datetime
+import os
+import re
+import sys
+from array import array
+from os.path import dirname, join, normpath
 from super32utils.inout.fileio import FileIO
+from ..image.machineimage import TYPECODE, WORD_SIZE, ZERO_LINE
+
+# data bytes per Intel HEX / S-record data record
+RECORD_SIZE = 16
+# words formatted and written at once
+CHUNK_WORDS = 4096
+
+VHDL_TEMPLATE = normpath(join(dirname(__file__), 'template.vhdl'))
+
+# default output file extension of every format
+EXTENSIONS = {
+    'lines': '.o',
+    'stream': '.o',
+    'bin': '.bin',
+    'ihex': '.hex',
+    'srec': '.srec',
+    'vhdl': '.vhdl',
+    'coe': '.coe',
+    'mif': '.mif',
+}
+
+# formats recognized by file extension
+FORMATS = {
+    '.bin': 'bin',
+    '.hex': 'ihex',
+    '.ihex': 'ihex',
+    '.srec': 'srec',
+    '.s19': 'srec',
+    '.s28': 'srec',
+    '.s37': 'srec',
+    '.vhdl': 'vhdl',
+    '.vhd': 'vhdl',
+    '.coe': 'coe',
+    '.mif': 'mif',
+}
+
+
+def format_of(path, default='lines'):
+    """ output format belonging to the extension of path """
+
+    return FORMATS.get(os.path.splitext(path)[1].lower(), default)
+
+
+def to_bytes(words, endianness='big'):
+    """ converts 32bit words to bytes in the given byte order """
+
+    words = array(TYPECODE, words)
+    if endianness not in ('big', 'little'):
+        raise Exception('Generator error. Unknown endianness: ' + str(endianness))
+    if endianness != sys.byteorder:
+        words.byteswap()
+    return words.tobytes()
 
 
 class Generator:
-    """ Format machinecode output """
+    """ Format machinecode output
+
+    lines and stream write '0'/'1' characters of every word. bin writes
+    the raw memory, ihex and srec only write the used segments of sparse
+    images. Binary formats store words in the given byte order.
+    vhdl fills the memory of template.vhdl, zero words are left to its
+    OTHERS choice. coe and mif initialize Xilinx and Intel FPGA memories.
 
-    def __init__(self, generator):
+    Output is written in chunks of CHUNK_WORDS words to a temporary file,
+    which replaces path once it is complete.
+    """
+
+    def __init__(self, generator, endianness='big', source=None):
         self.__generator = generator
+        self.__endianness = endianness
+        self.__source = source or 'unsaved source'  # named in the vhdl header
 
     def write(self, path, machine_code):
+        """ write a MachineImage to path in the generators output format """
         if self.__generator == 'stream':
             self.__write_stream(path, machine_code)
         elif self.__generator == 'lines':
             self.__write_lines(path, machine_code)
+        elif self.__generator == 'bin':
+            self.__write_bin(path, machine_code)
+        elif self.__generator == 'ihex':
+            self.__write_ihex(path, machine_code)
+        elif self.__generator == 'srec':
+            self.__write_srec(path, machine_code)
+        elif self.__generator == 'vhdl':
+            self.__write_vhdl(path, machine_code)
+        elif self.__generator == 'coe':
+            self.__write_coe(path, machine_code)
+        elif self.__generator == 'mif':
+            self.__write_mif(path, machine_code)
         else:
             raise Exception('Generator error')
 
     def __write_stream(self, path, machine_code):
-        FileIO.write(path, ''.join(machine_code))
+        with FileIO.open_atomic(path) as file:
+            for lines in self.__line_chunks(machine_code):
+                file.write(''.join(lines).encode('ascii'))
 
     def __write_lines(self, path, machine_code):
-        FileIO.write(path, '\n'.join(machine_code))
+        with FileIO.open_atomic(path) as file:
+            separator = b''
+            for lines in self.__line_chunks(machine_code):
+                file.write(separator + '\n'.join(lines).encode('ascii'))
+                separator = b'\n'
+
+    def __write_bin(self, path, machine_code):
+        with FileIO.open_atomic(path) as file:
+            for words in self.__word_chunks(machine_code):
+                file.write(to_bytes(words, self.__endianness))
+
+    def __write_ihex(self, path, machine_code):
+        with FileIO.open_atomic(path) as file:
+            upper = 0
+            for address, data in self.__records(machine_code):
+                if address >> 16 != upper:
+                    # extended linear address record
+                    upper = address >> 16
+                    file.write(self.__ihex_record(0, 0x04, upper.to_bytes(2, 'big')))
+                file.write(self.__ihex_record(address & 0xFFFF, 0x00, data))
+            file.write(self.__ihex_record(0, 0x01, b''))
+
+    def __write_srec(self, path, machine_code):
+        size = len(machine_code) * 4
+        if size <= 0x10000:
+            data_type, address_size = 1, 2
+        elif size <= 0x1000000:
+            data_type, address_size = 2, 3
+        else:
+            data_type, address_size = 3, 4
+
+        with FileIO.open_atomic(path) as file:
+            file.write(self.__srec_record(0, 0, 2, b'super32'))
+            count = 0
+            for address, data in self.__records(machine_code):
+                file.write(self.__srec_record(data_type, address, address_size, data))
+                count += 1
+            if count <= 0xFFFF:
+                file.write(self.__srec_record(5, count, 2, b''))
+            else:
+                file.write(self.__srec_record(6, count, 3, b''))
+            # termination record with the start address
+            file.write(self.__srec_record(10 - data_type, 0, address_size, b''))
+
+    def __write_vhdl(self, path, machine_code):
+        name = os.path.splitext(os.path.basename(path))[0]
+        values = {
+            'source': self.__source,
+            'date': datetime.datetime.now().isoformat(),
+            'spacer': '#' * len(self.__source),
+            'name': re.sub(r'\W', '_', name),
+            'mem_size': str(len(machine_code) - 1),
+        }
+
+        # literal text and placeholder names alternate
+        parts = re.split(r'\{\{(\w+)\}\}', FileIO.read_file(VHDL_TEMPLATE))
+
+        with FileIO.open_atomic(path) as file:
+            for i, part in enumerate(parts):
+                if i % 2 == 0:
+                    file.write(part.encode('utf-8'))
+                elif part == 'memory':
+                    self.__write_vhdl_memory(file, machine_code)
+                else:
+                    file.write(values[part].encode('utf-8'))
+
+    @staticmethod
+    def __write_vhdl_memory(file, machine_code):
+        """ one choice per non-zero word, all zero words are collapsed into OTHERS """
+
+        for address, words in machine_code.segments():
+            start = address // WORD_SIZE
+            for i in range(0, len(words), CHUNK_WORDS):
+                file.write(''.join(
+                    '\t\t\t%d => "%s",\n' % (start + i + j, "{:032b}".format(word))
+                    for j, word in enumerate(words[i:i + CHUNK_WORDS]) if word
+                ).encode('ascii'))
+        file.write(b"\t\t\tOTHERS => (OTHERS => '0')")
+
+    def __write_coe(self, path, machine_code):
+        with FileIO.open_atomic(path) as file:
+            file.write(b'memory_initialization_radix=16;\nmemory_initialization_vector=\n')
+            separator = b''
+            for words in self.__word_chunks(machine_code):
+                file.write(separator + ',\n'.join(
+                    "{:08X}".format(word) for word in words).encode('ascii'))
+                separator = b',\n'
+            file.write(b';\n')
+
+    def __write_mif(self, path, machine_code):
+        with FileIO.open_atomic(path) as file:
+            file.write((
+                "-- Super32 memory initialization, source: {source}\n"
+                "WIDTH=32;\nDEPTH={depth};\n\n"
+                "ADDRESS_RADIX=HEX;\nDATA_RADIX=HEX;\n\n"
+                "CONTENT BEGIN\n"
+            ).format(source=self.__source, depth=len(machine_code)).encode('utf-8'))
+
+            position = 0
+            for address, words in machine_code.segments() + [(len(machine_code) * WORD_SIZE, ())]:
+                start = address // WORD_SIZE
+                if start - position > 1:
+                    file.write("\t[{:X}..{:X}] : 00000000;\n".format(
+                        position, start - 1).encode('ascii'))
+                elif start - position == 1:
+                    file.write("\t{:X} : 00000000;\n".format(position).encode('ascii'))
+                for i in range(0, len(words), CHUNK_WORDS):
+                    file.write(''.join(
+                        "\t{:X} : {:08X};\n".format(start + i + j, word)
+                        for j, word in enumerate(words[i:i + CHUNK_WORDS])
+                    ).encode('ascii'))
+                position = start + len(words)
+
+            file.write(b'END;\n')
+
+    @staticmethod
+    def __word_chunks(machine_code):
+        """ yields all words of the image in arrays of at most CHUNK_WORDS,
+        gaps are filled with zeros """
+
+        position = 0
+        for address, words in machine_code.segments() + [(len(machine_code) * WORD_SIZE, ())]:
+            start = address // WORD_SIZE
+            for i in range(position, start, CHUNK_WORDS):
+                yield array(TYPECODE, bytes(min(CHUNK_WORDS, start - i) * WORD_SIZE))
+            for i in range(0, len(words), CHUNK_WORDS):
+                yield words[i:i + CHUNK_WORDS]
+            position = start + len(words)
+
+    def __line_chunks(self, machine_code):
+        """ yields the '0'/'1' lines of all words in lists of at most CHUNK_WORDS """
+
+        for words in self.__word_chunks(machine_code):
+            if any(words):
+                yield ["{:032b}".format(word) for word in words]
+            else:
+                yield [ZERO_LINE] * len(words)
+
+    def __records(self, machine_code):
+        """ yields (byte address, data) records of the used segments,
+        records never cross a 64KiB boundary """
+
+        for segment_address, words in machine_code.segments():
+            for i in range(0, len(words), CHUNK_WORDS):
+                address = segment_address + i * WORD_SIZE
+                data = to_bytes(words[i:i + CHUNK_WORDS], self.__endianness)
+                offset = 0
+                while offset < len(data):
+                    size = min(RECORD_SIZE, 0x10000 - ((address + offset) & 0xFFFF))
+                    yield address + offset, data[offset:offset + size]
+                    offset += size
+
+    @staticmethod
+    def __ihex_record(address, record_type, data):
+        record = bytes([len(data)]) + address.to_bytes(2, 'big') + bytes([record_type]) + data
+        checksum = -sum(record) & 0xFF
+        return b':' + (record + bytes([checksum])).hex().upper().encode('ascii') + b'\n'
+
+    @staticmethod
+    def __srec_record(record_type, address, address_size, data):
+        record = address.to_bytes(address_size, 'big') + data
+        record = bytes([len(record) + 1]) + record
+        checksum = ~sum(record) & 0xFF
+        return b'S%d' % record_type + (record + bytes([checksum])).hex().upper().encode('ascii') \
+            + b'\n'
@@ -0,0 +1,122 @@
+""" Machine code loader module """
+
+import sys
+from array import array
+from super32utils.inout.fileio import FileIO
+from ..image.machineimage import MachineImage, TYPECODE, WORD_SIZE
+
+
+class Loader:
+    """ Reads machine code files written by Generator back into a MachineImage """
+
+    def __init__(self, loader, endianness='big'):
+        self.__loader = loader
+        self.__endianness = endianness
+
+    def read(self, path) -> MachineImage:
+        """ read a machine code file in the loaders format """
+        if self.__loader == 'lines':
+            return self.__read_lines(path)
+        if self.__loader == 'stream':
+            return self.__read_stream(path)
+        if self.__loader == 'bin':
+            return self.__read_bin(path)
+        if self.__loader == 'ihex':
+            return self.__read_ihex(path)
+        if self.__loader == 'srec':
+            return self.__read_srec(path)
+        raise Exception('Loader error')
+
+    def __read_lines(self, path):
+        return MachineImage.from_lines(
+            line for line in FileIO.read_file(path).split() if line)
+
+    def __read_stream(self, path):
+        stream = FileIO.read_file(path).strip()
+        if len(stream) % 32:
+            raise Exception('Loader error. Incomplete word in ' + str(path))
+        return MachineImage.from_lines(stream[i:i + 32] for i in range(0, len(stream), 32))
+
+    def __read_bin(self, path):
+        data = FileIO.read_bytes(path)
+        if len(data) % WORD_SIZE:
+            raise Exception('Loader error. Incomplete word in ' + str(path))
+        return MachineImage(self.__words(data))
+
+    def __read_ihex(self, path):
+        chunks = []
+        upper = 0
+        for line_nr, line in self.__records(path, ':'):
+            record = self.__decode(line[1:], line_nr)
+            if (sum(record) & 0xFF) != 0 or len(record) != record[0] + 5:
+                raise Exception('Loader error. Invalid record in line ' + str(line_nr))
+
+            address = int.from_bytes(record[1:3], 'big')
+            record_type = record[3]
+            data = record[4:-1]
+            if record_type == 0x00:
+                chunks.append((upper + address, data))
+            elif record_type == 0x01:
+                break
+            elif record_type == 0x02:  # extended segment address
+                upper = int.from_bytes(data, 'big') << 4
+            elif record_type == 0x04:  # extended linear address
+                upper = int.from_bytes(data, 'big') << 16
+
+        return self.__image(chunks)
+
+    def __read_srec(self, path):
+        chunks = []
+        address_sizes = {'1': 2, '2': 3, '3': 4}
+        for line_nr, line in self.__records(path, 'S'):
+            record = self.__decode(line[2:], line_nr)
+            if (sum(record) & 0xFF) != 0xFF or len(record) != record[0] + 1:
+                raise Exception('Loader error. Invalid record in line ' + str(line_nr))
+
+            address_size = address_sizes.get(line[1])
+            if address_size is not None:
+                address = int.from_bytes(record[1:1 + address_size], 'big')
+                chunks.append((address, record[1 + address_size:-1]))
+
+        return self.__image(chunks)
+
+    def __image(self, chunks):
+        """ joins (byte address, data) chunks to a sparse image """
+
+        segments = []
+        for address, data in sorted(chunks, key=lambda chunk: chunk[0]):
+            if segments and segments[-1][0] + len(segments[-1][1]) == address:
+                segments[-1][1].extend(data)
+            else:
+                segments.append((address, bytearray(data)))
+
+        for address, data in segments:
+            if address % WORD_SIZE or len(data) % WORD_SIZE:
+                raise Exception('Loader error. Data not word aligned at address ' + str(address))
+
+        return MachineImage.from_segments(
+            (address, self.__words(data)) for address, data in segments)
+
+    def __words(self, data):
+        words = array(TYPECODE)
+        words.frombytes(bytes(data))
+        if self.__endianness != sys.byteorder:
+            words.byteswap()
+        return words
+
+    @staticmethod
+    def __records(path, start):
+        for line_nr, line in enumerate(FileIO.read_file(path).splitlines(), 1):
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith(start):
+                raise Exception('Loader error. Invalid record in line ' + str(line_nr))
+            yield line_nr, line
+
+    @staticmethod
+    def __decode(digits, line_nr):
+        try:
+            return bytes.fromhex(digits)
+        except ValueError:
+            raise Exception('Loader error. Invalid record in line ' + str(line_nr))
@@ -59,8 +59,7 @@ BEGIN
 
 		TYPE memory_bank IS ARRAY(0 TO 2**20-1) OF word;	-- memory bank, max length 2**30 (4 * 1GB)
 		VARIABLE values	: memory_bank := (			-- memory values
-{{memory}},
-			OTHERS => (OTHERS => '0')
+{{memory}}
 		);
 
 	BEGIN
@@ -0,0 +1,15 @@
+"""
+MachineImage
+
+zeros(length)
+create an image with length words, all set to zero
+
+from_lines(lines)
+create an image from 32bit '0'/'1' machine-code lines
+
+view()
+zero-copy memoryview of the stored words
+
+to_lines()
+convert the image to 32bit '0'/'1' machine-code lines
+"""
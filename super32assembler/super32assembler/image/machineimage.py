@@ -0,0 +1,216 @@
+""" Machine image module """
+
+from array import array
+from bisect import bisect_right
+from itertools import repeat
+
+WORD_SIZE = 4  # bytes
+WORD_BITS = WORD_SIZE * 8
+WORD_MASK = 0xFFFFFFFF
+
+# array typecode holding exactly one unsigned 32bit word per item
+TYPECODE = 'I' if array('I').itemsize == WORD_SIZE else 'L'
+
+ZERO_LINE = '0' * WORD_BITS
+
+
+class MachineImage:
+    """ Word addressed memory image
+
+    The image is a sparse list of segments, every segment is one
+    contiguous array of unsigned 32bit words starting at a word index.
+    Words outside of all segments read as zero, so widely separated code
+    and data only cost the words actually used. All assembler stages share
+    this representation, gaps are only filled in by dense output formats.
+    """
+
+    def __init__(self, words=()):
+        words = array(TYPECODE, words)
+        self.__length = len(words)
+        self.__starts = [0] if words else []  # word index of every segment
+        self.__segments = [words] if words else []
+
+    @classmethod
+    def zeros(cls, length: int) -> 'MachineImage':
+        """ create an image of length zero-words """
+
+        image = cls()
+        image.__length = length
+        return image
+
+    @classmethod
+    def from_segments(cls, segments, length=None) -> 'MachineImage':
+        """ create an image from (byte address, words) segments """
+
+        image = cls()
+        for address, words in segments:
+            image.__length = max(image.__length, address // WORD_SIZE + len(words))
+            image.write(address // WORD_SIZE, words)
+        if length is not None:
+            image.__length = length
+        return image
+
+    @classmethod
+    def from_lines(cls, lines) -> 'MachineImage':
+        """ create an image from 32bit '0'/'1' machine-code lines """
+
+        return cls(int(line, 2) for line in lines)
+
+    def copy(self) -> 'MachineImage':
+        image = MachineImage.zeros(self.__length)
+        image.__starts = list(self.__starts)
+        image.__segments = [array(TYPECODE, words) for words in self.__segments]
+        return image
+
+    def segments(self) -> list:
+        """ (byte address, words) of every used memory region, in address order.
+        the word arrays are shared with the image """
+
+        return [
+            (start * WORD_SIZE, words)
+            for start, words in zip(self.__starts, self.__segments)
+        ]
+
+    def used(self) -> int:
+        """ number of words stored in segments """
+
+        return sum(len(words) for words in self.__segments)
+
+    def read(self, start: int, stop: int) -> array:
+        """ words from index start to stop, gaps are filled with zeros """
+
+        words = array(TYPECODE, bytes((stop - start) * WORD_SIZE))
+        first = max(bisect_right(self.__starts, start) - 1, 0)
+        for i in range(first, len(self.__starts)):
+            segment_start = self.__starts[i]
+            if segment_start >= stop:
+                break
+            segment = self.__segments[i]
+            low = max(start, segment_start)
+            high = min(stop, segment_start + len(segment))
+            if low < high:
+                words[low - start:high - start] = segment[low - segment_start:high - segment_start]
+        return words
+
+    def write(self, index: int, words):
+        """ stores words starting at index, touching segments are merged """
+
+        words = array(TYPECODE, words)
+        end = index + len(words)
+        if index < 0 or end > self.__length:
+            raise IndexError('image assignment index out of range')
+        if not words:
+            return
+
+        # segments overlapping or directly adjacent to index..end
+        low = bisect_right(self.__starts, index) - 1
+        if low < 0 or self.__starts[low] + len(self.__segments[low]) < index:
+            low += 1
+        high = bisect_right(self.__starts, end)
+
+        if high - low == 1:
+            start = self.__starts[low]
+            segment = self.__segments[low]
+            if start <= index and end <= start + len(segment):
+                segment[index - start:end - start] = words  # in place
+                return
+            if start + len(segment) == index:
+                segment.extend(words)  # append
+                return
+
+        merged_start = min([index] + self.__starts[low:high])
+        merged_end = max([end] + [
+            start + len(segment)
+            for start, segment in zip(self.__starts[low:high], self.__segments[low:high])
+        ])
+        merged = array(TYPECODE, bytes((merged_end - merged_start) * WORD_SIZE))
+        for start, segment in zip(self.__starts[low:high], self.__segments[low:high]):
+            merged[start - merged_start:start - merged_start + len(segment)] = segment
+        merged[index - merged_start:end - merged_start] = words
+
+        self.__starts[low:high] = [merged_start]
+        self.__segments[low:high] = [merged]
+
+    def view(self) -> memoryview:
+        """ zero-copy view of all words.
+        gaps are filled in first, the image becomes one dense segment """
+
+        if self.__starts != [0] or len(self.__segments[0]) != self.__length:
+            self.__segments = [self.read(0, self.__length)]
+            self.__starts = [0]
+        return memoryview(self.__segments[0])
+
+    def to_lines(self) -> list:
+        """ convert every word to a 32bit '0'/'1' machine-code line """
+
+        lines = []
+        position = 0
+        for start, words in zip(self.__starts, self.__segments):
+            lines.extend(repeat(ZERO_LINE, start - position))
+            lines.extend(["{:032b}".format(word) for word in words])
+            position = start + len(words)
+        lines.extend(repeat(ZERO_LINE, self.__length - position))
+        return lines
+
+    def __len__(self):
+        return self.__length
+
+    def __iter__(self):
+        position = 0
+        for start, words in zip(self.__starts, self.__segments):
+            yield from repeat(0, start - position)
+            yield from words
+            position = start + len(words)
+        yield from repeat(0, self.__length - position)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.__length)
+            if step == 1:
+                return self.read(start, max(start, stop))
+            return array(TYPECODE, (self[i] for i in range(start, stop, step)))
+
+        index = self.__index(index)
+        i = bisect_right(self.__starts, index) - 1
+        if i >= 0 and index < self.__starts[i] + len(self.__segments[i]):
+            return self.__segments[i][index - self.__starts[i]]
+        return 0
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.__length)
+            value = array(TYPECODE, value)
+            if step != 1 or len(value) != max(0, stop - start):
+                raise ValueError('image slices can not change the image size')
+            self.write(start, value)
+            return
+
+        index = self.__index(index)
+        value &= WORD_MASK
+        i = bisect_right(self.__starts, index) - 1
+        if i >= 0 and index < self.__starts[i] + len(self.__segments[i]):
+            self.__segments[i][index - self.__starts[i]] = value
+        else:
+            self.write(index, (value,))
+
+    def __index(self, index):
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError('image index out of range')
+        return index
+
+    def __eq__(self, other):
+        if not isinstance(other, MachineImage):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        return all(
+            image.read(address // WORD_SIZE, address // WORD_SIZE + len(words)) == words
+            for first, image in ((self, other), (other, self))
+            for address, words in first.segments()
+        )
+
+    def __repr__(self):
+        return "MachineImage({length} words, {count} segments)".format(
+            length=self.__length, count=len(self.__segments))
@@ -0,0 +1,13 @@
+"""
+Linker
+
+ObjectModule.assemble(input_file, commands, registers)
+assemble code into a relocatable object module with sections,
+exported and imported symbols and relocation entries
+
+ObjectModule.load(path) / save(path)
+read and write object files
+
+Linker(commands, registers).link(modules)
+place the sections of object modules and patch their relocations
+"""
@@ -0,0 +1,113 @@
+""" Linker for relocatable object modules """
+
+import logging
+from collections import ChainMap
+from ..assembler.architecture import Architectures
+from ..assembler.assembler import Assembler, REG_SIZE, IMMEDIATE_MASK
+from ..image.machineimage import MachineImage
+
+
+class Linker:
+    """ Links object modules into one machine image
+
+    The sections of the first module keep the addresses they were
+    assembled for, so the program starts at its START directive and
+    stops at its END branch, wherever the image ends.
+    The sections of all further modules are placed one after another
+    behind the highest used address. Afterwards every relocation is
+    patched with the final address of its symbol. A module resolves
+    its own labels first, only labels imported by another module are
+    global and have to be unique.
+    """
+
+    def __init__(self, commands, registers):
+        self.__assembler = Assembler(Architectures.SINGLE)
+        self.__assembler.set_instructionset(commands, registers)
+
+    def link(self, modules):
+        """ returns the linked MachineImage and the global symboltable,
+        the addresses of all labels imported by another module """
+
+        if not modules:
+            raise Exception('Linker error. No object modules')
+        if modules[0].entry is None:
+            raise Exception('Linker error. The first module has no START directive')
+
+        bases = self.__place(modules)
+        symboltable = self.__symboltable(modules, bases)
+
+        size = max(
+            bases[m][s] + len(section.words) * REG_SIZE
+            for m, module in enumerate(modules)
+            for s, section in enumerate(module.sections)
+        )
+        machine_code = MachineImage.zeros(size // REG_SIZE)
+
+        for m, module in enumerate(modules):
+            for s, section in enumerate(module.sections):
+                index = bases[m][s] // REG_SIZE
+                machine_code[index:index + len(section.words)] = section.words
+
+            symbols = ChainMap(self.__addresses(module, bases[m]), symboltable)
+            for relocation in module.relocations:
+                address = bases[m][relocation.section] + relocation.offset * REG_SIZE
+                machine_code[address // REG_SIZE] |= self.__patch(relocation, address, symbols)
+
+        # branch from address zero to the first instruction of the first module
+        entry_section, entry_offset = modules[0].entry
+        entry = bases[0][entry_section] + entry_offset * REG_SIZE
+        machine_code[0] = self.__assembler.encode(
+            "BEQ R30,R30,{ADDRESS}".format(ADDRESS=entry // REG_SIZE - 1)).word
+
+        logging.debug("linked {count} modules, {size} bytes".format(count=len(modules), size=size))
+        return machine_code, symboltable
+
+    @staticmethod
+    def __place(modules):
+        """ returns the byte address of every section per module """
+
+        bases = []
+        next_address = REG_SIZE  # address zero holds the branch to the entry
+        for m, module in enumerate(modules):
+            addresses = []
+            for section in module.sections:
+                address = section.address if m == 0 else next_address
+                addresses.append(address)
+                next_address = max(next_address, address + len(section.words) * REG_SIZE)
+            bases.append(addresses)
+        return bases
+
+    @staticmethod
+    def __symboltable(modules, bases):
+        imported = set().union(*(module.imports() for module in modules))
+        symboltable = {}
+        for m, module in enumerate(modules):
+            for label, address in Linker.__addresses(module, bases[m]).items():
+                if label not in imported:
+                    continue  # local to the module
+                if label in symboltable:
+                    raise Exception('Linker error. Duplicate symbol: ' + label)
+                symboltable[label] = address
+        return symboltable
+
+    @staticmethod
+    def __addresses(module, bases):
+        """ returns the final address of every label defined in module """
+
+        return {
+            label: bases[section] + offset * REG_SIZE
+            for label, (section, offset) in module.symbols.items()
+        }
+
+    @staticmethod
+    def __patch(relocation, address, symboltable):
+        if relocation.symbol not in symboltable:
+            raise Exception('Linker error. Undefined symbol: ' + relocation.symbol)
+
+        target = symboltable[relocation.symbol]
+        if relocation.relative:
+            target = int((target - address - REG_SIZE) / REG_SIZE)
+
+        if not -2**15 <= target < 2**15:
+            raise Exception('Linker error. Symbol out of range: ' + relocation.symbol)
+        return target & IMMEDIATE_MASK
@@ -0,0 +1,148 @@
+""" Relocatable object module """
+
+import json
+from collections import namedtuple
+from super32utils.inout.fileio import FileIO
+from ..assembler.architecture import Architectures
+from ..assembler.assembler import Assembler, REG_SIZE
+from ..image.machineimage import MachineImage
+from ..preprocessor.preprocessor import Preprocessor
+
+OBJECT_FORMAT = 'super32-object'
+OBJECT_VERSION = 1
+
+# address is the byte address the section was assembled for, words a MachineImage
+Section = namedtuple('Section', ['address', 'words'])
+# section and offset (in words) of the instruction to patch with the address of symbol,
+# relative marks pc-relative branch targets
+Relocation = namedtuple('Relocation', ['section', 'offset', 'symbol', 'relative'])
+
+
+class ObjectModule:
+    """ Separately assembled module
+
+    Every ORG block is a section. Label operands are not resolved,
+    each of them is stored as relocation entry instead. Labels used
+    but not defined are imported from other modules, the labels defined
+    in the module stay local unless another module imports them.
+    Modules without START and END
+    are libraries, they hold no code, no END branch and no entry.
+    """
+
+    def __init__(self, sections, symbols, relocations, entry):
+        self.sections = sections        # list of Section
+        self.symbols = symbols          # label -> (section, offset)
+        self.relocations = relocations  # list of Relocation
+        self.entry = entry              # (section, offset) of the first instruction or None
+
+    @classmethod
+    def assemble(cls, input_file, commands, registers, preprocessor=None,
+                 directory=None) -> 'ObjectModule':
+        """ assembles code into an object module.
+        INCLUDE files are searched in directory """
+
+        preprocessor = preprocessor or Preprocessor()
+        assembler = Assembler(Architectures.SINGLE)
+        assembler.set_instructionset(commands, registers)
+
+        code_address, code, zeros_constants, symboltable, _ = preprocessor.parse(
+            input_file=input_file,
+            directory=directory,
+            library=True
+        )
+        sections = preprocessor.sections
+
+        bitcode = []
+        references = []
+        for line_nr, line in enumerate(code):
+            instruction = assembler.encode(line)
+            if instruction is None:
+                raise Exception('Parsing error')
+            bitcode.append(instruction.word)
+            if instruction.label is not None:
+                references.append((code_address + line_nr * REG_SIZE, instruction))
+
+        # code and the endless loop at the END directive, the branch from
+        # address zero to the first instruction is left to the linker
+        image = zeros_constants.copy()
+        if code_address is not None:
+            index = code_address // REG_SIZE
+            image[index:index + len(bitcode)] = bitcode
+            image[index + len(bitcode)] = assembler.encode('BEQ R30,R30,-1').word
+
+        symbols = {
+            label: cls.__locate(sections, address)
+            for label, address in symboltable.items()
+        }
+        relocations = [
+            Relocation(*cls.__locate(sections, address), instruction.label, instruction.relative)
+            for address, instruction in references
+        ]
+
+        return cls(
+            [
+                Section(address, MachineImage(
+                    image[address // REG_SIZE:(address + size) // REG_SIZE]))
+                for address, size in sections
+            ],
+            symbols,
+            relocations,
+            None if code_address is None else cls.__locate(sections, code_address)
+        )
+
+    def exports(self):
+        """ labels defined by this module, other modules may import them """
+
+        return set(self.symbols)
+
+    def imports(self):
+        """ labels used but not defined by this module """
+
+        return {relocation.symbol for relocation in self.relocations} - self.exports()
+
+    @classmethod
+    def load(cls, path) -> 'ObjectModule':
+        """ reads an object file """
+
+        data = FileIO.read_json(path)
+        if data.get('format') != OBJECT_FORMAT or data.get('version') != OBJECT_VERSION:
+            raise Exception('Linker error. Not a Super32 object file: ' + str(path))
+
+        return cls(
+            [
+                Section(section['address'], MachineImage(
+                    int(word, 16) for word in section['words']))
+                for section in data['sections']
+            ],
+            {label: tuple(location) for label, location in data['symbols'].items()},
+            [Relocation(*relocation) for relocation in data['relocations']],
+            None if data['entry'] is None else tuple(data['entry'])
+        )
+
+    def save(self, path):
+        """ writes an object file """
+
+        FileIO.write(path, json.dumps({
+            'format': OBJECT_FORMAT,
+            'version': OBJECT_VERSION,
+            'sections': [
+                {
+                    'address': section.address,
+                    'words': ["{:08X}".format(word) for word in section.words]
+                }
+                for section in self.sections
+            ],
+            'symbols': self.symbols,
+            'relocations': [list(relocation) for relocation in self.relocations],
+            'entry': None if self.entry is None else list(self.entry)
+        }))
+
+    @staticmethod
+    def __locate(sections, address):
+        """ returns section index and word offset of a module address """
+
+        for index, (section_address, size) in enumerate(sections):
+            if section_address <= address < section_address + size:
+                return index, (address - section_address) // REG_SIZE
+
+        raise Exception('Linker error. Address outside of any section: ' + str(address))
@@ -0,0 +1,24 @@
+"""
+PeepholeOptimizer
+
+__init__(commands)
+optimizer for the instruction set commands
+
+optimize(code_address, code, symboltable, editor_line_numbers=None)
+rewrites the code of the preprocessor before it is assembled,
+returns the code, the moved labels and editor line numbers
+
+removed_instructions / saved_cycles
+statistics of the last optimize call
+
+InstructionScheduler
+
+__init__(commands, latencies=None)
+scheduler for a pipeline with the given result latencies
+
+schedule(code_address, code, symboltable, editor_line_numbers=None)
+reorders independent instructions within basic blocks to hide stalls
+
+stalls_before / stalls_after
+stall cycles of the last schedule call
+"""
@@ -0,0 +1,226 @@
+""" Peephole optimizer module """
+
+import re
+from ..assembler.assembler import REG_SIZE
+
+# estimated cycles of the multi-cycle Super32 CPU per instruction
+CYCLES = {
+    'arithmetic': 4,
+    'branch': 3,
+    'LI': 4,
+    'LW': 5,
+    'SW': 4,
+}
+
+ZERO_REGISTER = 'R0'
+
+
+class PeepholeOptimizer:
+    """ Rewrites code between Preprocessor.parse and Assembler.parse
+
+    - branches to unconditional branches jump to the final target
+    - branches to the next instruction are removed
+    - adding or subtracting R0 into the same register is removed
+    - a LW repeating the previous LW of a basic block is removed
+      if neither a store nor a write to its registers came in between
+
+    Labels move with the instruction they mark, a removed instruction
+    passes its labels to the next one. Rewrites assuming R0 is zero are
+    skipped if the code writes R0. Data outside of the code is untouched.
+    """
+
+    def __init__(self, commands):
+        self.__arithmetic = set(commands['arithmetic'])
+        self.__storage = set(commands['storage'])
+        self.__branch = set(commands['branch'])
+        self.__tokenizer = re.compile(r"\s*[\s(),]\s*")
+
+        self.removed_instructions = 0
+        self.rewritten_branches = 0
+        self.saved_cycles = 0
+
+    def optimize(self, code_address, code, symboltable, editor_line_numbers=None):
+        """ returns the optimized code, symboltable and editor_line_numbers """
+
+        self.removed_instructions = 0
+        self.rewritten_branches = 0
+        self.saved_cycles = 0
+
+        end = code_address + len(code) * REG_SIZE
+        entries = [self.__entry(i, line, code_address, len(code), symboltable)
+                   for i, line in enumerate(code)]
+        # code index of every label inside the code, END included
+        labels = {
+            label: (address - code_address) // REG_SIZE
+            for label, address in symboltable.items()
+            if code_address <= address <= end and (address - code_address) % REG_SIZE == 0
+        }
+        zero = not any(self.__writes(entry) == ZERO_REGISTER for entry in entries)
+
+        changed = True
+        while changed:
+            self.__shorten_chains(entries)
+            removed = {
+                i for i, entry in enumerate(entries)
+                if self.__branches_to_next(i, entry) or (zero and self.__adds_zero(entry))
+            }
+            removed |= self.__reloads(entries, labels, removed)
+            changed = bool(removed)
+            if changed:
+                entries, labels = self.__remove(entries, labels, removed)
+
+        symboltable = dict(symboltable)
+        for label, index in labels.items():
+            symboltable[label] = code_address + index * REG_SIZE
+
+        if editor_line_numbers is not None:
+            editor_line_numbers = [editor_line_numbers[entry['index']] for entry in entries] \
+                + list(editor_line_numbers[len(code):])
+
+        return [self.__text(i, entry) for i, entry in enumerate(entries)], \
+            symboltable, editor_line_numbers
+
+    def __entry(self, index, line, code_address, length, symboltable):
+        tokens = self.__tokenizer.split(line + " ")[:-1]
+        # index is the position in the code given to optimize, target and
+        # label the code index and label operand of branches into the code
+        entry = {'text': line, 'tokens': tokens, 'index': index, 'target': None, 'label': None}
+        if tokens[0] not in self.__branch or len(tokens) != 4:
+            return entry
+
+        operand = tokens[3]
+        if self.__is_number(operand):
+            target = index + 1 + self.__number(operand)
+        elif operand in symboltable and (symboltable[operand] - code_address) % REG_SIZE == 0:
+            target = (symboltable[operand] - code_address) // REG_SIZE
+            entry['label'] = operand
+        else:
+            return entry
+
+        if 0 <= target <= length:  # END included
+            entry['target'] = target
+        else:
+            entry['label'] = None
+        return entry
+
+    def __shorten_chains(self, entries):
+        for entry in entries:
+            target, label = entry['target'], entry['label']
+            visited = set()  # a chain ending in a loop stops where it repeats
+            while target is not None and target < len(entries) and target not in visited \
+                    and self.__unconditional(entries[target]):
+                visited.add(target)
+                target, label = entries[target]['target'], entries[target]['label']
+            if target != entry['target']:
+                entry['target'], entry['label'] = target, label
+                self.rewritten_branches += 1
+                self.saved_cycles += CYCLES['branch'] * len(visited)
+
+    def __branches_to_next(self, index, entry):
+        if entry['target'] is None or entry['target'] != index + 1:
+            return False
+        self.saved_cycles += CYCLES['branch']
+        return True
+
+    def __adds_zero(self, entry):
+        tokens = entry['tokens']
+        if tokens[0] not in ('ADD', 'SUB', 'OR') or len(tokens) != 4:
+            return False
+        target, first, second = tokens[1:]
+        if not ((target == first and second == ZERO_REGISTER)
+                or (tokens[0] == 'ADD' and target == second and first == ZERO_REGISTER)):
+            return False
+        self.saved_cycles += CYCLES['arithmetic']
+        return True
+
+    def __reloads(self, entries, labels, removed):
+        """ indices of LW repeating the last LW of their basic block """
+
+        leaders = set(labels.values()) | {entry['target'] for entry in entries}
+        found = set()
+        loaded = set()  # (register, offset, base) of loads still valid
+        for i, entry in enumerate(entries):
+            if i in leaders:
+                loaded = set()
+            if i in removed:
+                continue
+
+            tokens = entry['tokens']
+            load = tuple(tokens[1:]) if tokens[0] == 'LW' and len(tokens) == 4 else None
+            if load in loaded:
+                found.add(i)
+                self.saved_cycles += CYCLES['LW']
+                continue
+            if tokens[0] == 'SW' or tokens[0] in self.__branch:
+                loaded = set()
+                continue
+
+            written = self.__writes(entry)
+            if written is not None:
+                loaded = {key for key in loaded if written not in (key[0], key[2])}
+            if load is not None and load[0] != load[2]:
+                loaded.add(load)
+        return found
+
+    def __remove(self, entries, labels, removed):
+        """ drops removed entries, targets and labels move to the next kept entry """
+
+        self.removed_instructions += len(removed)
+        index = {}
+        kept = 0
+        for i in range(len(entries) + 1):
+            index[i] = kept
+            if i not in removed:
+                kept += 1
+
+        remaining = []
+        for i, entry in enumerate(entries):
+            if i in removed:
+                continue
+            if entry['target'] is not None:
+                entry['target'] = index[entry['target']]
+            remaining.append(entry)
+
+        return remaining, {label: index[i] for label, i in labels.items()}
+
+    def __text(self, index, entry):
+        """ source text of an entry, label operands are kept """
+
+        tokens = entry['tokens']
+        if tokens[0] not in self.__branch or entry['target'] is None:
+            return entry['text']
+        if entry['label'] is not None:
+            target = entry['label']
+        else:
+            target = str(entry['target'] - index - 1)
+        return "{name} {rt},{rs},{target}".format(
+            name=tokens[0], rt=tokens[1], rs=tokens[2], target=target)
+
+    def __unconditional(self, entry):
+        tokens = entry['tokens']
+        return tokens[0] in self.__branch and len(tokens) == 4 and tokens[1] == tokens[2] \
+            and entry['target'] is not None
+
+    def __writes(self, entry):
+        """ register written by an instruction or None """
+
+        tokens = entry['tokens']
+        if len(tokens) != 4 or tokens[0] in self.__branch or tokens[0] == 'SW':
+            return None
+        if tokens[0] in self.__arithmetic or tokens[0] in self.__storage:
+            return tokens[1]
+        return None
+
+    @staticmethod
+    def __is_number(s):
+        if s.startswith('$'):
+            return True
+        try:
+            int(s)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def __number(s):
+        return int(s[1:], 16) if s.startswith('$') else int(s)
@@ -0,0 +1,204 @@
+""" Instruction scheduler module """
+
+import re
+from ..assembler.assembler import REG_SIZE
+from ..assembler.instructionset import InstructionSet
+
+# cycles until the result of an instruction can be used by the next one,
+# looked up by instruction name first, then by instruction group
+LATENCIES = {
+    'arithmetic': 1,
+    'storage': 1,
+    'branch': 1,
+    'LW': 2,
+}
+
+
+class InstructionScheduler:
+    """ Reorders instructions within basic blocks to hide pipeline stalls
+
+    An in-order pipeline stalls an instruction until the results it reads
+    are available, the latency table defines when that is. Instructions of
+    a basic block are list scheduled: read-after-write, write-after-read and
+    write-after-write dependencies are kept, as well as the order of memory
+    accesses that might alias. Two accesses only pass each other if they use
+    the same unchanged base register with different offsets. Branches stay
+    at the end of their block, labels and targets of numeric branches at its
+    start, so no address used by a branch changes.
+    """
+
+    def __init__(self, commands, latencies=None):
+        self.__groups = InstructionSet.of(commands).groups
+        self.__latencies = dict(LATENCIES, **(latencies or {}))
+        self.__tokenizer = re.compile(r"\s*[\s(),]\s*")
+
+        self.stalls_before = 0
+        self.stalls_after = 0
+
+    def schedule(self, code_address, code, symboltable, editor_line_numbers=None):
+        """ returns the reordered code, symboltable and editor_line_numbers """
+
+        instructions = [self.__instruction(i, line, symboltable) for i, line in enumerate(code)]
+        blocks = self.__blocks(instructions, code_address, symboltable)
+
+        order = []
+        self.stalls_before = 0
+        self.stalls_after = 0
+        for block in blocks:
+            scheduled = self.__list_schedule(block)
+            self.stalls_before += self.stalls(block)
+            self.stalls_after += self.stalls(scheduled)
+            order.extend(scheduled)
+
+        if editor_line_numbers is not None:
+            editor_line_numbers = [
+                editor_line_numbers[instruction['index']] for instruction in order
+            ] + list(editor_line_numbers[len(code):])
+
+        code = [instruction['text'] for instruction in order]
+        return code, dict(symboltable), editor_line_numbers
+
+    def stalls(self, block) -> int:
+        """ stall cycles of a block of instructions issued in order """
+
+        cycle = 0
+        stalls = 0
+        ready = {}  # register -> first cycle its value can be read
+        for instruction in block:
+            issue = max([cycle] + [ready.get(register, 0) for register in instruction['reads']])
+            stalls += issue - cycle
+            cycle = issue + 1
+            if instruction['writes'] is not None:
+                ready[instruction['writes']] = issue + instruction['latency']
+        return stalls
+
+    def __instruction(self, index, line, symboltable):
+        tokens = self.__tokenizer.split(line + " ")[:-1]
+        name = tokens[0]
+        group = self.__groups.get(name)
+        instruction = {
+            'index': index,
+            'text': line,
+            'group': group,
+            'reads': (),
+            'writes': None,
+            'memory': None,  # (base register, offset or None) of loads and stores
+            'store': name == 'SW',
+            'target': None,  # code index of numeric branch targets
+            'latency': self.__latencies.get(name, self.__latencies.get(group, 1)),
+        }
+        if len(tokens) != 4 or group is None:
+            instruction['group'] = 'branch'  # unknown lines keep their place
+            return instruction
+
+        if group == 'arithmetic':
+            instruction['reads'] = (tokens[2], tokens[3])
+            instruction['writes'] = tokens[1]
+        elif group == 'branch':
+            instruction['reads'] = (tokens[1], tokens[2])
+            if tokens[3] not in symboltable:
+                offset = self.__offset(tokens[3], {})
+                if offset is not None:
+                    instruction['target'] = index + 1 + offset
+        elif name == 'SW':
+            instruction['reads'] = (tokens[1], tokens[3])
+            instruction['memory'] = (tokens[3], self.__offset(tokens[2], symboltable))
+        else:
+            instruction['reads'] = (tokens[3],)
+            instruction['writes'] = tokens[1]
+            if name == 'LW':
+                instruction['memory'] = (tokens[3], self.__offset(tokens[2], symboltable))
+        return instruction
+
+    @staticmethod
+    def __blocks(instructions, code_address, symboltable):
+        """ splits instructions after branches and in front of labels and branch targets """
+
+        leaders = {
+            (address - code_address) // REG_SIZE for address in symboltable.values()
+            if (address - code_address) % REG_SIZE == 0
+        }
+        leaders |= {
+            instruction['target'] for instruction in instructions
+            if instruction['target'] is not None
+        }
+        blocks = []
+        block = []
+        for instruction in instructions:
+            if instruction['index'] in leaders and block:
+                blocks.append(block)
+                block = []
+            block.append(instruction)
+            if instruction['group'] == 'branch':
+                blocks.append(block)
+                block = []
+        if block:
+            blocks.append(block)
+        return blocks
+
+    def __list_schedule(self, block):
+        """ issues the ready instruction whose operands are available first,
+        ties prefer the longest path to the end of the block, then the source order """
+
+        predecessors = {i: set() for i in range(len(block))}
+        for i, instruction in enumerate(block):
+            for j in range(i):
+                if self.__depends(block[j], instruction, block[j + 1:i]):
+                    predecessors[i].add(j)
+            if instruction['group'] == 'branch':
+                predecessors[i] = set(range(i))
+
+        successors = {i: [] for i in range(len(block))}
+        for i, preds in predecessors.items():
+            for j in preds:
+                successors[j].append(i)
+        height = {}
+        for i in reversed(range(len(block))):
+            height[i] = block[i]['latency'] + max([height[k] for k in successors[i]], default=0)
+
+        scheduled = []
+        done = set()
+        cycle = 0
+        ready = {}  # register -> first cycle its value can be read
+        while len(scheduled) < len(block):
+            issues = {
+                i: max([cycle] + [ready.get(register, 0) for register in block[i]['reads']])
+                for i in range(len(block)) if i not in done and predecessors[i] <= done
+            }
+            i = min(issues, key=lambda i: (issues[i], -height[i], i))
+            cycle = issues[i] + 1
+            if block[i]['writes'] is not None:
+                ready[block[i]['writes']] = issues[i] + block[i]['latency']
+            done.add(i)
+            scheduled.append(block[i])
+        return scheduled
+
+    @staticmethod
+    def __depends(first, second, between):
+        """ True if second has to stay behind first """
+
+        if first['writes'] is not None and (
+                first['writes'] in second['reads'] or first['writes'] == second['writes']):
+            return True
+        if second['writes'] is not None and second['writes'] in first['reads']:
+            return True
+        if first['memory'] is None or second['memory'] is None:
+            return False
+        if not (first['store'] or second['store']):
+            return False
+
+        # accesses relative to the same unchanged base never alias
+        # if their offsets are at least one word apart
+        (base, offset), (other_base, other_offset) = first['memory'], second['memory']
+        same_base = base == other_base and all(i['writes'] != base for i in between)
+        return not (same_base and offset is not None and other_offset is not None
+                    and abs(offset - other_offset) >= REG_SIZE)
+
+    @staticmethod
+    def __offset(operand, symboltable):
+        if operand in symboltable:
+            return symboltable[operand]
+        try:
+            return int(operand[1:], 16) if operand.startswith('$') else int(operand)
+        except ValueError:
+            return None
@@ -10,12 +10,19 @@ class AssemblerDirectives(Enum):
     END = auto()
     ORG = auto()
     DEFINE = auto()
+    INCLUDE = auto()
+
+    @classmethod
+    def lookup(cls, name):
+        """ returns the directive called name or None """
+        return cls.__members__.get(name)
 
     @classmethod
     def to_string(cls):
-        return "{START},{END},{ORG},{DEFINE}".format(
+        return "{START},{END},{ORG},{DEFINE},{INCLUDE}".format(
             START=cls.START.name,
             END=cls.END.name,
             ORG=cls.ORG.name,
-            DEFINE=cls.DEFINE.name
+            DEFINE=cls.DEFINE.name,
+            INCLUDE=cls.INCLUDE.name
         )
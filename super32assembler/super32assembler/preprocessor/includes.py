@@ -0,0 +1,165 @@
+"""
+Include Files
+"""
+
+import json
+import logging
+import os
+import re
+from collections import namedtuple
+from super32utils.inout.fileio import FileIO
+from ..cache.assemblycache import AssemblyCache
+from .asmdirectives import AssemblerDirectives
+
+INCLUDE = re.compile(r'^INCLUDE\s+"([^"]+)"$')
+
+# lines are the stripped code lines with nested includes expanded,
+# dependencies maps the path of every file read for them to its stamp
+IncludeUnit = namedtuple('IncludeUnit', ['lines', 'dependencies'])
+
+# path -> IncludeUnit, shared by all preprocessors of the process
+_UNITS = {}
+
+
+class IncludeResolver:
+    """ Replaces INCLUDE "file" directives by the code of the file
+
+    Files are searched in the directory of the including file first,
+    then in include_paths. Parsed files are cached by path, modification
+    time and size within the process and, if a cache is given, on disk.
+    A cached file is reused as long as none of the files it includes changed.
+    """
+
+    def __init__(self, include_paths=(), cache=None):
+        self.include_paths = list(include_paths)
+        self.cache = cache  # AssemblyCache or None
+
+    def expand(self, file_stripped, directory=None, dependencies=None):
+        """ yields the (line, line_number) tuples of file_stripped with INCLUDE
+        lines replaced by the included code. included lines get the line number
+        of their INCLUDE directive. the stamps of all included files are added
+        to dependencies
+        """
+
+        for line, line_number in file_stripped:
+            name = self.__name(line)
+            if name is None:
+                yield line, line_number
+                continue
+
+            unit = self.__unit(self.__find(name, directory), ())
+            if dependencies is not None:
+                dependencies.update(unit.dependencies)
+            for included in unit.lines:
+                yield included, line_number
+
+    def dependencies(self, input_file, directory=None):
+        """ returns the paths of all files included by input_file """
+
+        dependencies = {}
+        for _ in self.expand(
+                ((str.strip(line), i) for i, line in enumerate(input_file) if str.strip(line)),
+                directory, dependencies):
+            pass
+        return list(dependencies)
+
+    @staticmethod
+    def stamp(path):
+        """ modification time and size of a file, None if it is gone """
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def __unit(self, path, stack):
+        if path in stack:
+            raise Exception('Preprocessor error. Recursive include: ' +
+                            ' -> '.join(stack + (path,)))
+
+        unit = self.__cached(path)
+        if unit is not None and not set(stack) & unit.dependencies.keys():
+            return unit
+
+        lines = []
+        dependencies = {path: self.stamp(path)}
+        for line in FileIO.read_code(path):
+            line = str.strip(line)
+            if not line or line.startswith("'"):
+                continue
+
+            name = self.__name(line)
+            if name is None:
+                lines.append(line)
+                continue
+
+            included = self.__unit(self.__find(name, os.path.dirname(path)), stack + (path,))
+            lines.extend(included.lines)
+            dependencies.update(included.dependencies)
+
+        unit = IncludeUnit(lines, dependencies)
+        _UNITS[path] = unit
+        if self.cache is not None:
+            self.cache.write(self.__key(path, dependencies[path]), json.dumps(unit).encode('utf-8'))
+
+        return unit
+
+    def __cached(self, path):
+        """ returns the cached unit of path if none of its files changed """
+
+        unit = _UNITS.get(path)
+        if unit is not None and self.__valid(unit):
+            return unit
+
+        if self.cache is None:
+            return None
+
+        key = self.__key(path, self.stamp(path))
+        data = self.cache.read(key)
+        if data is None:
+            return None
+
+        try:
+            unit = IncludeUnit(*json.loads(data.decode('utf-8')))
+        except (ValueError, TypeError):
+            logging.warning("discarding corrupt include cache entry: {path}".format(path=path))
+            self.cache.discard(key)
+            return None
+
+        if not self.__valid(unit):
+            return None
+
+        logging.debug("include cache hit: {path}".format(path=path))
+        _UNITS[path] = unit
+        return unit
+
+    def __valid(self, unit):
+        return all(
+            self.stamp(path) == stamp for path, stamp in unit.dependencies.items()
+        )
+
+    def __find(self, name, directory):
+        directories = ([directory] if directory else []) + self.include_paths + ['.']
+        for base in directories:
+            path = os.path.join(base, name)
+            if os.path.isfile(path):
+                return os.path.realpath(path)
+
+        raise Exception('Preprocessor error. Include file not found: ' + name)
+
+    @staticmethod
+    def __key(path, stamp):
+        return AssemblyCache.key('include', path, json.dumps(stamp))
+
+    @staticmethod
+    def __name(line):
+        """ returns the file name of an INCLUDE directive or None """
+
+        if line.split()[0] != AssemblerDirectives.INCLUDE.name:
+            return None
+
+        match = INCLUDE.match(line)
+        if match is None:
+            raise Exception('Preprocessor error. Invalid INCLUDE directive: ' + line)
+        return match.group(1)
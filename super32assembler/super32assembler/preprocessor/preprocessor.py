@@ -3,146 +3,135 @@ Preprocessor Module
 """
 
 import logging
-from bitstring import Bits
 from .asmdirectives import AssemblerDirectives
-from collections import OrderedDict
-from typing import List
+from .includes import IncludeResolver
+from ..image.machineimage import MachineImage
 
 REG_SIZE = 4  # bytes
-ZEROS = "{:032b}".format(0)
 
+ORG = AssemblerDirectives.ORG
+START = AssemblerDirectives.START
+END = AssemblerDirectives.END
+DEFINE = AssemblerDirectives.DEFINE
 
-class Preprocessor:
-    """Preprocessor class"""
-
-    def __init__(self):
-        self.__symboltable = {}
-
-    def parse(self, input_file):
-        """method to parse assembler directives inside assembler code"""
-
-        # Create tuples to map code lines to machine code address
-        # Remove empty lines, comments and leading white space
-        file_stripped = [(str.strip(input_file[i]), i)
-                         for i in range(0, len(input_file))
-                         if str.strip(input_file[i])
-                         and not str(input_file[i]).lstrip().startswith("'")]
-
-        # store labels + address in symboltable-dictionary
-        file_without_labels = self.__generate_symboltable(file_stripped)
-
-        # generate storage dump with zeros from first to last address
-        file_no_numbers = [line[0] for line in file_without_labels]
-        zeros = self.__generate_zeros(file_no_numbers)
-
-        # parse assembler directives, insert constants
-        # and search codes startaddress
-        code_address, zeros_constants = self.__parse_assembler_directives(file_no_numbers, zeros)
-
-        # filter assembler code
-        start, end = self.__filter_code(file_no_numbers)
 
-        code = [line[0] for line in file_without_labels[start:end]]
-        editor_line_numbers = [line[1] for line in file_without_labels[start:end + 1]]
-
-        return code_address, code, zeros_constants, self.__symboltable, editor_line_numbers
-
-    def __generate_symboltable(self, code: List) -> List:
-        """ builds a dictionary within keys are the lables
-        and values are the labels address.
-        returns code without labels."""
+class Preprocessor:
+    """Preprocessor class
+
+    Parses the code in a single pass. Every statement moves the current
+    address and is added to the symboltable, the sections and the code
+    at once, so only the output is kept in memory.
+    """
+
+    def __init__(self, include_paths=(), cache=None):
+        self.__includes = IncludeResolver(include_paths, cache)
+        # (address, size) of every ORG block, filled by parse
+        self.sections = []
+        # paths of all included files, filled by parse
+        self.includes = []
+
+    def parse(self, input_file, directory=None, library=False):
+        """method to parse assembler directives inside assembler code.
+        INCLUDE files are searched in directory first. A library may
+        have neither START nor END, its code_address is None then"""
+
+        symboltable = {}
+        constants = []  # (address, value) of every DEFINE directive
+        sections = [[0, 0]]  # [address, size] of every ORG block
+        code = []
+        editor_line_numbers = []
+        dependencies = {}
 
-        code_without_lables = []
         address = 0
-
-        for i in code:
-            line = i[0]
-            line_number = i[1]
-            label_code = line.split(':')
-            label = label_code[0]
-            is_symbol = len(label) != len(line)
-            instruction = label_code.pop().strip()
-
-            code_without_lables.append(tuple([instruction, line_number]))
-
-            if is_symbol:
-                self.__symboltable[label] = address
+        code_address = None
+        org_found, after_org, in_code, end_found = False, False, False, False
+
+        for label, tokens, line, line_number in self.__statements(
+                input_file, directory, dependencies):
+            if label:
+                if label in symboltable:
+                    raise Exception('Preprocessor error. Duplicate label: ' + label)
+                symboltable[label] = address
+
+            if not tokens:
+                continue  # a label on its own marks the next statement
+
+            if in_code:
+                # everything between START and END is assembler code
+                editor_line_numbers.append(line_number)
                 address += REG_SIZE
-            else:
-                tokens = instruction.split(' ')
-                asm_directive = tokens[0]
-                if asm_directive in AssemblerDirectives.to_string():
-                    if asm_directive == AssemblerDirectives.ORG.name:
-                        address = self.__hex_to_decimal(tokens[1])
+                sections[-1][1] += REG_SIZE
+                if tokens[0] == END.name:
+                    in_code, end_found = False, True
                 else:
-                    address += REG_SIZE
+                    code.append(line)
+                continue
 
-        return code_without_lables
-
-    def __generate_zeros(self, input_file):
-        org_found = False
-        max_address = 0
-
-        # Calculate max address
-        for line in input_file:
-            tokens = line.split(' ')
-            if tokens[0] == AssemblerDirectives.ORG.name:
-                # Move the current address according to the ORG directive
-                max_address = self.__hex_to_decimal(tokens[1])
+            directive = AssemblerDirectives.lookup(tokens[0])
+            if directive is ORG:
+                address = self.__hex_to_decimal(self.__operand(tokens))
+                sections.append([address, 0])
                 org_found = True
-            elif not tokens[0] == AssemblerDirectives.START.name:
-                # Allocate 4 bytes for each command (except START directive)
-                max_address = max_address + REG_SIZE
+            elif directive is START:
+                if after_org and code_address is None:
+                    code_address = address
+                    in_code = True
+            else:
+                if directive is DEFINE:
+                    constant = self.__hex_to_decimal(self.__operand(tokens))
+                    if not -2**31 <= constant < 2**31:
+                        raise Exception(
+                            'Preprocessor error. Constant out of range: ' + tokens[1])
+                    constants.append((address, constant))
+                address += REG_SIZE
+                sections[-1][1] += REG_SIZE
+
+            after_org = directive is ORG
 
         if not org_found:
             raise Exception('Code has to start with ORG-directive')
+        if (code_address is None or not end_found) and not (library and code_address is None):
+            raise Exception(
+                'Preprocessor error. Missing START- and/or END-directive')
 
-        return [ZEROS for address in range(
-            0,
-            max_address
-        ) if not address % REG_SIZE]
+        self.sections = [(start, size) for start, size in sections if size]
+        self.includes = list(dependencies)
 
-    def __parse_assembler_directives(self, input_file, zeros):
-        zeros_constants = zeros[:]
-        address = 0
-        code_address = 0
-        org = False
-        start, end = False, False
-
-        for line in input_file:
-            tokens = line.split(' ')
-            asm_directive = tokens[0]
-            if tokens[0] in AssemblerDirectives.to_string():
-                if asm_directive == AssemblerDirectives.ORG.name:
-                    address = self.__hex_to_decimal(tokens[1])
-                    org = True
-                elif asm_directive == AssemblerDirectives.DEFINE.name:
-                    constant = self.__hex_to_decimal(tokens[1])
-                    constant_bin = Bits(int=constant, length=32).bin
-                    index = int(address / REG_SIZE)
-                    zeros_constants[index] = constant_bin
-                    address = address + REG_SIZE
-                    org = False
-                elif asm_directive == AssemblerDirectives.START.name:
-                    if org:
-                        start = True
-                        code_address = address
-                elif asm_directive == AssemblerDirectives.END.name:
-                    end = True
-                else:
-                    pass  # assembler code
+        # storage dump with zeros from first to last address and the constants
+        max_address = max(start + size for start, size in sections)
+        zeros_constants = MachineImage.zeros(-(-max_address // REG_SIZE))
+        for constant_address, constant in constants:
+            zeros_constants[constant_address // REG_SIZE] = constant
 
-        if not start or not end:
-            raise Exception(
-                'Preprocessor error. Missing START- and/or END-directive')
-        return code_address, zeros_constants
+        logging.debug("preprocessed {count} lines of code".format(count=len(code)))
+
+        return code_address, code, zeros_constants, symboltable, editor_line_numbers
 
-    def __filter_code(self, input_file):
-        start_index = input_file.index(
-            AssemblerDirectives.START.name) + 1
-        end_index = input_file.index(AssemblerDirectives.END.name)
+    def __statements(self, input_file, directory, dependencies):
+        """ yields label, tokens, instruction and editor line number of every statement.
+        empty lines and comments are skipped, INCLUDE directives expanded """
 
-        return start_index, end_index
+        lines = (
+            (str.strip(line), line_number)
+            for line_number, line in enumerate(input_file)
+        )
+        lines = (
+            (line, line_number)
+            for line, line_number in lines
+            if line and not line.startswith("'")
+        )
+
+        for line, line_number in self.__includes.expand(lines, directory, dependencies):
+            label_code = line.split(':')
+            label = label_code[0].strip() if len(label_code) > 1 else None
+            instruction = label_code[-1].strip()
+            yield label, instruction.split(), instruction, line_number
+
+    @staticmethod
+    def __operand(tokens):
+        if len(tokens) != 2:
+            raise Exception('Preprocessor error. Invalid directive: ' + ' '.join(tokens))
+        return tokens[1]
 
     @staticmethod
     def __hex_to_decimal(number: str) -> int:
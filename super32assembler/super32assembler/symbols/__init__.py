@@ -0,0 +1,15 @@
+"""
+SymbolIndex
+
+__init__(symboltable)
+sorts the labels of a symbol table by address, built once per assembly
+
+lookup(address)
+returns (symbol, offset) of the closest label at or below address or None
+
+format(address)
+renders an address as 'label+offset' or as hex number without a label
+
+symbolize(addresses)
+formats many addresses, e.g. of a trace
+"""
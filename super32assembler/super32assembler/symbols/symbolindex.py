@@ -0,0 +1,55 @@
+""" Address to symbol index module """
+
+from bisect import bisect_right
+
+
+class SymbolIndex:
+    """ Reverse index of a symbol table
+
+    Labels are sorted by address, an address is resolved to the closest
+    label at or below it with a binary search. Labels sharing an address
+    resolve to the alphabetically first one.
+    """
+
+    def __init__(self, symboltable: dict):
+        entries = sorted((address, symbol) for symbol, address in symboltable.items())
+        self.__addresses = []
+        self.__symbols = []
+        for address, symbol in entries:
+            if self.__addresses and self.__addresses[-1] == address:
+                continue
+            self.__addresses.append(address)
+            self.__symbols.append(symbol)
+
+    def lookup(self, address: int):
+        """ returns (symbol, offset) of the label at or below address,
+        None if address lies in front of all labels """
+
+        i = bisect_right(self.__addresses, address) - 1
+        if i < 0:
+            return None
+        return self.__symbols[i], address - self.__addresses[i]
+
+    def format(self, address: int) -> str:
+        """ 'label', 'label+offset' or '$hex' if no label precedes address """
+
+        i = bisect_right(self.__addresses, address) - 1
+        return self.__format(address, i)
+
+    def symbolize(self, addresses) -> list:
+        """ formats every address, see format() """
+
+        addresses_ = self.__addresses
+        return [self.__format(address, bisect_right(addresses_, address) - 1)
+                for address in addresses]
+
+    def __format(self, address, i):
+        if i < 0:
+            return "${:X}".format(address)
+        offset = address - self.__addresses[i]
+        if offset == 0:
+            return self.__symbols[i]
+        return "{symbol}+{offset}".format(symbol=self.__symbols[i], offset=offset)
+
+    def __len__(self):
+        return len(self.__addresses)
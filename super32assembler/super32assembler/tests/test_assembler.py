@@ -4,6 +4,7 @@ import pytest
 
 from super32assembler.assembler.assembler import Assembler
 from super32assembler.assembler.architecture import Architectures
+from super32assembler.assembler.instructionset import InstructionSet
 from super32assembler.preprocessor.preprocessor import Preprocessor
 
 
@@ -23,10 +24,14 @@ CFG = json.loads(JSON_STRING)
 ASSEMBLER = Assembler(Architectures.SINGLE)
 PREPROCESSOR = Preprocessor()
 
+# synthetic branches to the code start address and at the end of the code
+START = '00010011110111100000000000000000'
+END = '00010011110111101111111111111111'
+
 
 def test_parse_add():
     fake_input_file = ['ORG 4', 'START', 'ADD R1,R20,R12', 'END']
-    code_address, code, zeros_constants, symboltable = PREPROCESSOR.parse(
+    code_address, code, zeros_constants, symboltable, _ = PREPROCESSOR.parse(
         fake_input_file)
     result = ASSEMBLER.parse(
         code_address=code_address,
@@ -37,15 +42,16 @@ def test_parse_add():
         symboltable=symboltable
     )
 
-    assert result == [
-        '00010000010000010000000000000000',
-        '00000010100011000000100000000000'
+    assert result.to_lines() == [
+        START,
+        '00000010100011000000100000000000',
+        END
     ]
 
 
 def test_parse_sub():
     fake_input_file = ['ORG 4', 'START', 'SUB R2,R1,R4', 'END']
-    code_address, code, zeros_constants, symboltable = PREPROCESSOR.parse(
+    code_address, code, zeros_constants, symboltable, _ = PREPROCESSOR.parse(
         fake_input_file)
     result = ASSEMBLER.parse(
         code_address=code_address,
@@ -56,15 +62,16 @@ def test_parse_sub():
         symboltable=symboltable
     )
 
-    assert result == [
-        '00010000010000010000000000000000',
-        '00000000001001000001000000000010'
+    assert result.to_lines() == [
+        START,
+        '00000000001001000001000000000010',
+        END
     ]
 
 
 def test_parse_lw():
     fake_input_file = ['ORG 4', 'START', 'LW R1,0(R2)', 'END']
-    code_address, code, zeros_constants, symboltable = PREPROCESSOR.parse(
+    code_address, code, zeros_constants, symboltable, _ = PREPROCESSOR.parse(
         fake_input_file)
     result = ASSEMBLER.parse(
         code_address=code_address,
@@ -75,15 +82,16 @@ def test_parse_lw():
         symboltable=symboltable
     )
 
-    assert result == [
-        '00010000010000010000000000000000',
-        '10001100010000010000000000000000'
+    assert result.to_lines() == [
+        START,
+        '10001100010000010000000000000000',
+        END
     ]
 
 
 def test_parse_sw():
     fake_input_file = ['ORG 4', 'START', 'SW R1,0(R2)', 'END']
-    code_address, code, zeros_constants, symboltable = PREPROCESSOR.parse(
+    code_address, code, zeros_constants, symboltable, _ = PREPROCESSOR.parse(
         fake_input_file)
     result = ASSEMBLER.parse(
         code_address=code_address,
@@ -94,15 +102,16 @@ def test_parse_sw():
         symboltable=symboltable
     )
 
-    assert result == [
-        '00010000010000010000000000000000',
-        '10101100010000010000000000000000'
+    assert result.to_lines() == [
+        START,
+        '10101100010000010000000000000000',
+        END
     ]
 
 
 def test_parse_beq_imm():
     fake_input_file = ['ORG 4', 'START', 'BEQ R1,R2,0', 'END']
-    code_address, code, zeros_constants, symboltable = PREPROCESSOR.parse(
+    code_address, code, zeros_constants, symboltable, _ = PREPROCESSOR.parse(
         fake_input_file)
     result = ASSEMBLER.parse(
         code_address=code_address,
@@ -113,12 +122,58 @@ def test_parse_beq_imm():
         symboltable=symboltable
     )
 
-    assert result == [
+    assert result.to_lines() == [
+        START,
         '00010000010000010000000000000000',
-        '00010000010000010000000000000000'
+        END
     ]
 
 
 def test_parse_beq_label():
     # TODO: Test parse branch with label
     pass
+
+
+def test_parse_multi_separates_data():
+    fake_input_file = ['ORG 4', 'num: DEFINE 5', 'ORG 8', 'START', 'LW R1,num(R0)', 'END']
+    code_address, code, zeros_constants, symboltable, _ = PREPROCESSOR.parse(
+        fake_input_file)
+    result = Assembler(Architectures.MULTI).parse(
+        code_address=code_address,
+        code=code,
+        zeros_constants=zeros_constants,
+        commands=CFG['commands'],
+        registers=CFG['registers'],
+        symboltable=symboltable
+    )
+
+    # instruction memory keeps the addresses of the single architecture
+    assert result.to_lines() == [
+        '00010011110111100000000000000001',
+        '00000000000000000000000000000000',
+        '10001100000000010000000000000100',
+        END
+    ]
+    assert zeros_constants[1] == 5
+    assert zeros_constants[2] == 0
+
+
+def test_data_after_end_is_kept():
+    fake_input_file = ['ORG 4', 'START', 'ADD R1,R2,R3', 'END', 'ORG 40', 'DEFINE 1']
+    code_address, code, zeros_constants, symboltable, _ = PREPROCESSOR.parse(
+        fake_input_file)
+    result = Assembler(Architectures.SINGLE).parse(
+        code_address=code_address,
+        code=code,
+        zeros_constants=zeros_constants,
+        commands=CFG['commands'],
+        registers=CFG['registers'],
+        symboltable=symboltable
+    )
+    instructionset = InstructionSet.of(CFG['commands'], CFG['registers'])
+
+    # END directly follows the code, programs stop at it instead of the last word
+    assert len(result) == 11
+    assert result.to_lines()[2] == END
+    assert [i for i, word in enumerate(result) if instructionset.halts(word)] == [2]
+    assert result[10] == 1
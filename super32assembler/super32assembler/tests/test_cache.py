@@ -0,0 +1,68 @@
+""" assembly cache tests """
+import os
+
+from super32assembler.cache.assemblycache import AssemblyCache
+from super32assembler.image.machineimage import MachineImage
+
+
+def test_key_depends_on_every_part():
+    key = AssemblyCache.key(b'ADD R1,R2,R3', b'{}', 'SINGLE')
+
+    assert key == AssemblyCache.key(b'ADD R1,R2,R3', b'{}', 'SINGLE')
+    assert key != AssemblyCache.key(b'ADD R1,R2,R3', b'{}', 'MULTI')
+    assert key != AssemblyCache.key(b'ADD R1,R2,R', b'3{}', 'SINGLE')
+
+
+def test_roundtrip(tmp_path):
+    cache = AssemblyCache(str(tmp_path))
+    images = [MachineImage([1, 0xFFFFFFFF]), MachineImage()]
+    cache.put('ab12', images)
+
+    assert cache.get('ab12') == images
+    assert cache.get('cd34') is None
+
+
+def test_corrupt_entries_are_discarded(tmp_path):
+    cache = AssemblyCache(str(tmp_path))
+    cache.put('ab12', [MachineImage([1, 2])])
+    path = tmp_path / 'ab' / '12.img'
+    path.write_bytes(path.read_bytes()[:-2])
+
+    assert cache.get('ab12') is None
+    assert not path.exists()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # image count, length, segment count, segment start and size, 4 words
+    cache = AssemblyCache(str(tmp_path), max_size=2 * (4 + 8 + 8 + 4 * 4))
+    image = MachineImage([1, 2, 3, 4])
+    cache.put('aa00', [image])
+    cache.put('bb00', [image])
+    os.utime(str(tmp_path / 'aa' / '00.img'), (0, 0))
+    os.utime(str(tmp_path / 'bb' / '00.img'), (1, 1))
+    cache.get('aa00')
+    cache.put('cc00', [image])
+
+    assert cache.get('aa00') is not None
+    assert cache.get('bb00') is None
+    assert cache.get('cc00') is not None
+
+
+def test_failed_writes_are_ignored(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    cache = AssemblyCache(str(blocker / 'cache'))
+    cache.put('ab12', [MachineImage([1])])
+
+    assert cache.get('ab12') is None
+
+
+def test_eviction_runs_occasionally(tmp_path, monkeypatch):
+    cache = AssemblyCache(str(tmp_path))
+    evictions = []
+    original = cache.evict
+    monkeypatch.setattr(cache, 'evict', lambda: evictions.append(original()))
+    for i in range(10):
+        cache.put('ab{:02}'.format(i), [MachineImage([1])])
+
+    assert len(evictions) == 1
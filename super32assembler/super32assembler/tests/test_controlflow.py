@@ -0,0 +1,76 @@
+""" control flow analysis tests """
+from super32assembler.analysis.controlflow import ControlFlowGraph
+from .test_session import CFG, assemble
+
+
+PROGRAM = [
+    "       ORG 4",
+    "n:     DEFINE 3",
+    "       ORG 8",
+    "       START",
+    "       LW R1,n(R0)",
+    "       LI R5,1(R0)",
+    "outer: LI R2,0(R0)",
+    "inner: ADD R2,R2,R5",
+    "       BEQ R2,R1,next",
+    "       BEQ R0,R0,inner",
+    "next:  SUB R1,R1,R5",
+    "       BEQ R1,R0,done",
+    "       BEQ R0,R0,outer",
+    "       ADD R9,R9,R9",
+    "done:  SW R1,12(R0)",
+    "       END",
+]
+
+
+def graph(input_file):
+    _, machine_code, symboltable, _ = assemble(input_file)
+    return ControlFlowGraph(machine_code, CFG['commands']), symboltable
+
+
+def test_basic_blocks():
+    cfg, symbols = graph(PROGRAM)
+    inner = symbols['inner'] // 4
+
+    assert sorted(cfg.blocks) == [0, 2, inner - 1, inner, inner + 2, inner + 3, inner + 5,
+                                  symbols['done'] // 4]
+    assert cfg.blocks[0].successors == [2]
+    assert cfg.blocks[inner].successors == [inner + 2, inner + 3]
+    # END stops the program
+    assert cfg.blocks[symbols['done'] // 4].successors == []
+
+
+def test_loops():
+    cfg, symbols = graph(PROGRAM)
+    outer, inner = cfg.loops()
+
+    assert outer.header == symbols['outer'] // 4
+    assert outer.depth == 1 and outer.parent is None
+    assert inner.header == symbols['inner'] // 4
+    assert inner.depth == 2 and inner.parent == outer.header
+    assert inner.blocks < outer.blocks
+    assert inner.size == 3
+
+
+def test_dominators():
+    cfg, symbols = graph(PROGRAM)
+    inner = symbols['inner'] // 4
+
+    assert cfg.dominates(0, inner)
+    assert cfg.dominates(inner, symbols['done'] // 4)
+    assert not cfg.dominates(inner + 2, inner)
+
+
+def test_unreachable_and_self_modifying():
+    cfg, symbols = graph(PROGRAM)
+    done = symbols['done'] // 4
+
+    assert cfg.unreachable(2, done + 2) == [(done - 1, done)]
+    # SW R1,12(R0) overwrites the LI at word 3
+    assert cfg.self_modifying() == [(done, 3)]
+
+
+def test_self_modifying_needs_constant_r0():
+    cfg, _ = graph(PROGRAM[:4] + ["LI R0,4(R0)", "SW R1,12(R0)", "END"])
+
+    assert cfg.self_modifying() == []
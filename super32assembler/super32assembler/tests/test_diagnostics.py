@@ -0,0 +1,29 @@
+""" assembler diagnostics tests """
+from super32assembler.assembler.diagnostics import Diagnostic, Diagnostics
+from .test_assembler import CFG
+
+
+DIAGNOSTICS = Diagnostics(CFG['commands'], CFG['registers'])
+
+
+def test_valid_code():
+    report = DIAGNOSTICS.check(['ORG 4', 'START', 'loop: ADD R1,R2,R3', 'BEQ R0,R0,loop', 'END'])
+
+    assert report.diagnostics == []
+    assert report.symboltable == {'loop': 4}
+    assert report.code_size == 8
+
+
+def test_all_faulty_lines_are_reported():
+    report = DIAGNOSTICS.check(
+        ['ORG 4', 'START', 'ADD R1,R2', 'MUL R1,R2,R3', 'BEQ R0,R0,x', 'END'])
+
+    assert [diagnostic.line for diagnostic in report.diagnostics] == [2, 3, 4]
+    assert report.diagnostics[2] == Diagnostic(4, 'Label not found: x')
+
+
+def test_file_errors_have_no_line():
+    report = DIAGNOSTICS.check(['ORG 4', 'ADD R1,R2,R3'])
+
+    assert len(report.diagnostics) == 1
+    assert report.diagnostics[0].line is None
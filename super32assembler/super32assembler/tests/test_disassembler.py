@@ -0,0 +1,61 @@
+""" disassembler tests """
+import pytest
+
+from super32assembler.disassembler import disassembler
+from super32assembler.disassembler.disassembler import Disassembler, fields
+from super32assembler.preprocessor.preprocessor import Preprocessor
+from super32assembler.symbols.symbolindex import SymbolIndex
+from .test_session import CFG, PROGRAM, assemble
+
+
+DISASSEMBLER = Disassembler(CFG['commands'], CFG['registers'])
+
+
+@pytest.mark.parametrize('line', [
+    'ADD R1,R20,R12',
+    'SAR R31,R0,R2',
+    'LW R10,8(R0)',
+    'SW R10,-4(R5)',
+    'LI R1,5(R2)',
+    'BEQ R1,R2,-3',
+])
+def test_roundtrip(line):
+    _, machine_code, _, _ = assemble(['ORG 4', 'START', line, 'END'])
+
+    assert DISASSEMBLER.disassemble(machine_code[1]) == line
+
+
+def test_unknown_word():
+    assert DISASSEMBLER.disassemble(0xFC000001) == 'DEFINE $FC000001'
+    assert DISASSEMBLER.disassemble(0x0000003F) == 'DEFINE $0000003F'
+
+
+def test_symbolized_image():
+    code_address, machine_code, symboltable, _ = assemble(PROGRAM)
+    code = Preprocessor().parse(PROGRAM)[1]
+    symbolizing = Disassembler(CFG['commands'], CFG['registers'], SymbolIndex(symboltable))
+
+    lines = dict(symbolizing.disassemble_image(machine_code))
+
+    assert [lines[code_address + 4 * i] for i in range(len(code))] == [
+        ' '.join(line.split()) for line in code
+    ]
+    assert lines[0] == 'BEQ R30,R30,2'
+    assert lines[4] == 'DEFINE $00000008'
+
+
+def test_fields():
+    split = fields([0x014B5020, 0x8C0A0004])
+
+    assert list(split.opcode) == [0, 0x23]
+    assert list(split.rs) == [10, 0]
+    assert list(split.rt) == [11, 10]
+    assert list(split.rd) == [10, 0]
+    assert list(split.funct) == [0x20, 4]
+    assert list(split.immediate) == [0x5020, 4]
+
+
+def test_fields_without_numpy(monkeypatch):
+    monkeypatch.setattr(disassembler, 'numpy', None)
+
+    assert list(fields([0x8C0A0004]).immediate) == [4]
@@ -1,5 +1,165 @@
 import pytest
-from super32assembler.generator.generator import Generator
+from super32assembler.generator.generator import CHUNK_WORDS, Generator, format_of
+from super32assembler.generator.loader import Loader
+from super32assembler.image.machineimage import MachineImage
 
 
 generator = Generator('lines')
+IMAGE = MachineImage([0x10000000, 0xFFFFFFFF])
+
+
+def test_write_lines(tmp_path):
+    path = tmp_path / 'out.o'
+    generator.write(str(path), IMAGE)
+
+    assert path.read_text() == (
+        '00010000000000000000000000000000\n'
+        '11111111111111111111111111111111'
+    )
+
+
+def test_write_stream(tmp_path):
+    path = tmp_path / 'out.o'
+    Generator('stream').write(str(path), IMAGE)
+
+    assert path.read_text() == '0001' + '0' * 28 + '1' * 32
+
+
+def test_unknown_generator(tmp_path):
+    with pytest.raises(Exception):
+        Generator('unknown').write(str(tmp_path / 'out.o'), IMAGE)
+
+
+def test_write_bin(tmp_path):
+    path = tmp_path / 'out.bin'
+    Generator('bin').write(str(path), IMAGE)
+    Generator('bin', 'little').write(str(tmp_path / 'little.bin'), IMAGE)
+
+    assert path.read_bytes() == bytes.fromhex('10000000FFFFFFFF')
+    assert (tmp_path / 'little.bin').read_bytes() == bytes.fromhex('00000010FFFFFFFF')
+
+
+def test_write_ihex(tmp_path):
+    path = tmp_path / 'out.hex'
+    Generator('ihex').write(str(path), IMAGE)
+
+    assert path.read_text().splitlines() == [
+        ':0800000010000000FFFFFFFFEC',
+        ':00000001FF',
+    ]
+
+
+def test_write_srec(tmp_path):
+    path = tmp_path / 'out.srec'
+    Generator('srec').write(str(path), IMAGE)
+
+    assert path.read_text().splitlines() == [
+        'S00A00007375706572333261',
+        'S10B000010000000FFFFFFFFE8',
+        'S5030001FB',
+        'S9030000FC',
+    ]
+
+
+@pytest.mark.parametrize('output_format', ['lines', 'stream', 'bin', 'ihex', 'srec'])
+@pytest.mark.parametrize('endianness', ['big', 'little'])
+def test_load(tmp_path, output_format, endianness):
+    image = MachineImage.zeros(2**16)
+    image[1] = 0x12345678
+    image[2**14:2**14 + 8] = range(1, 9)  # crosses a 64KiB boundary
+    image[-1] = 0xFFFFFFFF
+    path = str(tmp_path / 'out')
+
+    Generator(output_format, endianness).write(path, image)
+
+    assert Loader(output_format, endianness).read(path) == image
+
+
+def test_sparse_formats_skip_gaps(tmp_path):
+    image = MachineImage.zeros(2**20)
+    image[2**19] = 1
+    path = tmp_path / 'out.hex'
+    Generator('ihex').write(str(path), image)
+
+    assert len(path.read_text().splitlines()) == 3
+
+
+def test_invalid_checksum(tmp_path):
+    path = tmp_path / 'out.hex'
+    path.write_text(':0800000010000000FFFFFFFFED\n')
+
+    with pytest.raises(Exception, match='Invalid record in line 1'):
+        Loader('ihex').read(str(path))
+
+
+def test_format_of():
+    assert format_of('a.hex') == 'ihex'
+    assert format_of('a.S19') == 'srec'
+    assert format_of('a.o') == 'lines'
+
+
+def test_failed_write_keeps_previous_output(tmp_path):
+    path = tmp_path / 'out.bin'
+    path.write_bytes(b'old')
+
+    with pytest.raises(Exception, match='Unknown endianness'):
+        Generator('bin', 'middle').write(str(path), IMAGE)
+
+    assert path.read_bytes() == b'old'
+    assert [p.name for p in tmp_path.iterdir()] == ['out.bin']
+
+
+def test_large_image_is_written_in_chunks(tmp_path):
+    image = MachineImage(range(CHUNK_WORDS * 2 + 1))
+    path = tmp_path / 'out.o'
+    generator.write(str(path), image)
+
+    lines = path.read_text().split('\n')
+    assert len(lines) == len(image)
+    assert lines[CHUNK_WORDS] == '{:032b}'.format(CHUNK_WORDS)
+
+
+def test_write_vhdl(tmp_path):
+    image = MachineImage.zeros(2**16)
+    image[3] = 5
+    path = tmp_path / 'rom-1.vhdl'
+    Generator('vhdl', source='prog.s32').write(str(path), image)
+
+    vhdl = path.read_text()
+    assert 'from source: prog.s32' in vhdl
+    assert 'ENTITY rom_rom_1 IS' in vhdl
+    assert 'ARRAY(0 TO 65535) OF word' in vhdl
+    # only non-zero words are listed, in both memories
+    assert vhdl.count('3 => "00000000000000000000000000000101",') == 2
+    assert vhdl.count('=> "') == 2
+    assert vhdl.count("OTHERS => (OTHERS => '0')") == 2
+    assert '{{' not in vhdl
+
+
+def test_write_coe(tmp_path):
+    path = tmp_path / 'out.coe'
+    Generator('coe').write(str(path), IMAGE)
+
+    assert path.read_text() == (
+        'memory_initialization_radix=16;\n'
+        'memory_initialization_vector=\n'
+        '10000000,\n'
+        'FFFFFFFF;\n'
+    )
+
+
+def test_write_mif(tmp_path):
+    image = MachineImage.zeros(6)
+    image[1] = 0x10000000
+    path = tmp_path / 'out.mif'
+    Generator('mif').write(str(path), image)
+
+    content = path.read_text()
+    assert 'WIDTH=32;\nDEPTH=6;' in content
+    assert content.endswith(
+        'CONTENT BEGIN\n'
+        '\t0 : 00000000;\n'
+        '\t1 : 10000000;\n'
+        '\t[2..5] : 00000000;\n'
+        'END;\n'
+    )
@@ -0,0 +1,110 @@
+""" INCLUDE directive tests """
+import os
+import pytest
+
+from super32assembler.assembler.session import AssemblerSession
+from super32assembler.cache.assemblycache import AssemblyCache
+from super32assembler.preprocessor import includes
+from super32assembler.preprocessor.preprocessor import Preprocessor
+from .test_assembler import CFG
+
+
+PROGRAM = [
+    "        INCLUDE \"table.s32\"",
+    "        ORG 12",
+    "        START",
+    "        LW R10,NUM1(R0)",
+    "        END",
+]
+
+TABLE = "ORG 4\n' shared constants\nNUM1: DEFINE 8\nINCLUDE \"inc/more.s32\"\n"
+MORE = "NUM2: DEFINE 4\n"
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / 'inc').mkdir()
+    (tmp_path / 'table.s32').write_text(TABLE)
+    (tmp_path / 'inc' / 'more.s32').write_text(MORE)
+    includes._UNITS.clear()
+    return tmp_path
+
+
+def touch(path, text):
+    """ rewrites a file with a new modification time """
+    stat = os.stat(str(path))
+    path.write_text(text)
+    os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_include(tree):
+    preprocessor = Preprocessor()
+    code_address, code, zeros_constants, symboltable, editor_line_numbers = \
+        preprocessor.parse(PROGRAM, directory=str(tree))
+
+    assert code_address == 12
+    assert code == ["LW R10,NUM1(R0)"]
+    assert symboltable == {'NUM1': 4, 'NUM2': 8}
+    assert list(zeros_constants)[1:3] == [8, 4]
+    assert editor_line_numbers == [3, 4]
+    assert sorted(preprocessor.includes) == sorted([
+        os.path.realpath(str(tree / 'table.s32')),
+        os.path.realpath(str(tree / 'inc' / 'more.s32'))
+    ])
+
+
+def test_include_paths(tree):
+    program = ["INCLUDE \"more.s32\""] + PROGRAM[1:]
+
+    with pytest.raises(Exception, match='Include file not found: more.s32'):
+        Preprocessor().parse(program, directory=str(tree))
+
+    _, _, _, symboltable, _ = Preprocessor(include_paths=[str(tree / 'inc')]).parse(
+        program, directory=str(tree))
+    assert symboltable == {'NUM2': 0}
+
+
+def test_recursive_include(tree):
+    (tree / 'inc' / 'more.s32').write_text("INCLUDE \"../table.s32\"\n")
+
+    with pytest.raises(Exception, match='Recursive include'):
+        Preprocessor().parse(PROGRAM, directory=str(tree))
+
+
+def test_invalid_include(tree):
+    with pytest.raises(Exception, match='Invalid INCLUDE directive'):
+        Preprocessor().parse(["INCLUDE table.s32"] + PROGRAM[1:], directory=str(tree))
+
+
+def test_changed_include_is_parsed_again(tree):
+    Preprocessor().parse(PROGRAM, directory=str(tree))
+    touch(tree / 'inc' / 'more.s32', "NUM2: DEFINE 5\n")
+
+    _, _, zeros_constants, _, _ = Preprocessor().parse(PROGRAM, directory=str(tree))
+    assert zeros_constants[2] == 5
+
+
+def test_disk_cache(tree):
+    cache = AssemblyCache(str(tree / 'cache'))
+    Preprocessor(cache=cache).parse(PROGRAM, directory=str(tree))
+    assert len(list((tree / 'cache').rglob('*.img'))) == 2
+
+    # a new process reads the parsed files from disk
+    includes._UNITS.clear()
+    os.chmod(str(tree / 'table.s32'), 0)
+    try:
+        _, _, _, symboltable, _ = Preprocessor(cache=cache).parse(PROGRAM, directory=str(tree))
+    finally:
+        os.chmod(str(tree / 'table.s32'), 0o644)
+    assert symboltable == {'NUM1': 4, 'NUM2': 8}
+
+
+def test_session_follows_include(tree):
+    session = AssemblerSession(CFG['commands'], CFG['registers'])
+    session.update(PROGRAM, str(tree))
+    touch(tree / 'table.s32', "ORG 4\nNUM2: DEFINE 4\nNUM1: DEFINE 9\n")
+
+    _, machine_code, symboltable, _ = session.update(PROGRAM, str(tree))
+    assert symboltable == {'NUM1': 8, 'NUM2': 4}
+    assert machine_code[2] == 9
+    assert machine_code[3] & 0xFFFF == 8
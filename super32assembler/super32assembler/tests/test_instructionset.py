@@ -0,0 +1,68 @@
+""" instruction set registry tests """
+import json
+import os
+import pytest
+
+from super32assembler.assembler.instructionset import INSTRUCTIONSET, InstructionSet
+from .test_assembler import CFG
+
+
+def test_load_once_per_process():
+    instructionset = InstructionSet.load(INSTRUCTIONSET)
+
+    assert InstructionSet.load(INSTRUCTIONSET) is instructionset
+    assert InstructionSet.of(instructionset.commands, instructionset.registers) is instructionset
+
+
+def test_lookup_tables():
+    instructionset = InstructionSet.load(INSTRUCTIONSET)
+
+    assert instructionset.arithmetic['SUB'] == 0b000010
+    assert instructionset.opcodes[0b100011] == 'LW'
+    assert instructionset.functs[0b001111] == 'SAR'
+    assert instructionset.register_numbers['R31'] == 31
+    assert instructionset.register_names[30] == 'R30'
+    assert instructionset.groups['BEQ'] == 'branch'
+
+
+def test_changed_file_is_read_again(tmp_path):
+    path = tmp_path / 'instructionset.json'
+    path.write_text(json.dumps(CFG))
+    first = InstructionSet.load(str(path))
+
+    cfg = dict(CFG, commands=dict(CFG['commands'], branch={'BEQ': '000100', 'BNE': '000101'}))
+    path.write_text(json.dumps(cfg))
+    os.utime(str(path), ns=(0, 0))
+    second = InstructionSet.load(str(path))
+
+    assert second is not first
+    assert second.branch['BNE'] == 5
+
+
+def test_compiles_unknown_encodings():
+    assert InstructionSet.of(CFG['commands'], CFG['registers']).storage == {'LW': 35, 'SW': 43}
+
+
+@pytest.mark.parametrize('commands, message', [
+    ({'arithmetic': {}, 'storage': {}}, 'Missing command group: branch'),
+    ({'arithmetic': {'ADD': '0'}, 'storage': {}, 'branch': {}}, 'Invalid encoding of ADD'),
+    ({'arithmetic': {}, 'storage': {'LW': '000100'}, 'branch': {'BEQ': '000100'}},
+     'Duplicate opcode: LW, BEQ'),
+    ({'arithmetic': {}, 'storage': {'LW': '000000'}, 'branch': {}},
+     'Opcode of arithmetic commands used: LW'),
+    ({'arithmetic': {'ADD': '000000', 'SUB': '000000'}, 'storage': {}, 'branch': {}},
+     'Duplicate encoding in arithmetic: ADD, SUB'),
+])
+def test_invalid_instruction_set(commands, message):
+    with pytest.raises(Exception, match=message):
+        InstructionSet(commands, {})
+
+
+def test_halts_at_unconditional_branch_to_itself():
+    instructionset = InstructionSet.load(INSTRUCTIONSET)
+
+    assert instructionset.halts(0b000100_11110_11110_1111111111111111)  # END
+    assert instructionset.halts(0b000100_00001_00001_1111111111111111)
+    assert not instructionset.halts(0b000100_00001_00010_1111111111111111)  # conditional
+    assert not instructionset.halts(0b000100_11110_11110_1111111111111110)
+    assert not instructionset.halts(0b100011_11110_11110_1111111111111111)  # LW
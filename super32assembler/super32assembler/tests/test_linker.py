@@ -0,0 +1,116 @@
+""" object module and linker tests """
+import pytest
+
+from super32assembler.assembler.instructionset import InstructionSet
+from super32assembler.linker.linker import Linker
+from super32assembler.linker.objectfile import ObjectModule
+from .test_session import CFG, PROGRAM, assemble
+
+
+LINKER = Linker(CFG['commands'], CFG['registers'])
+
+MAIN = [
+    "        ORG 4",
+    "        START",
+    "        LW R1,step(R0)",
+    "loop:   BEQ R1,R0,done",
+    "        BEQ R0,R0,loop",
+    "done:   SW R1,result(R0)",
+    "        END",
+]
+
+LIBRARY = [
+    "        ORG 0",
+    "step:   DEFINE 1",
+    "result: DEFINE 0",
+]
+
+
+def module(input_file):
+    return ObjectModule.assemble(input_file, CFG['commands'], CFG['registers'])
+
+
+def test_single_module_equals_direct_assembly():
+    _, machine_code, _, _ = assemble(PROGRAM)
+
+    # all labels are local, none of them is imported by another module
+    assert LINKER.link([module(PROGRAM)]) == (machine_code, {})
+
+
+def test_imports_and_exports():
+    main = module(MAIN)
+
+    assert main.imports() == {'step', 'result'}
+    assert main.exports() == {'loop', 'done'}
+    assert module(LIBRARY).imports() == set()
+
+
+def test_link_two_modules():
+    machine_code, symboltable = LINKER.link([module(MAIN), module(LIBRARY)])
+
+    # library sections are placed behind the main module
+    assert symboltable == {'step': 24, 'result': 28}
+    assert machine_code[1] & 0xFFFF == 24                    # LW R1,step(R0)
+    assert machine_code[2] & 0xFFFF == 1                     # BEQ R1,R0,done
+    assert machine_code[3] & 0xFFFF == 0xFFFE                # BEQ R0,R0,loop
+    assert machine_code[6] == 1                              # step: DEFINE 1
+    assert len(machine_code) == 8
+
+    # the library adds no END branch, the program stops at the END of main
+    instructionset = InstructionSet.of(CFG['commands'], CFG['registers'])
+    assert [i for i, word in enumerate(machine_code) if instructionset.halts(word)] == [5]
+
+
+def test_labels_are_local_unless_imported():
+    other = [
+        "        ORG 32",
+        "        START",
+        "loop:   LW R2,result(R0)",
+        "        BEQ R0,R0,loop",
+        "        END",
+    ]
+    machine_code, symboltable = LINKER.link([module(MAIN), module(other), module(LIBRARY)])
+
+    assert symboltable == {'step': 36, 'result': 40}
+    assert machine_code[3] & 0xFFFF == 0xFFFE                # BEQ R0,R0,loop of main
+    assert machine_code[6] & 0xFFFF == 40                    # LW R2,result(R0)
+    assert machine_code[7] & 0xFFFF == 0xFFFE                # BEQ R0,R0,loop of other
+
+
+def test_library_can_not_be_linked_first():
+    with pytest.raises(Exception, match='first module has no START'):
+        LINKER.link([module(LIBRARY), module(MAIN)])
+
+
+def test_modules_need_start_and_end_together():
+    with pytest.raises(Exception, match='Missing START- and/or END-directive'):
+        module(LIBRARY + ["        ORG 8", "        START", "        ADD R1,R1,R1"])
+
+
+def test_undefined_symbol():
+    with pytest.raises(Exception, match='Undefined symbol: step'):
+        LINKER.link([module(MAIN)])
+
+
+def test_duplicate_symbol():
+    with pytest.raises(Exception, match='Duplicate symbol'):
+        LINKER.link([module(MAIN), module(LIBRARY), module(LIBRARY)])
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'main.obj')
+    main = module(MAIN)
+    main.save(path)
+    loaded = ObjectModule.load(path)
+
+    assert loaded.sections == main.sections
+    assert loaded.symbols == main.symbols
+    assert loaded.relocations == main.relocations
+    assert loaded.entry == main.entry
+
+
+def test_save_and_load_library(tmp_path):
+    path = str(tmp_path / 'library.obj')
+    module(LIBRARY).save(path)
+
+    assert ObjectModule.load(path).entry is None
@@ -0,0 +1,87 @@
+""" machine image tests """
+from array import array
+import pytest
+
+from super32assembler.image.machineimage import MachineImage, TYPECODE
+from super32assembler.preprocessor.preprocessor import Preprocessor
+
+
+def test_zeros():
+    image = MachineImage.zeros(3)
+
+    assert len(image) == 3
+    assert list(image) == [0, 0, 0]
+
+
+def test_negative_words_are_masked():
+    image = MachineImage.zeros(1)
+    image[0] = -1
+
+    assert image[0] == 0xFFFFFFFF
+
+
+def test_lines_roundtrip():
+    lines = ['00010011110111100000000000000000', '11111111111111111111111111111111']
+
+    assert MachineImage.from_lines(lines).to_lines() == lines
+
+
+def test_view_is_zero_copy():
+    image = MachineImage.zeros(2)
+    view = image.view()
+    image[1] = 42
+
+    assert view[1] == 42
+
+
+def test_copy_is_independent():
+    image = MachineImage([1, 2])
+    copy = image.copy()
+    copy[0] = 3
+
+    assert image == MachineImage([1, 2])
+
+
+def test_sparse_segments():
+    image = MachineImage.zeros(2**20)
+    image[8] = 1
+    image[9] = 2
+    image[2**19:2**19 + 2] = [3, 4]
+
+    assert image.segments() == [(32, array(TYPECODE, [1, 2])), (2**21, array(TYPECODE, [3, 4]))]
+    assert image.used() == 4
+    assert image[7] == 0 and image[9] == 2
+    assert list(image[7:11]) == [0, 1, 2, 0]
+
+
+def test_touching_segments_are_merged():
+    image = MachineImage.zeros(8)
+    image[1] = 1
+    image[4] = 4
+    image[2:4] = [2, 3]
+
+    assert image.segments() == [(4, array(TYPECODE, [1, 2, 3, 4]))]
+    assert list(image) == [0, 1, 2, 3, 4, 0, 0, 0]
+
+
+def test_writes_outside_of_the_image_fail():
+    image = MachineImage.zeros(2)
+
+    with pytest.raises(IndexError):
+        image[2] = 1
+
+
+def test_equality_ignores_segment_layout():
+    image = MachineImage.zeros(3)
+    image[1] = 5
+
+    assert image == MachineImage([0, 5, 0])
+    assert image != MachineImage([0, 5])
+
+
+def test_widely_separated_regions():
+    _, _, zeros_constants, _, _ = Preprocessor().parse(
+        ["ORG $100000", "DEFINE 1", "ORG 4", "START", "ADD R1,R2,R3", "END"])
+
+    assert len(zeros_constants) == 2**18 + 1
+    assert zeros_constants.used() == 1
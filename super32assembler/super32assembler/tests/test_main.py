@@ -0,0 +1,125 @@
+""" command line tests """
+from super32assembler.__main__ import analyze, assemble, disassemble, input_files
+from super32assembler.cache.assemblycache import AssemblyCache
+from super32assembler.image.machineimage import MachineImage
+from .test_controlflow import PROGRAM as LOOPS
+
+
+PROGRAM = "ORG 4\nSTART\nADD R1,R2,R3\nEND\n"
+
+
+def args(path, **options):
+    ARGS = {
+        '<input-file>': str(path),
+        '--output': None,
+        '--architecture': 'single',
+        '--generator': 'lines',
+        '--no-cache': True,
+    }
+    ARGS.update(options)
+    return ARGS
+
+
+def test_input_files_expands_globs(tmp_path):
+    (tmp_path / 'a.s32').write_text(PROGRAM)
+    (tmp_path / 'b.s32').write_text(PROGRAM)
+
+    assert input_files([str(tmp_path / '*.s32'), 'other.s32']) == [
+        str(tmp_path / 'a.s32'),
+        str(tmp_path / 'b.s32'),
+        'other.s32'
+    ]
+
+
+def test_assemble_writes_default_output(tmp_path):
+    source = tmp_path / 'a.s32'
+    source.write_text(PROGRAM)
+
+    assert assemble(args(source)) == (str(source), None)
+    assert (tmp_path / 'a.o').read_text().splitlines()[1] == '00000000010000110000100000000000'
+
+
+def test_assemble_reports_errors(tmp_path):
+    source = tmp_path / 'a.s32'
+    source.write_text(PROGRAM.replace('ADD', 'MUL'))
+
+    path, error = assemble(args(source))
+
+    assert path == str(source)
+    assert 'MUL' in error
+    assert assemble(args(tmp_path / 'missing.s32'))[1] == 'file not found'
+
+
+def test_assemble_uses_cache(tmp_path):
+    source = tmp_path / 'a.s32'
+    source.write_text(PROGRAM)
+    cache_dir = tmp_path / 'cache'
+    options = {'--no-cache': False, '--cache-dir': str(cache_dir)}
+
+    assemble(args(source, **options))
+    [entry] = list(cache_dir.rglob('*.img'))
+    AssemblyCache(str(cache_dir)).put(entry.parent.name + entry.stem, [MachineImage([7])])
+
+    # a hit writes the cached image without assembling
+    assert assemble(args(source, **options)) == (str(source), None)
+    assert (tmp_path / 'a.o').read_text() == '{:032b}'.format(7)
+
+
+def test_optimized_cache_hit_is_reported(tmp_path, capsys):
+    source = tmp_path / 'a.s32'
+    source.write_text(PROGRAM)
+    options = {'--no-cache': False, '--cache-dir': str(tmp_path / 'cache'), '--optimize': True}
+
+    assemble(args(source, **options))
+    assert capsys.readouterr().out.startswith('optimized {}: 0 instructions'.format(source))
+    assemble(args(source, **options))
+    assert capsys.readouterr().out == \
+        'optimized {}: unchanged, taken from the cache\n'.format(source)
+
+
+def test_changed_include_misses_cache(tmp_path):
+    source = tmp_path / 'a.s32'
+    source.write_text(PROGRAM.replace('ADD R1,R2,R3', 'LW R1,NUM(R0)') + 'INCLUDE "table.s32"\n')
+    (tmp_path / 'table.s32').write_text("ORG 16\nNUM: DEFINE 1\n")
+    options = {'--no-cache': False, '--cache-dir': str(tmp_path / 'cache')}
+
+    assert assemble(args(source, **options)) == (str(source), None)
+    (tmp_path / 'table.s32').write_text("ORG 20\nNUM: DEFINE 1\n")
+    assert assemble(args(source, **options)) == (str(source), None)
+    assert (tmp_path / 'a.o').read_text().splitlines()[1].endswith('{:016b}'.format(20))
+
+
+def test_assemble_multi_writes_separate_memories(tmp_path):
+    source = tmp_path / 'a.s32'
+    source.write_text("ORG 4\nNUM: DEFINE 3\nORG 8\nSTART\nLW R1,NUM(R0)\nEND\n")
+
+    assert assemble(args(source, **{'--architecture': 'multi'})) == (str(source), None)
+
+    instructions = (tmp_path / 'a_instructions.o').read_text().splitlines()
+    memory = (tmp_path / 'a_memory.o').read_text().splitlines()
+    assert len(instructions) == 4
+    assert instructions[1] == '0' * 32
+    assert int(memory[1], 2) == 3
+    assert int(memory[2], 2) == 0
+
+
+def test_disassemble(tmp_path, capsys):
+    source = tmp_path / 'a.s32'
+    source.write_text(PROGRAM)
+    assemble(args(source))
+
+    assert disassemble({'<machine-code-file>': [str(tmp_path / 'a.o')], '--endianness': 'big'}) == 0
+    assert '00000004  00430800  ADD R1,R2,R3' in capsys.readouterr().out.splitlines()
+
+
+def test_analyze_prints_loop_nest(tmp_path, capsys):
+    source = tmp_path / 'a.s32'
+    source.write_text('\n'.join(LOOPS))
+
+    assert analyze({'<input-file>': [str(source)], '--include': []}) == 0
+    assert capsys.readouterr().out.splitlines()[1:] == [
+        '  loop OUTER: depth 1, 5 blocks, 7 instructions',
+        '    loop INNER: depth 2, 2 blocks, 3 instructions',
+        '  unreachable: NEXT+12',
+        '  self-modifying: store at DONE writes code at N+8',
+    ]
@@ -0,0 +1,72 @@
+""" peephole optimizer tests """
+from super32assembler.optimizer.peephole import PeepholeOptimizer
+from super32assembler.preprocessor.preprocessor import Preprocessor
+from .test_session import CFG
+
+
+def optimize(*lines):
+    code_address, code, _, symboltable, editor_line_numbers = Preprocessor().parse(
+        ['ORG 4', 'n: DEFINE 3', 'ORG 8', 'START'] + list(lines) + ['END'])
+    optimizer = PeepholeOptimizer(CFG['commands'])
+    return optimizer, optimizer.optimize(code_address, code, symboltable, editor_line_numbers)
+
+
+def test_branch_chain():
+    optimizer, (code, symboltable, _) = optimize(
+        'BEQ R1,R2,hop', 'LI R2,1(R0)', 'hop: BEQ R0,R0,done', 'SUB R3,R3,R3', 'done: END')
+
+    assert code == ['BEQ R1,R2,done', 'LI R2,1(R0)', 'BEQ R0,R0,done', 'SUB R3,R3,R3']
+    assert optimizer.rewritten_branches == 1
+    assert symboltable['done'] == 8 + 4 * 4
+
+
+def test_branch_chain_ending_in_a_loop():
+    lines = ('ADD R2,R2,R2', 'BEQ R1,R2,a', 'ADD R1,R1,R1',
+             'a: BEQ R0,R0,b', 'SUB R3,R3,R3', 'b: BEQ R0,R0,a',
+             'BEQ R1,R2,self', 'ADD R1,R1,R1', 'self: BEQ R0,R0,self')
+    optimizer, (code, _, _) = optimize(*lines)
+
+    assert code == [line.split(': ')[-1] for line in lines]
+    assert optimizer.rewritten_branches == 0
+
+
+def test_branch_to_next_instruction():
+    optimizer, (code, symboltable, lines) = optimize(
+        'BEQ R1,R2,next', 'next: ADD R1,R1,R2', 'BEQ R1,R2,-2')
+
+    assert code == ['ADD R1,R1,R2', 'BEQ R1,R2,-2']
+    assert symboltable['next'] == 8
+    assert lines == [5, 6, 7]
+    assert optimizer.removed_instructions == 1
+    assert optimizer.saved_cycles == 3
+
+
+def test_add_zero():
+    _, (code, _, _) = optimize('ADD R1,R1,R0', 'ADD R2,R0,R2', 'SUB R3,R3,R0', 'ADD R1,R2,R0')
+
+    assert code == ['ADD R1,R2,R0']
+
+
+def test_add_zero_kept_if_r0_is_written():
+    _, (code, _, _) = optimize('LI R0,1(R0)', 'ADD R1,R1,R0')
+
+    assert code == ['LI R0,1(R0)', 'ADD R1,R1,R0']
+
+
+def test_reload():
+    optimizer, (code, _, _) = optimize(
+        'LW R1,n(R0)', 'LW R1,n(R0)',
+        'SW R2,n(R0)', 'LW R1,n(R0)',
+        'ADD R1,R1,R2', 'LW R1,n(R0)',
+        'loop: LW R1,n(R0)')
+
+    assert code == ['LW R1,n(R0)', 'SW R2,n(R0)', 'LW R1,n(R0)', 'ADD R1,R1,R2',
+                    'LW R1,n(R0)', 'LW R1,n(R0)']
+    assert optimizer.saved_cycles == 5
+
+
+def test_data_and_unchanged_code_are_kept():
+    _, (code, symboltable, _) = optimize('LW R1,n(R0)', 'ADD R1,R1,R1')
+
+    assert code == ['LW R1,n(R0)', 'ADD R1,R1,R1']
+    assert symboltable == {'n': 4}
@@ -0,0 +1,71 @@
+""" preprocessor tests """
+import pytest
+
+from super32assembler.preprocessor.preprocessor import Preprocessor
+
+
+PROGRAM = [
+    "' constants",
+    "        ORG 4",
+    "num1:   DEFINE 8",
+    "        DEFINE $10",
+    "num2:   DEFINE 4",
+    "",
+    "        ORG 20",
+    "        START",
+    "        LW R10,num1(R0)",
+    "loop:   ADD R10,R10,R11",
+    "        END",
+]
+
+
+def test_parse():
+    preprocessor = Preprocessor()
+    code_address, code, zeros_constants, symboltable, editor_line_numbers = \
+        preprocessor.parse(PROGRAM)
+
+    assert code_address == 20
+    assert code == ["LW R10,num1(R0)", "ADD R10,R10,R11"]
+    assert list(zeros_constants) == [0, 8, 16, 4, 0, 0, 0, 0]
+    # unlabelled constants take memory as well
+    assert symboltable == {'num1': 4, 'num2': 12, 'loop': 24}
+    assert editor_line_numbers == [8, 9, 10]
+    assert preprocessor.sections == [(4, 12), (20, 12)]
+
+
+def test_directives_match_exactly():
+    # ST is not a directive, so the data behind it keeps its address
+    program = ["ORG 4", "ST", "num: DEFINE 1"] + PROGRAM[6:]
+
+    _, _, zeros_constants, symboltable, _ = Preprocessor().parse(program)
+
+    assert symboltable['num'] == 8
+    assert zeros_constants[2] == 1
+
+
+def test_parse_is_repeatable():
+    preprocessor = Preprocessor()
+    preprocessor.parse(PROGRAM)
+    _, _, _, symboltable, _ = preprocessor.parse(PROGRAM[6:])
+
+    assert symboltable == {'loop': 24}
+
+
+def test_sections_out_of_order():
+    program = PROGRAM[6:] + PROGRAM[1:5]
+
+    _, _, zeros_constants, _, _ = Preprocessor().parse(program)
+
+    assert len(zeros_constants) == 8
+
+
+@pytest.mark.parametrize('program, message', [
+    (["START", "ADD R1,R2,R3", "END"], 'ORG-directive'),
+    (PROGRAM[:-1], 'Missing START'),
+    (PROGRAM[:7] + PROGRAM[8:], 'Missing START'),
+    (PROGRAM + ["num1: DEFINE 0"], 'Duplicate label: num1'),
+    (PROGRAM + ["DEFINE $100000000"], 'Constant out of range'),
+])
+def test_errors(program, message):
+    with pytest.raises(Exception, match=message):
+        Preprocessor().parse(program)
@@ -0,0 +1,65 @@
+""" instruction scheduler tests """
+from super32assembler.optimizer.scheduler import InstructionScheduler
+from super32assembler.preprocessor.preprocessor import Preprocessor
+from .test_session import CFG
+
+
+def schedule(*lines, latencies=None):
+    code_address, code, _, symboltable, editor_line_numbers = Preprocessor().parse(
+        ['ORG 4', 'a: DEFINE 3', 'b: DEFINE 4', 'ORG 12', 'START'] + list(lines) + ['END'])
+    scheduler = InstructionScheduler(CFG['commands'], latencies)
+    return scheduler, scheduler.schedule(code_address, code, symboltable, editor_line_numbers)
+
+
+def test_load_use_hidden():
+    scheduler, (code, _, lines) = schedule(
+        'LW R1,a(R0)', 'ADD R2,R1,R1', 'LW R3,b(R0)', 'ADD R4,R3,R3')
+
+    assert code == ['LW R1,a(R0)', 'LW R3,b(R0)', 'ADD R2,R1,R1', 'ADD R4,R3,R3']
+    assert lines == [5, 7, 6, 8, 9]
+    assert (scheduler.stalls_before, scheduler.stalls_after) == (2, 0)
+
+
+def test_dependencies_are_kept():
+    _, (code, _, _) = schedule('LW R1,a(R0)', 'ADD R1,R1,R1', 'ADD R2,R1,R1')
+
+    assert code == ['LW R1,a(R0)', 'ADD R1,R1,R1', 'ADD R2,R1,R1']
+
+
+def test_aliasing_stores_keep_their_order():
+    # R5 might point to a, only the load of b may move in front of the store
+    _, (code, _, _) = schedule(
+        'LW R1,a(R0)', 'SW R1,0(R5)', 'LW R2,a(R0)', 'LW R3,b(R0)', 'ADD R4,R1,R0')
+
+    assert code.index('SW R1,0(R5)') < code.index('LW R2,a(R0)')
+    assert code.index('LW R1,a(R0)') < code.index('SW R1,0(R5)')
+
+
+def test_disjoint_offsets_pass_stores():
+    _, (code, _, _) = schedule('LW R1,a(R0)', 'SW R1,b(R0)', 'LW R2,a(R0)', 'ADD R3,R2,R2')
+
+    assert code == ['LW R1,a(R0)', 'LW R2,a(R0)', 'SW R1,b(R0)', 'ADD R3,R2,R2']
+
+
+def test_blocks_end_at_branches_and_labels():
+    _, (code, _, _) = schedule(
+        'LW R1,a(R0)', 'BEQ R0,R0,next', 'next: ADD R2,R1,R1', 'LW R3,b(R0)')
+
+    assert code == ['LW R1,a(R0)', 'BEQ R0,R0,next', 'LW R3,b(R0)', 'ADD R2,R1,R1']
+
+
+def test_numeric_branch_targets_start_blocks():
+    code = ['LI R5,3(R0)', 'LW R1,a(R0)', 'ADD R2,R1,R1', 'LW R3,b(R0)', 'ADD R4,R3,R3',
+            'SUB R5,R5,R6', 'BEQ R5,R0,1', 'BEQ R0,R0,-5']
+    _, (scheduled, _, _) = schedule(*code)
+
+    # BEQ R0,R0,-5 still branches back to LW R3,b(R0), nothing crosses it
+    assert scheduled[7 + 1 - 5] == 'LW R3,b(R0)'
+    assert sorted(scheduled[:3]) == sorted(code[:3])
+    assert scheduled[-2:] == code[-2:]
+
+
+def test_latency_table():
+    scheduler, _ = schedule('LW R1,a(R0)', 'ADD R2,R1,R1', latencies={'LW': 4})
+
+    assert scheduler.stalls_before == 3
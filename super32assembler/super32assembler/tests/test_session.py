@@ -0,0 +1,124 @@
+""" incremental assembler session tests """
+import pytest
+
+from super32utils.inout.fileio import FileIO
+from super32assembler.assembler.assembler import Assembler
+from super32assembler.assembler.architecture import Architectures
+from super32assembler.assembler.instructionset import INSTRUCTIONSET
+from super32assembler.assembler.session import AssemblerSession
+from super32assembler.preprocessor.preprocessor import Preprocessor
+
+
+# the shipped instruction set, shared with the tests of the later passes
+CFG = FileIO.read_json(INSTRUCTIONSET)
+
+PROGRAM = [
+    "        ORG 4",
+    "num1:   DEFINE 8",
+    "num2:   DEFINE 4",
+    "        ORG 12",
+    "        START",
+    "        LW R10,num1(R0)",
+    "        LW R11,num2(R0)",
+    "loop:   ADD R10,R10,R11",
+    "        ' comment",
+    "        BEQ R10,R11,stop",
+    "        BEQ R0,R0,loop",
+    "stop:   SW R10,num2(R5)",
+    "        END",
+]
+
+
+def assemble(input_file):
+    code_address, code, zeros_constants, symboltable, editor_line_numbers = \
+        Preprocessor().parse(input_file)
+    machine_code = Assembler(Architectures.SINGLE).parse(
+        code_address=code_address,
+        code=code,
+        zeros_constants=zeros_constants,
+        commands=CFG['commands'],
+        registers=CFG['registers'],
+        symboltable=symboltable
+    )
+    return code_address, machine_code, symboltable, editor_line_numbers
+
+
+def edit(input_file, line_number, line):
+    edited = list(input_file)
+    edited[line_number] = line
+    return edited
+
+
+@pytest.fixture
+def session():
+    session = AssemblerSession(CFG['commands'], CFG['registers'])
+    session.update(PROGRAM)
+    return session
+
+
+def test_first_update_matches_full_assembly():
+    session = AssemblerSession(CFG['commands'], CFG['registers'])
+
+    assert session.update(PROGRAM) == assemble(PROGRAM)
+
+
+def test_unchanged_input_encodes_nothing(session):
+    session.update(PROGRAM)
+
+    assert session.encoded_lines == 0
+
+
+def test_instruction_edit_encodes_one_line(session):
+    edited = edit(PROGRAM, 6, "        LW R12,num2(R0)")
+
+    assert session.update(edited) == assemble(edited)
+    assert session.encoded_lines == 1
+
+
+def test_inserted_line_resolves_dependent_labels(session):
+    edited = PROGRAM[:9] + ["        ADD R1,R1,R1"] + PROGRAM[9:]
+
+    assert session.update(edited) == assemble(edited)
+    assert session.encoded_lines == 1
+
+
+def test_renamed_label(session):
+    edited = edit(PROGRAM, 7, "again:  ADD R10,R10,R11")
+    edited = edit(edited, 10, "        BEQ R0,R0,again")
+
+    assert session.update(edited) == assemble(edited)
+
+
+def test_moved_constant(session):
+    edited = edit(PROGRAM, 0, "        ORG 0")
+
+    assert session.update(edited) == assemble(edited)
+    assert session.encoded_lines == 0
+
+
+def test_parsing_error_keeps_session(session):
+    with pytest.raises(Exception):
+        session.update(edit(PROGRAM, 6, "        LW R99,num2(R0)"))
+
+    assert session.update(PROGRAM) == assemble(PROGRAM)
+
+
+def test_failed_layout_keeps_labels(session):
+    with pytest.raises(Exception):
+        session.update(PROGRAM[:7] + ["        XYZ R1,R1,R1"] + PROGRAM[7:])
+
+    # an edit in place resolves against the labels of the last good run
+    edited = edit(PROGRAM, 9, "        BEQ R1,R0,loop")
+    assert session.update(edited) == assemble(edited)
+
+
+def test_multi_session_separates_data():
+    session = AssemblerSession(CFG['commands'], CFG['registers'], Architectures.MULTI)
+    code_address, machine_code, _, _ = session.update(PROGRAM)
+    data_memory = session.data_memory()
+
+    assert machine_code[1] == 0
+    assert data_memory[1] == 8
+    assert data_memory[code_address // 4] == 0
+    assert machine_code[code_address // 4] == assemble(PROGRAM)[1][code_address // 4]
+    assert AssemblerSession(CFG['commands'], CFG['registers']).data_memory() is None
@@ -0,0 +1,55 @@
+""" command line startup tests """
+import os
+import subprocess
+import sys
+import pytest
+
+# cumulative import time of the command line module in microseconds
+IMPORT_BUDGET = 100000
+
+# modules of other commands and options, imported where they are used
+DEFERRED = [
+    'concurrent.futures.process',
+    'dotenv',
+    'glob',
+    'tempfile',
+    'uuid',
+    'super32assembler.analysis.controlflow',
+    'super32assembler.disassembler.disassembler',
+    'super32assembler.generator.loader',
+    'super32assembler.linker.linker',
+    'super32assembler.optimizer.peephole',
+    'super32assembler.optimizer.scheduler',
+]
+
+
+def import_times(module):
+    """ cumulative import time of every module, measured with -X importtime """
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if line.startswith('import time:') and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def test_deferred_imports():
+    times = import_times('super32assembler.__main__')
+
+    assert [module for module in DEFERRED if module in times] == []
+
+
+@pytest.mark.skipif(not os.getenv('SUPER32_BENCHMARK'),
+                    reason='wall clock benchmark, set SUPER32_BENCHMARK=1 to run it')
+def test_import_time_budget():
+    # the first run may compile the modules
+    import_times('super32assembler.__main__')
+    times = import_times('super32assembler.__main__')
+
+    assert times['super32assembler.__main__'] < IMPORT_BUDGET
@@ -0,0 +1,28 @@
+""" symbol index tests """
+from super32assembler.symbols.symbolindex import SymbolIndex
+
+
+INDEX = SymbolIndex({'LOOP': 16, 'NUM': 4, 'STOP': 28, 'END': 28})
+
+
+def test_lookup():
+    assert INDEX.lookup(16) == ('LOOP', 0)
+    assert INDEX.lookup(24) == ('LOOP', 8)
+    assert INDEX.lookup(100) == ('END', 72)
+    assert INDEX.lookup(0) is None
+
+
+def test_shared_address_uses_first_label():
+    assert INDEX.lookup(28) == ('END', 0)
+    assert len(INDEX) == 3
+
+
+def test_format():
+    assert INDEX.format(4) == 'NUM'
+    assert INDEX.format(24) == 'LOOP+8'
+    assert INDEX.format(2) == '$2'
+    assert SymbolIndex({}).format(31) == '$1F'
+
+
+def test_symbolize():
+    assert INDEX.symbolize([0, 8, 16, 20]) == ['$0', 'NUM+4', 'LOOP', 'LOOP+4']
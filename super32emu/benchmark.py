@@ -0,0 +1,34 @@
+"""
+Usage:
+
+    python benchmark.py [runs]
+
+    starts the emulator runs times (default 10) with --profile-startup
+    and prints the median of every startup step. Without a display, set
+    QT_QPA_PLATFORM=offscreen.
+"""
+
+import statistics
+import subprocess
+import sys
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    steps = {}
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-m', 'super32emu', '--profile-startup'],
+            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        for line in result.stderr.splitlines():
+            if line.endswith(' ms'):
+                name, milliseconds = line[:16].strip(), float(line[16:-3])
+                steps.setdefault(name, []).append(milliseconds)
+
+    for name, values in steps.items():
+        print("{:<16}{:8.1f} ms".format(name, statistics.median(values)))
+
+
+if __name__ == "__main__":
+    main()
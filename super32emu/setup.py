@@ -24,7 +24,6 @@ setuptools.setup(
         'console_scripts': ['super32emu=super32emu.__main__:main'],
     },
     install_requires=[
-        'bitstring',
         'python-dotenv',
         'pyside2',
         'super32assembler',
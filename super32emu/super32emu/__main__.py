@@ -1,17 +1,68 @@
 """python emulator"""
 import sys
+import time
+
+# taken before the Qt imports, they are part of the startup report
+STARTED = time.perf_counter()
+
+from PySide2.QtCore import QTimer
 from PySide2.QtWidgets import QApplication
 from .ui.main_window import MainWindow
 from super32utils.settings.settings import Settings
 
+PROFILE_OPTION = '--profile-startup'
+
+
+class StartupProfile:
+    """Wall clock time of every startup step, reported on stderr"""
+
+    def __init__(self, started):
+        self.__started = started
+        self.__last = started
+        self.steps = []
+
+    def step(self, name):
+        now = time.perf_counter()
+        self.steps.append((name, now - self.__last))
+        self.__last = now
+
+    def total(self):
+        return self.__last - self.__started
+
+    def report(self):
+        for name, seconds in self.steps:
+            print("{:<16}{:8.1f} ms".format(name, seconds * 1000), file=sys.stderr)
+        print("{:<16}{:8.1f} ms".format("total", self.total() * 1000), file=sys.stderr)
+
 
 def main():
+    profile = StartupProfile(STARTED)
+    profile.step("imports")
+
     Settings.load()
-    APP = QApplication(sys.argv)
+    profile.step("settings")
+
+    APP = QApplication([arg for arg in sys.argv if arg != PROFILE_OPTION])
+    profile.step("application")
 
     WIDGET = MainWindow()
+    profile.step("main window")
+
     WIDGET.resize(1280, 720)
     WIDGET.show()
+    profile.step("show")
+
+    def report():
+        profile.step("panels")
+        profile.report()
+        APP.quit()
+
+    # zero timers run in order once the event loop has painted the window
+    if PROFILE_OPTION in sys.argv:
+        QTimer.singleShot(0, lambda: profile.step("first frame"))
+    QTimer.singleShot(0, WIDGET.create_panels)
+    if PROFILE_OPTION in sys.argv:
+        QTimer.singleShot(0, report)
 
     sys.exit(APP.exec_())
 
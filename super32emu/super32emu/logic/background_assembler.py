@@ -0,0 +1,79 @@
+"""Background assembly on a worker thread"""
+import logging
+
+from PySide2.QtCore import QObject, QRunnable, QThreadPool, Signal
+from super32assembler.assembler.diagnostics import Diagnostics
+
+
+class BackgroundAssembler(QObject):
+    """Assembles editor content on a worker thread
+
+    Jobs run one after another on a single worker thread. Every job gets a
+    generation number, jobs superseded by a newer one are dropped before
+    they start and their results are never posted.
+    """
+
+    report_ready = Signal(object, object)  # editor, Report
+
+    def __init__(self, commands, registers):
+        QObject.__init__(self)
+
+        self.__diagnostics = Diagnostics(commands, registers)
+        self.__pool = QThreadPool(self)
+        self.__pool.setMaxThreadCount(1)
+        self.__generation = 0
+
+        self.__signals = _JobSignals()
+        self.__signals.finished.connect(self.__on_finished)
+
+    def submit(self, editor, input_file, directory=None):
+        """Queue a new job for editor, stale queued jobs are cancelled"""
+        self.__generation += 1
+        self.__pool.clear()
+        self.__pool.start(_AssemblyJob(self, self.__generation, editor, input_file, directory))
+
+    def cancel(self):
+        """Drop all pending jobs and results"""
+        self.__generation += 1
+        self.__pool.clear()
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self.__generation
+
+    def check(self, input_file, directory=None):
+        """Runs on the worker thread"""
+        return self.__diagnostics.check(input_file, directory)
+
+    def post(self, generation, editor, report):
+        """Runs on the worker thread, hands the report to the UI thread"""
+        self.__signals.finished.emit(generation, editor, report)
+
+    def __on_finished(self, generation, editor, report):
+        if not self.is_current(generation):
+            logging.debug(f"Background assembly: dropped stale job {generation}")
+            return
+
+        self.report_ready.emit(editor, report)
+
+
+class _JobSignals(QObject):
+    finished = Signal(int, object, object)  # generation, editor, Report
+
+
+class _AssemblyJob(QRunnable):
+    def __init__(self, assembler, generation, editor, input_file, directory):
+        QRunnable.__init__(self)
+        self.assembler = assembler
+        self.generation = generation
+        self.editor = editor
+        self.input_file = input_file
+        self.directory = directory
+
+    def run(self):
+        if not self.assembler.is_current(self.generation):
+            return
+
+        report = self.assembler.check(self.input_file, self.directory)
+
+        if self.assembler.is_current(self.generation):
+            self.assembler.post(self.generation, self.editor, report)
@@ -1,36 +1,79 @@
 """Emulator-Logic"""
 import logging
-import os
 from os.path import dirname, join, normpath
 
-from PySide2.QtCore import Qt
-from bitstring import BitArray
 from super32assembler.assembler.architecture import Architectures
-from super32assembler.assembler.assembler import Assembler
-from super32assembler.preprocessor.preprocessor import Preprocessor
-from super32utils.inout.fileio import FileIO
+from super32assembler.assembler.instructionset import InstructionSet
+from super32assembler.assembler.session import AssemblerSession
+from super32assembler.image.machineimage import MachineImage, WORD_MASK
+from super32assembler.symbols.symbolindex import SymbolIndex
+
+# result of every arithmetic command from the values of its source registers
+OPERATIONS = {
+    'SUB': lambda r1, r2: r1 - r2,
+    'ADD': lambda r1, r2: r1 + r2,
+    'AND': lambda r1, r2: r1 & r2,
+    'OR': lambda r1, r2: r1 | r2,
+    'NOR': lambda r1, r2: (r1 | r2) ^ 0xffffffff,
+    'NAND': lambda r1, r2: (r1 & r2) ^ 0xffffffff,
+    'SHL': lambda r1, r2: r1 << r2,
+    'SLR': lambda r1, r2: r1 >> r2,
+    'SAR': lambda r1, r2: (r1 >> r2) | (r1 >> 31) * (0xffffffff >> (32 - r2) << (32 - r2)),
+}
+
+REGISTER_COUNT = 32
+# registers wired to a constant value, writes are ignored
+FIXED_REGISTERS = {30: 0, 31: 1}
 
 
 class Emulator:
-    """This is the logic to emulate the assembly instructions"""
+    """This is the logic to emulate the assembly instructions
 
-    def __init__(self, editor_widget, emulator_widget):
-        self.editor_widget = editor_widget
-        self.emulator_widget = emulator_widget
+    Instructions are fetched from memory, loads and stores access data_memory.
+    Both are the same image with the single architecture. The multi architecture
+    keeps them apart, the instruction memory is never written.
 
-        self.emulator_widget.reset_all_registers()
+    Execution stops when the END branch, an unconditional branch to itself,
+    is fetched. The END word directly follows the code, data may come behind it.
 
-        self.emulator_widget.set_z(0)
-        self.emulator_widget.set_pc(0)
-        self.emulator_widget.set_storage(''.ljust(2**10, '0'))
-        self.emulator_widget.set_symbols({"-": "-"})
+    Register values are kept in registers, the widget is told which of
+    them changed and which were accessed once per step.
+    """
+
+    def __init__(self, editor_widget, emulator_widget, architecture=Architectures.SINGLE):
+        self.editor_widget = editor_widget
+        self.emulator_widget = emulator_widget
 
         path_to_instructionset = normpath(join(dirname(__file__), '..', 'resources', 'instructionset.json'))
-        self.cfg = FileIO.read_json(path_to_instructionset)
-        self.commands = self.cfg['commands']
-        self.memory = []
+        self.instructionset = InstructionSet.load(path_to_instructionset)
+
+        # handlers of every opcode and operations of every arithmetic funct
+        handlers = {
+            'BEQ': self.__branch, 'LI': self.__load_immediate,
+            'LW': self.__load, 'SW': self.__save,
+        }
+        self.__handlers = {
+            opcode: handlers[name] for opcode, name in self.instructionset.opcodes.items()
+            if name in handlers
+        }
+        self.__operations = {
+            funct: OPERATIONS[name] for funct, name in self.instructionset.functs.items()
+            if name in OPERATIONS
+        }
+
+        self.architecture = architecture
+        self.memory = MachineImage()
+        self.data_memory = self.memory
+        self.loaded_machine_code = None
+        self.session = AssemblerSession(
+            self.instructionset.commands, self.instructionset.registers, architecture)
 
         self.editor_line_numbers = None
+        self.symbols = SymbolIndex({})
+        self.registers = [0] * REGISTER_COUNT
+        self.__changed_registers = 0
+        self.__accessed_registers = 0
+        self.__reset_registers()
         self.row_counter = 0
         self.changed_memory_address = None
         self.emulation_running = False
@@ -40,38 +83,48 @@ class Emulator:
         if self.emulation_running is False:
             self.run()
 
-        while self.row_counter < len(self.memory) - 1:
-            if self.editor_widget.is_breakpoint_set(self.__get_current_editor_line()) and not self.__flag_breakpoint:
+        while not self.is_halted():
+            current_editor_line = self.__get_current_editor_line()
+            if current_editor_line is not None and not self.__flag_breakpoint \
+                    and self.editor_widget.is_breakpoint_set(current_editor_line):
                 self.__flag_breakpoint = True
                 break
 
             self.__flag_breakpoint = False
             self.emulate_step()
 
+    def is_halted(self) -> bool:
+        """The program stops at the END branch or behind the last word of memory"""
+        return self.row_counter >= len(self.memory) \
+            or self.instructionset.halts(self.memory[self.row_counter])
+
     def emulate_step(self):
-        if self.row_counter >= len(self.memory) - 1:
+        if self.is_halted():
             return
 
-        logging.debug(f"Executing code address {self.row_counter * 4}")
+        logging.debug(f"Executing code address {self.symbols.format(self.row_counter * 4)}")
 
         self.emulator_widget.reset_highlighted_memory_lines()
-        self.emulator_widget.reset_all_register_backgrounds()
         self.emulator_widget.set_z(0)
 
         instructionset = self.memory[self.row_counter]
         self.__parse_instructionset(instructionset)
         self.row_counter += 1
 
+        self.__show_registers()
+
         self.__set_programm_counter()
 
         self.emulator_widget.set_storage(
-            ''.join(self.memory).ljust(2 ** 10, '0'))
+            ''.join(self.data_memory.to_lines()).ljust(2 ** 10, '0'))
 
-        self.emulator_widget.highlight_memory_line(self.row_counter)
+        if self.data_memory is self.memory:
+            self.emulator_widget.highlight_memory_line(self.row_counter)
         self.__highlight_editor_line()
 
         if self.changed_memory_address is not None:
-            self.emulator_widget.highlight_memory_line(self.changed_memory_address, Qt.lightGray)
+            self.emulator_widget.highlight_accessed_memory_line(self.changed_memory_address)
+            self.emulator_widget.set_symbol_values(self.data_memory, self.changed_memory_address)
             self.changed_memory_address = None
 
     def end_emulation(self):
@@ -80,10 +133,10 @@ class Emulator:
         self.emulator_widget.set_pc(0)
         self.emulator_widget.reset_pc_background()
         self.emulator_widget.set_storage(''.ljust(2 ** 10, '0'))
-        self.emulator_widget.set_symbols({"-": "-"})
-        self.emulator_widget.reset_all_registers()
+        self.emulator_widget.set_symbols({})
+        self.emulator_widget.set_symbol_values(None)
+        self.__reset_registers()
         self.emulator_widget.reset_highlighted_memory_lines()
-        self.emulator_widget.reset_all_register_backgrounds()
 
         try:
             self.editor_widget.editor_readonly(False)
@@ -93,144 +146,139 @@ class Emulator:
             pass
 
         self.emulation_running = False
+        self.loaded_machine_code = None
         logging.debug(f"End of program execution")
 
+    def set_architecture(self, architecture):
+        """Use separate instruction and data memories (multi) or one memory (single)"""
+        if architecture != self.architecture:
+            self.architecture = architecture
+            self.session = AssemblerSession(
+                self.instructionset.commands, self.instructionset.registers, architecture)
+
+    def assemble(self):
+        """Assemble the code written in the editor
+
+        Only lines changed since the last call are assembled again.
+        Returns code_address, machine_code, symboltable and editor_line_numbers
+        """
+        return self.session.update(
+            self.editor_widget.get_text(), self.editor_widget.get_file_directory())
+
+    def load(self, machine_code):
+        """Execute machine_code on the next run instead of the code in the editor"""
+        self.loaded_machine_code = machine_code
+
     def run(self):
         """Parse and execute the commands written in the editor"""
-        preprocessor = Preprocessor()
-        assembler = Assembler(Architectures.SINGLE)
-
-        self.code_address, code, zeros_constants, symboltable, self.editor_line_numbers = preprocessor.parse(
-            input_file=self.editor_widget.get_text()
-        )
-
-        self.memory = assembler.parse(
-            code_address=self.code_address,
-            code=code,
-            zeros_constants=zeros_constants,
-            commands=self.cfg['commands'],
-            registers=self.cfg['registers'],
-            symboltable=symboltable
-        )
+        if self.loaded_machine_code is not None:
+            # loaded machine code has no source lines
+            self.memory = self.loaded_machine_code.copy()
+            self.code_address, symboltable, self.editor_line_numbers = None, {}, None
+            data_memory = None
+        else:
+            self.code_address, self.memory, symboltable, self.editor_line_numbers = self.assemble()
+            data_memory = self.session.data_memory()
+
+        if self.architecture != Architectures.MULTI:
+            self.data_memory = self.memory
+        elif data_memory is None:
+            self.data_memory = MachineImage.zeros(len(self.memory))
+        else:
+            self.data_memory = data_memory
 
+        self.symbols = SymbolIndex(symboltable)
         self.emulator_widget.set_symbols(symboltable)
-        self.emulator_widget.reset_all_registers()
+        self.emulator_widget.set_symbol_values(self.data_memory)
+        self.__reset_registers()
 
         # Set the memory content to the widget
         # Fill remaining memory with zeros
         self.emulator_widget.set_storage(
-            ''.join(self.memory).ljust(2**10, '0'))
+            ''.join(self.data_memory.to_lines()).ljust(2**10, '0'))
 
         self.row_counter = 0
 
         self.emulation_running = True
-        self.editor_widget.editor_readonly()
+        try:
+            self.editor_widget.editor_readonly()
+        except AttributeError:
+            # Happens when no editor tab is open
+            pass
 
         logging.debug(f"Starting new program execution: ")
 
-    def __parse_instructionset(self, instructionset: str):
-        instruction = instructionset[0:6]
+    def __parse_instructionset(self, instructionset: int):
+        instruction = instructionset >> 26
+        rs = (instructionset >> 21) & 0x1F
+        rt = (instructionset >> 16) & 0x1F
+        immediate = instructionset & 0xFFFF
 
-        if instruction == '000000':
+        if instruction == 0:
             self.__arithmetic_instruction(
-                instructionset[6:11],
-                instructionset[11:16],
-                instructionset[16:21],
-                instructionset[26:32])
-        elif instruction == self.commands['branch']['BEQ']:
-            self.__branch(
-                instructionset[6:11],
-                instructionset[11:16],
-                instructionset[16:32])
-        elif instruction == self.commands['storage']['LI']:
-            self.__load_immediate(
-                instructionset[6:11],
-                instructionset[11:16],
-                instructionset[16:32])
-        elif instruction == self.commands['storage']['LW']:
-            self.__load(
-                instructionset[6:11],
-                instructionset[11:16],
-                instructionset[16:32])
-        elif instruction == self.commands['storage']['SW']:
-            self.__save(
-                instructionset[6:11],
-                instructionset[11:16],
-                instructionset[16:32])
-
-    def __arithmetic_instruction(self, first_source: str, second_source: str, target: str, func: str):
+                rs,
+                rt,
+                (instructionset >> 11) & 0x1F,
+                instructionset & 0x3F)
+        elif instruction in self.__handlers:
+            self.__handlers[instruction](rs, rt, immediate)
+
+    def __arithmetic_instruction(self, first_source: int, second_source: int, target: int,
+                                 func: int):
         r1_value = self.__get_register_value(first_source)
         r2_value = self.__get_register_value(second_source)
 
-        if func == self.commands['arithmetic']['SUB']:
-            result = r1_value - r2_value
-        elif func == self.commands['arithmetic']['ADD']:
-            result = r1_value + r2_value
-        elif func == self.commands['arithmetic']['AND']:
-            result = r1_value & r2_value
-        elif func == self.commands['arithmetic']['OR']:
-            result = r1_value | r2_value
-        elif func == self.commands['arithmetic']['NOR']:
-            result = (r1_value | r2_value) ^ 0xffffffff
-        elif func == self.commands['arithmetic']['NAND']:
-            result = (r1_value & r2_value) ^ 0xffffffff
-        elif func == self.commands['arithmetic']['SHL']:
-            result = r1_value << r2_value
-        elif func == self.commands['arithmetic']['SLR']:
-            result = r1_value >> r2_value
-        elif func == self.commands['arithmetic']['SAR']:
-            result = (r1_value >> r2_value) | (r1_value >> 31) * (0xffffffff >> (32 - r2_value) << (32 - r2_value))
-        else:
+        operation = self.__operations.get(func)
+        if operation is None:
             # TODO Define exception for unknown instruction
             raise Exception
 
-        self.__set_z_register(r1_value, r2_value)
+        result = operation(r1_value, r2_value)
 
-        register = self.__get_register_index(target)
-        result_hex = hex(result)[2:].upper()
+        self.__set_z_register(r1_value, r2_value)
 
         self.__highlight_register(first_source)
         self.__highlight_register(second_source)
-        self.emulator_widget.set_register(register, result_hex)
+        self.__set_register_value(target, result)
 
-        logging.debug(f"Arithmetic: Handling contents from registers {self.__get_register_index(first_source)}"
-                      f" and {self.__get_register_index(second_source)}. "
-                      f"Saving result to {self.__get_register_index(target)}.")
+        logging.debug(f"Arithmetic: Handling contents from registers {first_source}"
+                      f" and {second_source}. "
+                      f"Saving result to {target}.")
 
-    def __branch(self, r2: str, r1: str, offset: str):
+    def __branch(self, r2: int, r1: int, offset: int):
         r1_value = self.__get_register_value(r1)
         r2_value = self.__get_register_value(r2)
 
         self.__set_z_register(r1_value, r2_value)
 
         if not r1_value == r2_value:
-            logging.debug(f"Branch: Did not branch. Register contents of {self.__get_register_index(r1)}"
-                          f" and {self.__get_register_index(r2)} not equal")
+            logging.debug(f"Branch: Did not branch. Register contents of {r1}"
+                          f" and {r2} not equal")
             return
 
-        offset_num = BitArray(bin=offset).int
+        offset_num = self.__to_signed(offset)
 
         # Relative addressing pointing to memory row
         # Processor architecture uses left-shift to calculate actual byte offset
         self.row_counter = self.row_counter + offset_num
 
-        logging.debug(f"Branch: Continuing program execution at address {(self.row_counter + 1) * 4}")
+        logging.debug(f"Branch: Continuing program execution at address "
+                      f"{self.symbols.format((self.row_counter + 1) * 4)}")
 
-    def __load_immediate(self, r2: str, r1: str, immediate: str):
-        imm_num = BitArray(bin=immediate).int
+    def __load_immediate(self, r2: int, r1: int, immediate: int):
+        imm_num = self.__to_signed(immediate)
         r2_value = self.__get_register_value(r2)
 
         self.__set_z_register(r2_value, imm_num)
 
         value = r2_value + imm_num
 
-        r1_num = BitArray(bin=r1).uint
-        self.emulator_widget.set_register(r1_num, value)
+        self.__set_register_value(r1, value)
 
-        logging.debug(f"Load: Loading value {value} into register {r1_num}")
+        logging.debug(f"Load: Loading value {value} into register {r1}")
 
-    def __load(self, r2: str, r1: str, offset: str):
-        offset_num = BitArray(bin=offset).int
+    def __load(self, r2: int, r1: int, offset: int):
+        offset_num = self.__to_signed(offset)
         r2_value = self.__get_register_value(r2)
 
         self.__set_z_register(r2_value, offset_num)
@@ -238,16 +286,14 @@ class Emulator:
         # Absolute addressing
         address = (offset_num + r2_value) // 4
 
-        memory_value = BitArray(bin=self.memory[address]).hex.upper()
-
-        r1_num = BitArray(bin=r1).uint
-        self.emulator_widget.set_register(r1_num, memory_value)
+        self.__set_register_value(r1, self.data_memory[address])
 
-        logging.debug(f"Load: Loading memory content from address {address * 4} into register {r1_num}")
+        logging.debug(f"Load: Loading memory content from address "
+                      f"{self.symbols.format(address * 4)} into register {r1}")
         self.changed_memory_address = address
 
-    def __save(self, r2: str, r1: str, offset: str):
-        offset_num = BitArray(bin=offset).int
+    def __save(self, r2: int, r1: int, offset: int):
+        offset_num = self.__to_signed(offset)
         r2_value = self.__get_register_value(r2)
 
         self.__set_z_register(r2_value, offset_num)
@@ -256,44 +302,62 @@ class Emulator:
         address = (offset_num + r2_value) // 4
 
         value = self.__get_register_value(r1)
-        value_bin = bin(value)[2:].rjust(32, '0')
 
         self.__highlight_register(r1)
-        self.memory[address] = value_bin
+        self.data_memory[address] = value & WORD_MASK
 
-        logging.debug(f"Save: Saving content from register {self.__get_register_index(r1)} to address {address * 4}")
+        logging.debug(f"Save: Saving content from register {r1} to address "
+                      f"{self.symbols.format(address * 4)}")
         self.changed_memory_address = address
 
-    def __get_register_index(self, target):
-        for register in self.cfg['registers']:
-            value = self.cfg['registers'][register]
-            if target == value:
-                return int(value, 2)
-
-    def __get_register_value(self, register: str) -> int:
-        register_num = BitArray(bin=register).uint
-        register_value = int(self.emulator_widget.get_register(register_num), 16)
-
-        return register_value
+    @staticmethod
+    def __to_signed(immediate: int) -> int:
+        """Interprets a 16 bit immediate as two's complement number"""
+        return immediate - 0x10000 if immediate & 0x8000 else immediate
+
+    def __get_register_value(self, register: int) -> int:
+        return self.registers[register]
+
+    def __set_register_value(self, register: int, value: int):
+        """Stores the lower 32 bits of value, the register is highlighted"""
+        if register not in FIXED_REGISTERS:
+            self.registers[register] = value & WORD_MASK
+            self.__changed_registers |= 1 << register
+        self.__highlight_register(register)
+
+    def __reset_registers(self):
+        self.registers = [FIXED_REGISTERS.get(i, 0) for i in range(REGISTER_COUNT)]
+        self.__changed_registers = (1 << REGISTER_COUNT) - 1
+        self.__accessed_registers = 0
+        self.__show_registers()
+
+    def __show_registers(self):
+        """Repaints registers changed or accessed since the last call"""
+        self.emulator_widget.set_registers(
+            self.registers, self.__changed_registers, self.__accessed_registers)
+        self.__changed_registers = 0
+        self.__accessed_registers = 0
 
     def __set_programm_counter(self):
         address_counter = self.row_counter * 4
         address_counter_hex = hex(address_counter)[2:].upper()
-        self.emulator_widget.set_pc(address_counter_hex)
+        self.emulator_widget.set_pc(address_counter_hex, self.symbols.format(address_counter))
 
     def __get_current_editor_line(self) -> int:
         row_counter_at_start_directive = self.row_counter == 0
-        if row_counter_at_start_directive:
+        if row_counter_at_start_directive or self.editor_line_numbers is None:
             return
 
         current_address_without_offset = self.row_counter - self.code_address // 4
         return self.editor_line_numbers[current_address_without_offset]
 
-    def __highlight_register(self, register):
-        register_num = BitArray(bin=register).uint
-        self.emulator_widget.set_register_background(register_num, "lightGray")
+    def __highlight_register(self, register: int):
+        self.__accessed_registers |= 1 << register
 
     def __highlight_editor_line(self):
+        if self.editor_line_numbers is None:
+            return  # loaded machine code has no source lines
+
         self.editor_widget.reset_highlighted_lines()
         current_editor_line = self.__get_current_editor_line()
 
@@ -1,61 +1,83 @@
-from PySide2.QtGui import QSyntaxHighlighter, QTextCharFormat, QFont, Qt
-from PySide2.QtCore import QRegExp
+from functools import lru_cache
+from os.path import dirname, join, normpath
+
+from PySide2.QtGui import QSyntaxHighlighter, QTextCharFormat, Qt
+from PySide2.QtCore import QRegularExpression
+from super32assembler.assembler.instructionset import InstructionSet
+from super32assembler.preprocessor.asmdirectives import AssemblerDirectives
 
 from ..ui.ui_style import UiStyle
 
+PATH_TO_INSTRUCTIONSET = normpath(join(dirname(__file__), '..', 'resources', 'instructionset.json'))
+
+# every line is highlighted on its own, the block state never changes
+# and Qt does not have to rehighlight the blocks following an edit
+LINE_STATE = 0
+
+
+def _text_format(color) -> QTextCharFormat:
+    text_format = QTextCharFormat()
+    text_format.setForeground(color)
+    UiStyle.set_font_weight(text_format)
+    return text_format
+
+
+# format of the capturing group with the same index in the pattern
+FORMATS = (
+    None,
+    _text_format(Qt.darkGreen),  # comment
+    _text_format(Qt.darkCyan),  # label
+    _text_format(Qt.darkBlue),  # instruction
+    _text_format(Qt.darkBlue),  # assembler directive
+    _text_format(Qt.darkMagenta),  # register
+)
+
+
+def _alternatives(names) -> str:
+    # longest names first, a name never hides a longer one starting with it
+    names = sorted(names, key=lambda name: (-len(name), name))
+    return '|'.join(QRegularExpression.escape(name) for name in names)
+
+
+@lru_cache(maxsize=None)
+def pattern_of(instructionset: InstructionSet) -> QRegularExpression:
+    """One alternation for all tokens of instructionset, compiled once"""
+    pattern = QRegularExpression(
+        "('.*)"
+        "|(\\b[A-Za-z0-9_-]+:)"
+        "|\\b({instructions})\\b"
+        "|\\b({directives})\\b"
+        "|\\b({registers})\\b".format(
+            instructions=_alternatives(instructionset.groups),
+            directives=_alternatives(AssemblerDirectives.__members__),
+            registers=_alternatives(instructionset.registers)))
+    pattern.optimize()
+    return pattern
+
 
 class SyntaxHighlighter(QSyntaxHighlighter):
-    """Super32 Syntax-Highlighter"""
+    """Super32 Syntax-Highlighter
 
-    def __init__(self, parent):
+    A line is scanned once with the pattern of the instruction set,
+    matches are formatted by the group they were captured in.
+    """
+
+    def __init__(self, parent, instructionset: InstructionSet = None):
         super().__init__(parent)
-        self.matches = []
-        self.highlighting_rules = []
-
-        # singlelinecomment definitions
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(Qt.darkGreen)
-        UiStyle.set_font_weight(comment_format)
-        comment_pattern = QRegExp("'[^\n]*")
-        self.highlighting_rules.append((comment_pattern, comment_format))
-
-        # instruction definitions
-        instruction_format = QTextCharFormat()
-        instruction_format.setForeground(Qt.darkBlue)
-        UiStyle.set_font_weight(instruction_format)
-        instruction_pattern = QRegExp("\\b(SUB|ADD|AND|OR|NOR|NAND|SHL|SLR|SAR|BEQ|LI|LW|SW)\\b")
-        self.highlighting_rules.append(
-            (instruction_pattern, instruction_format))
-
-        # assembler directive definitions
-        directive_format = QTextCharFormat()
-        directive_format.setForeground(Qt.darkBlue)
-        UiStyle.set_font_weight(directive_format)
-        directive_pattern = QRegExp("\\b(ORG|START|END|DEFINE)\\b")
-        self.highlighting_rules.append(
-            (directive_pattern, directive_format))
-
-        # label definitions
-        label_format = QTextCharFormat()
-        label_format.setForeground(Qt.darkCyan)
-        UiStyle.set_font_weight(label_format)
-        label_pattern = QRegExp("\\b[A-Za-z0-9_-]+:")
-        self.highlighting_rules.append((label_pattern, label_format))
-
-        # registers definitions
-        register_format = QTextCharFormat()
-        register_format.setForeground(Qt.darkMagenta)
-        UiStyle.set_font_weight(register_format)
-        register_pattern = QRegExp("\\bR[0-9]+")
-        self.highlighting_rules.append((register_pattern, register_format))
+
+        if instructionset is None:
+            instructionset = InstructionSet.load(PATH_TO_INSTRUCTIONSET)
+        self.__pattern = pattern_of(instructionset)
 
     def highlightBlock(self, text):
         """Check textblock wether to highlight or not"""
 
-        for (pattern, style) in self.highlighting_rules:
-            index = pattern.indexIn(text)
-            while index >= 0:
-                self.matches.append(pattern.cap(1))
-                length = pattern.matchedLength()
-                self.setFormat(index, length, style)
-                index = pattern.indexIn(text, index + length)
+        self.setCurrentBlockState(LINE_STATE)
+        if not text:
+            return
+
+        matches = self.__pattern.globalMatch(text)
+        while matches.hasNext():
+            match = matches.next()
+            group = match.lastCapturedIndex()
+            self.setFormat(match.capturedStart(group), match.capturedLength(group), FORMATS[group])
@@ -0,0 +1,54 @@
+""" emulator tests """
+from super32assembler.assembler.assembler import Assembler
+from super32assembler.assembler.architecture import Architectures
+from super32assembler.preprocessor.preprocessor import Preprocessor
+from super32emu.logic.emulator import Emulator
+
+PROGRAM = ['ORG 4', 'START', 'LI R1,5(R0)', 'ADD R2,R1,R1', 'END']
+
+
+class NoTabEditorWidget:
+    """ editor widget without an open tab, the current editor is None """
+
+    def __getattr__(self, name):
+        raise AttributeError("'NoneType' object has no attribute " + name)
+
+
+class EmulatorWidget:
+    """ emulator widget ignoring everything shown """
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def machine_code(emulator):
+    code_address, code, zeros_constants, symboltable, _ = Preprocessor().parse(PROGRAM)
+    return Assembler(Architectures.SINGLE).parse(
+        code_address=code_address,
+        code=code,
+        zeros_constants=zeros_constants,
+        commands=emulator.instructionset.commands,
+        registers=emulator.instructionset.registers,
+        symboltable=symboltable
+    )
+
+
+def test_step_loaded_machine_code_without_tab():
+    emulator = Emulator(NoTabEditorWidget(), EmulatorWidget())
+    emulator.load(machine_code(emulator))
+    emulator.run()
+
+    while not emulator.is_halted():
+        emulator.emulate_step()
+
+    assert emulator.registers[2] == 10
+    emulator.end_emulation()
+
+
+def test_run_loaded_machine_code_without_tab():
+    emulator = Emulator(NoTabEditorWidget(), EmulatorWidget())
+    emulator.load(machine_code(emulator))
+    emulator.emulate_continuous()
+
+    assert emulator.is_halted()
+    assert emulator.registers[2] == 10
@@ -1,22 +1,32 @@
-from PySide2.QtCore import SIGNAL, QRect
-from PySide2.QtGui import QMouseEvent, QFontMetrics, QKeyEvent
+from PySide2.QtCore import QEvent, QPoint
+from PySide2.QtGui import QMouseEvent, QKeyEvent, QTextBlockUserData, QTextCharFormat, QTextCursor
 from PySide2.QtGui import Qt, QPainter
+from PySide2.QtWidgets import QTextEdit, QToolTip
 
 from .line_number_editor import LineNumberEditor
 from .ui_style import UiStyle
 
 
+class Breakpoint(QTextBlockUserData):
+    """User data of a block with a breakpoint, it moves with the block on edits"""
+
+
 class CodeEditor(LineNumberEditor):
     """
     Editor with line numbers and break points
 
+    Breakpoints are stored as user data of their block,
+    so they stay on their line when lines are inserted or removed above.
+
     https://github.com/eyllanesc/stackoverflow/tree/master/questions/46327656
     """
 
+    BREAKPOINT_SIZE = 10
+
     def __init__(self):
         super(CodeEditor, self).__init__(20)
         self.lineNumberArea.mouseReleaseEvent = self.onClicked
-        self.breakpoints = []
+        self.diagnostics = {}
 
         self.setFont(UiStyle.get_font(point_size=12))
 
@@ -30,31 +40,7 @@ class CodeEditor(LineNumberEditor):
             return
         return super(CodeEditor, self).keyPressEvent(e)
 
-    def updateLineNumberAreaWidth(self, _):
-        self.setViewportMargins(self.lineNumberAreaWidth(), 0, 0, 0)
-
-    def updateLineNumberArea(self, rect, dy):
-        if dy:
-            self.lineNumberArea.scroll(0, dy)
-        else:
-            self.lineNumberArea.update(0, rect.y(), self.lineNumberArea.width(),
-                                       rect.height())
-
-        if rect.contains(self.viewport().rect()):
-            self.updateLineNumberAreaWidth(0)
-
-    def resizeEvent(self, event):
-        """
-        When the size of the editor changes, we also need to resize the line number area
-        """
-        super().resizeEvent(event)
-
-        cr = self.contentsRect()
-        self.lineNumberArea.setGeometry(QRect(cr.left(), cr.top(),
-                                              self.lineNumberAreaWidth(), cr.height()))
-
     def lineNumberAreaPaintEvent(self, event):
-        width_circle = 10
         painter = QPainter(self.lineNumberArea)
         painter.setBrush(Qt.red)
         painter.setPen(Qt.black)
@@ -65,17 +51,19 @@ class CodeEditor(LineNumberEditor):
         blockNumber = block.blockNumber()
         top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
         bottom = top + self.blockBoundingRect(block).height()
-        height = self.fontMetrics().height()
+        height = self.lineHeight
+        width = self.lineNumberArea.width()
+        ellipse_offset = (height - self.BREAKPOINT_SIZE) / 2
 
         while block.isValid() and (top <= event.rect().bottom()):
             if block.isVisible() and (bottom >= event.rect().top()):
 
-                if blockNumber in self.breakpoints:
-                    ellipse_center = top + (self.fontMetrics().height() - width_circle) / 2
-                    painter.drawEllipse(0, ellipse_center, width_circle, width_circle)
+                if isinstance(block.userData(), Breakpoint):
+                    painter.drawEllipse(
+                        0, top + ellipse_offset, self.BREAKPOINT_SIZE, self.BREAKPOINT_SIZE)
 
                 number = str(blockNumber + 1)
-                painter.drawText(0, top, self.lineNumberArea.width(), height, Qt.AlignRight, number)
+                painter.drawText(0, top, width, height, Qt.AlignRight, number)
 
             block = block.next()
             top = bottom
@@ -83,27 +71,48 @@ class CodeEditor(LineNumberEditor):
             blockNumber += 1
 
     def onClicked(self, event: QMouseEvent):
-        block = self.firstVisibleBlock()
-        top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
-        bottom = top + self.blockBoundingRect(block).height()
-        mousePosY = event.y()
-
-        blockNumber = block.blockNumber()
-
-        while block.isValid():
-            if block.isVisible() and top < mousePosY < bottom:
-
-                if blockNumber in self.breakpoints:
-                    self.breakpoints.remove(blockNumber)
-                else:
-                    self.breakpoints.append(blockNumber)
-                self.update()
-                return
+        block = self.cursorForPosition(QPoint(0, event.y())).block()
+        if not block.isValid():
+            return
 
-            blockNumber += 1
-            block = block.next()
-            top = bottom
-            bottom = top + self.blockBoundingRect(block).height()
+        if isinstance(block.userData(), Breakpoint):
+            block.setUserData(None)
+        else:
+            block.setUserData(Breakpoint())
+        self.lineNumberArea.update()
 
     def is_breakpoint_set(self, line: int) -> bool:
-        return line in self.breakpoints
+        if line is None:
+            return False
+        return isinstance(self.document().findBlockByNumber(line).userData(), Breakpoint)
+
+    def setDiagnostics(self, diagnostics):
+        """Underlines faulty lines with a red squiggle, the message is shown as tooltip"""
+        self.diagnostics = {
+            diagnostic.line: diagnostic.message
+            for diagnostic in diagnostics
+            if diagnostic.line is not None
+        }
+        self.diagnosticSelections = []
+
+        for line_number in self.diagnostics:
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+            selection.format.setUnderlineColor(Qt.red)
+            selection.cursor = QTextCursor(self.document().findBlockByNumber(line_number))
+            selection.cursor.movePosition(QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
+            self.diagnosticSelections.append(selection)
+
+        self.applyExtraSelections()
+
+    def viewportEvent(self, event):
+        if event.type() == QEvent.ToolTip:
+            line_number = self.cursorForPosition(event.pos()).blockNumber()
+            message = self.diagnostics.get(line_number)
+            if message:
+                QToolTip.showText(event.globalPos(), message, self.viewport())
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super(CodeEditor, self).viewportEvent(event)
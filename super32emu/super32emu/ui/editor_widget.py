@@ -1,6 +1,8 @@
 """python emulator"""
+import os
+
 from PySide2.QtWidgets import QFrame, QPlainTextEdit, QTabWidget, QVBoxLayout, QWidget
-from PySide2.QtCore import Slot
+from PySide2.QtCore import QTimer, Signal, Slot
 
 from ..logic.highlighter import SyntaxHighlighter
 from .code_editor import *
@@ -11,6 +13,11 @@ class EditorWidget(QWidget):
 
     tab_count = 0
 
+    # milliseconds without edits before the code is assembled in the background
+    ASSEMBLY_DELAY = 300
+
+    diagnostics_changed = Signal(object)  # Report of the current tab
+
     def __init__(self):
         QWidget.__init__(self)
 
@@ -24,6 +31,19 @@ class EditorWidget(QWidget):
 
         self.__open_file_paths = []
 
+        self.__background_assembler = None
+        self.__assembly_timer = QTimer(self)
+        self.__assembly_timer.setSingleShot(True)
+        self.__assembly_timer.setInterval(EditorWidget.ASSEMBLY_DELAY)
+        self.__assembly_timer.timeout.connect(self.__assemble)
+        self.tabs.currentChanged.connect(self.__schedule_assembly)
+
+    def set_background_assembler(self, background_assembler):
+        """Check the code of the current tab with background_assembler while typing"""
+        self.__background_assembler = background_assembler
+        background_assembler.report_ready.connect(self.__on_report)
+        self.__schedule_assembly()
+
     def new_tab(self, title="", content="") -> int:
         """Append new tab"""
 
@@ -33,6 +53,7 @@ class EditorWidget(QWidget):
 
         editor.setFrameShape(QFrame.NoFrame)
         editor.setPlainText(content)
+        editor.textChanged.connect(self.__schedule_assembly)
         tab_index = self.tabs.addTab(
             editor,
             "Untitled-{tab_count}".format(tab_count=EditorWidget.tab_count)
@@ -57,6 +78,12 @@ class EditorWidget(QWidget):
     def get_file_path(self) -> str:
         return self.__open_file_paths[self.tabs.currentIndex()]
 
+    def get_file_directory(self):
+        """Directory of the current file, INCLUDE files are searched there"""
+        if not self.exists_file_path():
+            return None
+        return os.path.dirname(os.path.abspath(self.get_file_path()))
+
     def set_current_tab_file_path(self, path):
         self.__open_file_paths[self.tabs.currentIndex()] = path
 
@@ -81,19 +108,60 @@ class EditorWidget(QWidget):
 
     def is_breakpoint_set(self, line: int) -> bool:
         editor = self.tabs.currentWidget()
-        return editor.is_breakpoint_set(line)
+        return editor is not None and editor.is_breakpoint_set(line)
 
     def editor_readonly(self, readonly: bool = True):
         editor = self.tabs.currentWidget()
         editor.setReadOnly(readonly)
 
+    def find_label(self, label: str):
+        """Number of the line defining label in the current tab, None if there is none"""
+        if self.tabs.currentWidget() is None:
+            return None
+
+        for line_number, line in enumerate(self.get_text()):
+            if ':' in line and line.split(':')[0].strip() == label:
+                return line_number
+        return None
+
+    def go_to_line(self, line_number: int):
+        editor = self.tabs.currentWidget()
+        editor.setTextCursor(QTextCursor(editor.document().findBlockByNumber(line_number)))
+        editor.centerCursor()
+
     def highlight_line(self, line_number: int):
         editor = self.tabs.currentWidget()
-        editor.highlightLine(line_number)
+        if editor is not None:
+            editor.highlightLine(line_number)
 
     def reset_highlighted_lines(self):
         editor = self.tabs.currentWidget()
-        editor.resetHighlightedLines()
+        if editor is not None:
+            editor.resetHighlightedLines()
+
+    @Slot()
+    def __schedule_assembly(self):
+        """Restart the debounce timer on every edit"""
+        if self.__background_assembler is not None:
+            self.__background_assembler.cancel()
+            self.__assembly_timer.start()
+
+    @Slot()
+    def __assemble(self):
+        editor = self.tabs.currentWidget()
+        if editor is None or self.__background_assembler is None:
+            return
+        self.__background_assembler.submit(
+            editor, editor.toPlainText().split("\n"), self.get_file_directory())
+
+    @Slot()
+    def __on_report(self, editor, report):
+        if self.tabs.indexOf(editor) < 0:
+            return  # tab closed in the meantime
+
+        editor.setDiagnostics(report.diagnostics)
+        if editor is self.tabs.currentWidget():
+            self.diagnostics_changed.emit(report)
 
     @Slot()
     def __on_close_tab(self, index):
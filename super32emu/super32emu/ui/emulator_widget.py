@@ -1,20 +1,30 @@
 """python emulator"""
 from PySide2.QtCore import Qt, QSize
-from PySide2.QtWidgets import QDockWidget, QGridLayout, QGroupBox, QLineEdit, QVBoxLayout, \
-    QWidget, QFormLayout, QLabel, QSizePolicy
+from PySide2.QtWidgets import QDockWidget, QGridLayout, QGroupBox, QVBoxLayout, QWidget
 
 from .memory_widget import *
+from .register_file_widget import RegisterFileWidget
 from .register_widget import RegisterWidget
+from .symbol_table_widget import SymbolTableWidget
+
+# one stylesheet for the default background of the Z and PC registers,
+# RegisterWidget only sets its own while it is highlighted
+REGISTER_STYLE = "RegisterWidget QLineEdit { background-color: white; }"
 
 
 class EmulatorDockWidget(QDockWidget):
-    """Dockable emulator widget"""
+    """Dockable emulator widget
+
+    The emulator widget is built on first use, until then the dock
+    only holds an empty placeholder of the same width.
+    """
 
     def __init__(self):
         QDockWidget.__init__(self)
 
-        self.emulator = EmulatorWidget()
-        self.emulator.setSizeHint(600, 0)
+        self.__emulator = None
+        self.__placeholder = QWidget()
+        self.__placeholder.setMinimumWidth(600)
         self.setWindowTitle(self.tr("Hardware-Monitor"))
         self.setAllowedAreas(Qt.RightDockWidgetArea)
         self.setStyleSheet(
@@ -45,7 +55,20 @@ class EmulatorDockWidget(QDockWidget):
             """
         )
 
-        self.setWidget(self.emulator)
+        self.setWidget(self.__placeholder)
+
+    @property
+    def emulator(self):
+        """The emulator widget, built when it is first needed"""
+        if self.__emulator is None:
+            self.__emulator = EmulatorWidget()
+            self.__emulator.setSizeHint(600, 0)
+            self.setWidget(self.__emulator)
+            self.__emulator.show()
+            self.__placeholder.deleteLater()
+            self.__placeholder = None
+
+        return self.__emulator
 
 
 class EmulatorWidget(QWidget):
@@ -66,6 +89,10 @@ class EmulatorWidget(QWidget):
 
         self.setLayout(layout)
 
+        self.setStyleSheet(REGISTER_STYLE)
+
+        self.__storage = None
+
         self.__create_register_group()
         self.__create_storage_group()
         self.__create_symbol_group()
@@ -81,29 +108,16 @@ class EmulatorWidget(QWidget):
         return super(EmulatorWidget, self).sizeHint()
 
     def __create_register_group(self):
-        self.index = 0
-        self.register = []
         self.register_layout = QGridLayout()
 
-        for i in range(30):
-            r = RegisterWidget('R' + str(i))
-            self.register.append(r)
-        self.register.append(RegisterWidget('R30', 0))
-        self.register.append(RegisterWidget('R31', 1))
-
-        current_register = 0
-
-        for x in range(8):
-            for y in range(4):
-                r = self.register[current_register]
-                self.register_layout.addWidget(r, x, y, Qt.AlignRight)
-                current_register += 1
+        self.register_file = RegisterFileWidget()
+        self.register_layout.addWidget(self.register_file, 0, 0, 1, 4)
 
         self.z_register = RegisterWidget("Z", mask="B")
-        self.register_layout.addWidget(self.z_register, 9, 2, alignment=Qt.AlignRight)
+        self.register_layout.addWidget(self.z_register, 1, 2, alignment=Qt.AlignRight)
 
         self.program_counter = RegisterWidget("PC")
-        self.register_layout.addWidget(self.program_counter, 9, 3, alignment=Qt.AlignRight)
+        self.register_layout.addWidget(self.program_counter, 1, 3, alignment=Qt.AlignRight)
 
         self.register_group.setLayout(self.register_layout)
 
@@ -116,47 +130,23 @@ class EmulatorWidget(QWidget):
         storage_layout.addWidget(self.storage)
         self.storage_group.setLayout(storage_layout)
 
-    def __create_symbol_group(self):
-        self.symbol_layout = QFormLayout()
-        self.symbol_layout.setHorizontalSpacing(5)
-        self.symbol_layout.setVerticalSpacing(5)
-        self.symbol_layout.setLabelAlignment(Qt.AlignLeft)
-        self.symbol_layout.setFieldGrowthPolicy(
-            QFormLayout.ExpandingFieldsGrow)
-        self.symbol_layout.setFormAlignment(Qt.AlignHCenter | Qt.AlignTop)
-        self.symbol_group.setLayout(self.symbol_layout)
-
-        symbol = QLabel(self.tr("Symbol"))
-        self.symbol_layout.addRow(self.tr("Value"), symbol)
-
-    def get_register(self, index):
-        """Sets the value of a register chosen by its index"""
-        if index < 0 or index > 32:
-            raise Exception('Register out of index')
-
-        return self.register[index].get_value()
+        self.set_storage(''.ljust(2**10, '0'))
 
-    def set_register_background(self, index, color="white"):
-        """Resets the register background color"""
-        if index < 0 or index > 32:
-            raise Exception('Register out of index')
-
-        self.register[index].set_background_color(color)
-
-    def set_register(self, index, value, highlight: bool = True):
-        """Sets the value of a register chosen by its index"""
-        if index < 0 or index > 32:
-            raise Exception('Register out of index')
+    def __create_symbol_group(self):
+        self.symbol_table = SymbolTableWidget()
 
-        self.register[index].set_value(str(value), highlight)
+        symbol_layout = QVBoxLayout()
+        symbol_layout.addWidget(self.symbol_table)
+        self.symbol_group.setLayout(symbol_layout)
 
-    def reset_all_register_backgrounds(self):
-        for rindex in range(32):
-            self.set_register_background(rindex)
+    def set_registers(self, values, changed: int = None, highlighted: int = 0):
+        """Shows the register values of the emulator
 
-    def reset_all_registers(self):
-        for rindex in range(32):
-            self.set_register(rindex, '00000000', False)
+        changed and highlighted are bitmasks of the registers whose value
+        changed and of the registers accessed by the last instruction.
+        All registers are taken if changed is None.
+        """
+        self.register_file.set_registers(values, changed, highlighted)
 
     def reset_pc_background(self):
         self.program_counter.set_background_color()
@@ -166,44 +156,39 @@ class EmulatorWidget(QWidget):
 
         self.z_register.set_value(str(value), highlight=False, color="yellow", byte_count=1)
 
-    def set_pc(self, value):
-        """Sets the value of the program counter"""
+    def set_pc(self, value, symbol=None):
+        """Sets the value of the program counter, symbol is shown as tooltip"""
 
         self.program_counter.set_value(str(value), highlight=False, color="yellow")
+        self.program_counter.setToolTip(symbol or "")
 
     def set_storage(self, value):
-        """Sets the value of the storage"""
+        """Sets the value of the storage, unchanged storage is not redrawn"""
+        if value == self.__storage:
+            return
+
+        self.__storage = value
         self.storage.setPlainText(self.__beautify_storage(value))
 
     def set_symbols(self, symboltable: dict):
         """Fills the symboltable with parsed labels and values"""
+        self.symbol_table.model.set_symbols(symboltable)
 
-        num_rows = self.symbol_layout.rowCount()
-        for _ in range(1, num_rows):
-            self.symbol_layout.removeRow(1)
+    def set_symbol_values(self, memory, index: int = None):
+        """Shows the words at the symbol addresses, only those at index if given"""
+        self.symbol_table.model.set_memory(memory, index)
 
-        font = UiStyle.get_font()
-
-        for entry in symboltable:
-            symbol = QLineEdit()
-            symbol.setReadOnly(True)
-            symbol.setMinimumWidth(50)
-            symbol.setSizePolicy(QSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.Preferred))
-            symbol.setText(entry)
-            symbol.setFont(font)
-
-            value = QLineEdit()
-            value.setReadOnly(True)
-            value.setFixedWidth(50)
-            value.setSizePolicy(QSizePolicy(QSizePolicy.Minimum, QSizePolicy.Preferred))
-            value.setFont(font)
-            value.setText(str(symboltable[entry]))
-
-            self.symbol_layout.addRow(value, symbol)
+    def show_memory_address(self, address: int):
+        """Scrolls the storage to the line of address"""
+        self.storage.showLine(address // 4)
 
     def highlight_memory_line(self, line_number: int, color=Qt.yellow):
         self.storage.highlightLine(line_number, color)
 
+    def highlight_accessed_memory_line(self, line_number: int):
+        """Marks the memory line read or written by the last instruction"""
+        self.highlight_memory_line(line_number, Qt.lightGray)
+
     def reset_highlighted_memory_lines(self):
         self.storage.resetHighlightedLines()
 
@@ -215,23 +200,11 @@ class EmulatorWidget(QWidget):
         Inserts two blanks after a byte
         Inserts one blank after a nibble
         """
-        bit_occurences = 0
-        i = 0
-
-        for char in value:
-            i += 1
-
-            if char == "0" or char == "1":
-                bit_occurences += 1
-
-            if not bit_occurences % 32:
-                value = value[:i] + '\n' + value[i:]
-                i += 1
-            elif not bit_occurences % 8:
-                value = value[:i] + '  ' + value[i:]
-                i += 2
-            elif not bit_occurences % 4:
-                value = value[:i] + ' ' + value[i:]
-                i += 1
-
-        return value.strip()
+        lines = []
+
+        for i in range(0, len(value), 32):
+            word = value[i:i + 32]
+            lines.append('  '.join(
+                word[j:j + 4] + ' ' + word[j + 4:j + 8] for j in range(0, len(word), 8)))
+
+        return '\n'.join(lines).strip()
@@ -1,4 +1,4 @@
-from PySide2.QtCore import SIGNAL, QRect
+from PySide2.QtCore import SIGNAL, QEvent, QRect
 from PySide2.QtGui import QColor, Qt, QTextFormat, QPainter, QTextCursor
 from PySide2.QtWidgets import QPlainTextEdit, QTextEdit
 from .line_number_area import *
@@ -8,6 +8,9 @@ class LineNumberEditor(QPlainTextEdit):
     """
     Editor with line numbers
 
+    Font metrics of the line number area are measured once per font,
+    the viewport margins are only set when the width of the area changes.
+
     https://doc.qt.io/qt-5/qtwidgets-widgets-codeeditor-example.html
     """
     def __init__(self, space_left=None):
@@ -22,6 +25,8 @@ class LineNumberEditor(QPlainTextEdit):
             self.space_left = space_left
 
         self.lineNumberArea = LineNumberArea(self)
+        self.lineNumberAreaMargin = None
+        self.updateGutterMetrics()
 
         self.connect(self, SIGNAL('blockCountChanged(int)'), self.updateLineNumberAreaWidth)
         self.connect(self, SIGNAL('updateRequest(QRect,int)'), self.updateLineNumberArea)
@@ -30,22 +35,34 @@ class LineNumberEditor(QPlainTextEdit):
         self.updateLineNumberAreaWidth(0)
 
         self.extraSelections = []
+        self.diagnosticSelections = []
 
     def lineNumberAreaWidth(self):
         """
         The lineNumberAreaWidth() function calculates the width of the LineNumberArea widget.
         We take the number of digits in the last line of the editor and multiply that with the maximum width of a digit.
         """
-        digits = 1
-        count = max(1, self.blockCount())
-        while count >= 10:
-            count /= 10
-            digits += 1
-        space = self.space_left + self.fontMetrics().width('9') * digits
+        digits = len(str(max(1, self.blockCount())))
+        space = self.space_left + self.digitWidth * digits
         return space
 
+    def updateGutterMetrics(self):
+        metrics = self.fontMetrics()
+        self.digitWidth = metrics.width('9')
+        self.lineHeight = metrics.height()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+
+        if event.type() == QEvent.FontChange:
+            self.updateGutterMetrics()
+            self.updateLineNumberAreaWidth(0)
+
     def updateLineNumberAreaWidth(self, _):
-        self.setViewportMargins(self.lineNumberAreaWidth(), 0, 0, 0)
+        margin = self.lineNumberAreaWidth()
+        if margin != self.lineNumberAreaMargin:
+            self.lineNumberAreaMargin = margin
+            self.setViewportMargins(margin, 0, 0, 0)
 
     def updateLineNumberArea(self, rect, dy):
         if dy:
@@ -77,11 +94,11 @@ class LineNumberEditor(QPlainTextEdit):
         top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
         bottom = top + self.blockBoundingRect(block).height()
 
-        height = self.fontMetrics().height()
+        height = self.lineHeight
+        painter.setPen(Qt.black)
         while block.isValid() and (top <= event.rect().bottom()):
             if block.isVisible() and (bottom >= event.rect().top()):
                 number = str(blockNumber + 1)
-                painter.setPen(Qt.black)
                 painter.drawText(0, top, self.lineNumberArea.width(), height,
                                    Qt.AlignRight, number)
 
@@ -90,9 +107,12 @@ class LineNumberEditor(QPlainTextEdit):
             bottom = top + self.blockBoundingRect(block).height()
             blockNumber += 1
 
+    def applyExtraSelections(self):
+        self.setExtraSelections(self.extraSelections + self.diagnosticSelections)
+
     def resetHighlightedLines(self):
         self.extraSelections = []
-        self.setExtraSelections(self.extraSelections)
+        self.applyExtraSelections()
 
     def highlightLine(self, line_number: int, color=Qt.yellow):
         lineColor = QColor(color)
@@ -103,5 +123,5 @@ class LineNumberEditor(QPlainTextEdit):
         selection.cursor = QTextCursor(self.document().findBlockByNumber(line_number))
         selection.cursor.clearSelection()
         self.extraSelections.append(selection)
-        self.setExtraSelections(self.extraSelections)
+        self.applyExtraSelections()
 
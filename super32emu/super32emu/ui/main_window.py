@@ -1,25 +1,32 @@
 """python emulator"""
-import datetime
 import os
 from os.path import dirname, join, normpath
 
 from PySide2.QtCore import Slot
 from PySide2.QtGui import QIcon, Qt, QKeySequence
-from PySide2.QtWidgets import QAction, QFileDialog, QMainWindow
+from PySide2.QtWidgets import QAction, QActionGroup, QFileDialog, QMainWindow
 from super32assembler.assembler.architecture import Architectures
-from super32assembler.assembler.assembler import Assembler
-from super32assembler.generator.generator import Generator
-from super32assembler.preprocessor.preprocessor import Preprocessor
+from super32assembler.assembler.instructionset import InstructionSet
+from super32assembler.generator.generator import Generator, format_of
+from super32assembler.generator.loader import Loader
 from super32utils.inout.fileio import FileIO
 from super32utils.inout.fileio import ResourceManager
 
 from .editor_widget import EditorWidget
 from .emulator_widget import EmulatorDockWidget
+from ..logic.background_assembler import BackgroundAssembler
 from ..logic.emulator import Emulator
 
 
+MACHINE_CODE_FILTER = 'Super32 Machine Code Files (*.m32 *.bin *.hex *.srec)'
+
+
 class MainWindow(QMainWindow):
-    """This is the main window that holds the menu, the toolbar and the main widget"""
+    """This is the main window that holds the menu, the toolbar and the main widget
+
+    The emulator and its dock panel are created on first use, or by
+    create_panels once the first frame of the window is shown.
+    """
 
     def __init__(self):
         QMainWindow.__init__(self)
@@ -42,10 +49,32 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.editor_widget)
         self.addDockWidget(Qt.RightDockWidgetArea, self.emulator_dock_widget)
 
-        self.emulator = Emulator(
-            self.editor_widget,
-            self.emulator_dock_widget.emulator
+        self.__emulator = None
+
+        instructionset = InstructionSet.load(self.path_to_instructionset)
+        self.background_assembler = BackgroundAssembler(
+            instructionset.commands,
+            instructionset.registers
         )
+        self.editor_widget.diagnostics_changed.connect(self.__on_diagnostics)
+        self.editor_widget.set_background_assembler(self.background_assembler)
+
+    @property
+    def emulator(self):
+        """The emulator, created together with the emulator panel"""
+        if self.__emulator is None:
+            self.__emulator = Emulator(
+                self.editor_widget,
+                self.emulator_dock_widget.emulator
+            )
+            self.emulator_dock_widget.emulator.symbol_table.symbol_activated.connect(
+                self.__on_symbol_activated)
+
+        return self.__emulator
+
+    def create_panels(self):
+        """Builds the deferred panels"""
+        return self.emulator
 
     def __create_menu(self):
         menu_bar = self.menuBar()
@@ -60,6 +89,7 @@ class MainWindow(QMainWindow):
         save_action.setShortcut(QKeySequence.Save)
         saveas_action = QAction(self.tr("Save As..."), self)
         saveas_action.setShortcut(QKeySequence.SaveAs)
+        load_action = QAction(self.tr("Load Machine Code..."), self)
         quit_action = QAction(self.tr("Quit"), self)
         quit_action.setShortcut(QKeySequence.Quit)
 
@@ -67,6 +97,7 @@ class MainWindow(QMainWindow):
         file_menu.addAction(open_action)
         file_menu.addAction(save_action)
         file_menu.addAction(saveas_action)
+        file_menu.addAction(load_action)
         file_menu.addAction(quit_action)
 
         # edit menu
@@ -74,6 +105,17 @@ class MainWindow(QMainWindow):
         edit_menu.addAction(self.tr("Copy"))
         edit_menu.addAction(self.tr("Paste"))
 
+        # architecture menu
+        architecture_menu = menu_bar.addMenu(self.tr("Architecture"))
+        architecture_group = QActionGroup(self)
+        single_action = QAction(self.tr("Single Memory"), self)
+        multi_action = QAction(self.tr("Separate Instruction and Data Memories"), self)
+        for action in (single_action, multi_action):
+            action.setCheckable(True)
+            architecture_group.addAction(action)
+            architecture_menu.addAction(action)
+        single_action.setChecked(True)
+
         # help menu
         help_menu = menu_bar.addMenu(self.tr("Help"))
         help_menu.addAction(self.tr("Info"))
@@ -83,7 +125,10 @@ class MainWindow(QMainWindow):
         open_action.triggered.connect(self.__open)
         save_action.triggered.connect(self.__save)
         saveas_action.triggered.connect(self.__saveas)
+        load_action.triggered.connect(self.__load)
         quit_action.triggered.connect(self.__quit)
+        single_action.triggered.connect(lambda: self.__set_architecture(Architectures.SINGLE))
+        multi_action.triggered.connect(lambda: self.__set_architecture(Architectures.MULTI))
 
     def __create_toolbar(self):
         tb_new = QAction(QIcon(os.path.join(self.resources_dir, "file.png")), self.tr("New"), self)
@@ -182,89 +227,93 @@ class MainWindow(QMainWindow):
             self.editor_widget.set_current_tab_file_path(path)
 
     @Slot()
-    def __mcode(self):
-        cfg = FileIO.read_json(self.path_to_instructionset)
-
-        input_file = self.editor_widget.get_text()
-
-        preprocessor = Preprocessor()
-        assembler = Assembler(Architectures.SINGLE)
-        generator = Generator('lines')
-
-        code_address, code, zeros_constants, symboltable, _ = preprocessor.parse(
-            input_file=input_file
+    def __load(self):
+        """Opens a file dialog to load machine code into the emulator"""
+        (path, selected_filter) = QFileDialog.getOpenFileName(
+            self,
+            self.tr('Load Machine Code'),
+            self.start_path,
+            self.tr(MACHINE_CODE_FILTER)
         )
+        if path:
+            self.emulator.load(Loader(format_of(path)).read(path))
+            self.__debug()
 
-        machine_code = assembler.parse(
-            code_address=code_address,
-            code=code,
-            zeros_constants=zeros_constants,
-            commands=cfg['commands'],
-            registers=cfg['registers'],
-            symboltable=symboltable
-        )
+    @Slot()
+    def __set_architecture(self, architecture):
+        if self.emulator.emulation_running:
+            self.__stop()
+        self.emulator.set_architecture(architecture)
+
+    @Slot()
+    def __mcode(self):
+        images = self.__memory_images()
 
         (path, selected_filter) = QFileDialog.getSaveFileName(self,
                                                               'Save Machine Code File',
                                                               '.',
-                                                              'Super32 Machine Code Files (*.m32)')
+                                                              MACHINE_CODE_FILTER)
         if path:
-            generator.write(path, machine_code)
+            for image_path, machine_code in self.__memory_files(path, images):
+                Generator(format_of(path)).write(image_path, machine_code)
 
     @Slot()
     def __vhdl(self):
-        cfg = FileIO.read_json(self.path_to_instructionset)
-
-        input_file = self.editor_widget.get_text()
         source_file = self.editor_widget.get_file_path()
 
-        if source_file is None:
-            source_file = "unsaved source"
-
-        preprocessor = Preprocessor()
-        assembler = Assembler(Architectures.SINGLE)
-        generator = Generator('stream')
-
-        code_address, code, zeros_constants, symboltable, _ = preprocessor.parse(
-            input_file=input_file
-        )
-        with ResourceManager(os.path.join(self.resources_dir, 'template.vhdl'), 'r') as file:
-            template = file.read()
-
-        template = template.replace('{{source}}', source_file)
-        template = template.replace('{{date}}', datetime.datetime.now().isoformat())
-
-        spacer = "".join("#" for i in range(len(source_file)))
-        template = template.replace('{{spacer}}', spacer)
-
-        machine_code = assembler.parse(
-            code_address=code_address,
-            code=code,
-            zeros_constants=zeros_constants,
-            commands=cfg['commands'],
-            registers=cfg['registers'],
-            symboltable=symboltable
-        )
-
-        mem = ''
-        mc_length = len(machine_code)
-        for i in range(0, mc_length):
-            mem += '\t\t\t%d => \"%s\"' % (i, machine_code[i])
-            if i < mc_length - 1:
-                mem += ',\n'
-
-        template = template.replace('{{mem_size}}', str(mc_length - 1))
-        template = template.replace('{{memory}}', mem)
+        images = self.__memory_images()
 
         (path, selected_filter) = QFileDialog.getSaveFileName(self,
                                                               'Save VHDL File',
                                                               '.',
                                                               'VHDL Files (*.vhdl)')
-        name = os.path.basename(path).replace(".vhdl", "")
-        template = template.replace('{{name}}', name)
-
         if path:
-            generator.write(path, template)
+            for image_path, machine_code in self.__memory_files(path, images):
+                Generator('vhdl', source=source_file).write(image_path, machine_code)
+
+    def __memory_images(self):
+        """machine code of the editor, followed by the data memory of the multi architecture"""
+        _, machine_code, _, _ = self.emulator.assemble()
+        data_memory = self.emulator.session.data_memory()
+        return [machine_code] if data_memory is None else [machine_code, data_memory]
+
+    @staticmethod
+    def __memory_files(path, images):
+        """separate memories are written next to path like the command line assembler does"""
+        if len(images) == 1:
+            return [(path, images[0])]
+
+        name, ending = os.path.splitext(path)
+        return [
+            ("{name}_instructions{ending}".format(name=name, ending=ending), images[0]),
+            ("{name}_memory{ending}".format(name=name, ending=ending), images[1]),
+        ]
+
+    @Slot()
+    def __on_diagnostics(self, report):
+        """Shows the result of the background assembly"""
+        if not self.emulator.emulation_running:
+            self.emulator_dock_widget.emulator.set_symbols(report.symboltable or {})
+
+        if not report.diagnostics:
+            self.statusBar().showMessage(
+                self.tr("Code size: {size} bytes").format(size=report.code_size))
+        elif report.diagnostics[0].line is None:
+            self.statusBar().showMessage(report.diagnostics[0].message)
+        else:
+            self.statusBar().showMessage(
+                self.tr("{count} error(s), first in line {line}: {message}").format(
+                    count=len(report.diagnostics),
+                    line=report.diagnostics[0].line + 1,
+                    message=report.diagnostics[0].message))
+
+    @Slot()
+    def __on_symbol_activated(self, label, address):
+        """Shows the line defining label and the memory at its address"""
+        line_number = self.editor_widget.find_label(label)
+        if line_number is not None:
+            self.editor_widget.go_to_line(line_number)
+        self.emulator_dock_widget.emulator.show_memory_address(address)
 
     @Slot()
     def __quit(self):
@@ -1,3 +1,4 @@
+from PySide2.QtCore import SIGNAL
 from PySide2.QtGui import QTextOption
 
 from .code_editor import *
@@ -26,8 +27,7 @@ class MemoryWidget(LineNumberEditor):
         # TODO Multiplying by the actual line character count (42)
         #   results in a horizontal scrollbar when a vertical scrollbar is present.
         #   Workaround by multiplying with a "magical number" (48).
-        metrics = QFontMetrics(UiStyle.get_font())
-        text_width = metrics.width('0') * (42 + 6)
+        text_width = UiStyle.character_width() * (42 + 6)
         self.setFixedWidth(text_width)
 
         self.connect(self.verticalScrollBar(), SIGNAL('sliderMoved(int)'), self.storeScrollBarValue)
@@ -35,6 +35,12 @@ class MemoryWidget(LineNumberEditor):
     def storeScrollBarValue(self, value: int):
         self.scrollBarValue = value
 
+    def showLine(self, line_number: int):
+        """Scrolls line_number to the center and keeps it there on updates"""
+        self.setTextCursor(QTextCursor(self.document().findBlockByNumber(line_number)))
+        self.centerCursor()
+        self.scrollBarValue = self.verticalScrollBar().value()
+
     def setPlainText(self, text: str):
         super(MemoryWidget, self).setPlainText(text)
 
@@ -54,12 +60,12 @@ class MemoryWidget(LineNumberEditor):
         top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
         bottom = top + self.blockBoundingRect(block).height()
 
-        height = self.fontMetrics().height()
+        height = self.lineHeight
+        painter.setPen(Qt.black)
+        painter.setFont(self.font())
         while block.isValid() and (top <= event.rect().bottom()):
             if block.isVisible() and (bottom >= event.rect().top()):
                 number = hex(blockNumber)[2:].upper()
-                painter.setPen(Qt.black)
-                painter.setFont(UiStyle.get_font())
                 painter.drawText(0, top, self.lineNumberArea.width(), height,
                                  Qt.AlignRight, number)
 
@@ -0,0 +1,138 @@
+"""python emulator"""
+from PySide2.QtCore import QRect, QSize, Qt
+from PySide2.QtGui import QFontMetrics, QPainter
+from PySide2.QtWidgets import QMenu, QSizePolicy, QWidget
+
+from .ui_style import UiStyle
+
+# text of a 32bit register value in every display mode
+DISPLAY_MODES = {
+    'hex': lambda value: "{:08X}".format(value),
+    'decimal': str,
+    'signed': lambda value: str(value - 0x100000000 if value & 0x80000000 else value),
+}
+
+
+class RegisterFileWidget(QWidget):
+    """Register file painted as one grid
+
+    set_registers takes the register values and bitmasks of the changed
+    and the highlighted registers, bit i standing for register i.
+    Only cells whose value or highlight changed are repainted.
+    """
+
+    COLUMNS = 4
+    SPACING = 6
+    LABEL_CHARACTERS = 4  # 'R31 '
+    VALUE_CHARACTERS = 12  # '-2147483648' and a margin
+
+    def __init__(self, count=32):
+        QWidget.__init__(self)
+
+        self.setFont(UiStyle.get_font())
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+
+        self.__mode = 'hex'
+        self.__values = [0] * count
+        self.__texts = [DISPLAY_MODES[self.__mode](0)] * count
+        self.__labels = ['R' + str(i) for i in range(count)]
+        self.__highlighted = 0
+
+        character_width = UiStyle.character_width()
+        label_width = character_width * self.LABEL_CHARACTERS
+        value_width = character_width * self.VALUE_CHARACTERS
+        height = QFontMetrics(self.font()).height() + self.SPACING
+
+        self.__cells = []
+        self.__label_rects = []
+        self.__value_rects = []
+        for i in range(count):
+            x = (i % self.COLUMNS) * (label_width + value_width + self.SPACING)
+            y = (i // self.COLUMNS) * (height + self.SPACING)
+            self.__cells.append(QRect(x, y, label_width + value_width, height))
+            self.__label_rects.append(QRect(x, y, label_width, height))
+            self.__value_rects.append(QRect(x + label_width, y, value_width, height))
+
+        rows = (count + self.COLUMNS - 1) // self.COLUMNS
+        self.__size = QSize(
+            self.COLUMNS * (label_width + value_width + self.SPACING) - self.SPACING,
+            rows * (height + self.SPACING) - self.SPACING)
+
+    def sizeHint(self):
+        return self.__size
+
+    def minimumSizeHint(self):
+        return self.__size
+
+    def get_value(self, index: int) -> int:
+        return self.__values[index]
+
+    def set_registers(self, values, changed: int = None, highlighted: int = 0):
+        """Takes the values of the registers set in changed, all if it is None"""
+        if changed is None:
+            changed = (1 << len(self.__values)) - 1
+
+        repaint = changed | (highlighted ^ self.__highlighted)
+        self.__highlighted = highlighted
+
+        text = DISPLAY_MODES[self.__mode]
+        for i in self.__indices(changed):
+            self.__values[i] = values[i]
+            self.__texts[i] = text(values[i])
+
+        for i in self.__indices(repaint):
+            self.update(self.__cells[i])
+
+    def display_mode(self) -> str:
+        return self.__mode
+
+    def set_display_mode(self, mode: str):
+        """Shows all values as 'hex', unsigned 'decimal' or 'signed' decimal"""
+        if mode not in DISPLAY_MODES:
+            raise Exception('Unknown display mode: ' + str(mode))
+
+        self.__mode = mode
+        self.__texts = [DISPLAY_MODES[mode](value) for value in self.__values]
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        area = event.rect()
+        text_color = self.palette().windowText().color()
+
+        for i, cell in enumerate(self.__cells):
+            if not cell.intersects(area):
+                continue
+
+            value_rect = self.__value_rects[i]
+            painter.setPen(text_color)
+            painter.drawText(
+                self.__label_rects[i], Qt.AlignLeft | Qt.AlignVCenter, self.__labels[i])
+
+            background = Qt.lightGray if self.__highlighted >> i & 1 else Qt.white
+            painter.fillRect(value_rect, background)
+            painter.setPen(Qt.gray)
+            painter.drawRect(value_rect.adjusted(0, 0, -1, -1))
+            painter.setPen(Qt.black)
+            painter.drawText(
+                value_rect.adjusted(0, 0, -4, 0), Qt.AlignRight | Qt.AlignVCenter, self.__texts[i])
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        for mode, title in (('hex', self.tr("Hexadecimal")),
+                            ('decimal', self.tr("Decimal")),
+                            ('signed', self.tr("Signed Decimal"))):
+            action = menu.addAction(title)
+            action.setCheckable(True)
+            action.setChecked(mode == self.__mode)
+            action.triggered.connect(lambda checked=False, mode=mode: self.set_display_mode(mode))
+
+        menu.exec_(event.globalPos())
+
+    @staticmethod
+    def __indices(mask: int):
+        """Indices of the set bits of mask"""
+        while mask:
+            bit = mask & -mask
+            yield bit.bit_length() - 1
+            mask ^= bit
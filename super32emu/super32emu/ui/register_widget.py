@@ -1,5 +1,5 @@
 """python emulator"""
-from PySide2.QtGui import QFontMetrics, Qt
+from PySide2.QtGui import Qt
 from PySide2.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QWidget
 
 from .ui_style import UiStyle
@@ -24,14 +24,17 @@ class RegisterWidget(QWidget):
         # TODO Multiplying by the actual line character count (8)
         #  does not set the width to allow for 8 characters.
         #  Workaround by multiplying with a "magical number" (9)
-        metrics = QFontMetrics(self.text_input.font())
-        text_width = metrics.width('0') * (8 + 1)
+        text_width = UiStyle.character_width() * (8 + 1)
         self.text_input.setFixedWidth(text_width)
 
         self.__fixed = fixed_value
         if fixed_value is not None:
             self.text_input.setReadOnly(True)
-        
+
+        # white comes from the stylesheet of the parent, see REGISTER_STYLE
+        self.__color = "white"
+        self.set_value('0', highlight=False, byte_count=len(mask))
+
         layout = QHBoxLayout()
         layout.addWidget(self.label)
         layout.addWidget(self.text_input)
@@ -45,7 +48,14 @@ class RegisterWidget(QWidget):
         self.label.setText(text)
 
     def set_background_color(self, color: str = "white"):
-        self.text_input.setStyleSheet("background-color: " + color)
+        if color == self.__color:
+            return
+
+        self.__color = color
+        if color == "white":
+            self.text_input.setStyleSheet("")
+        else:
+            self.text_input.setStyleSheet("background-color: " + color)
 
     def set_value(self, value: str, highlight: bool = True, color: str = "lightGray", byte_count: int = 8):
         """Set the value of the register"""
@@ -0,0 +1,119 @@
+"""python emulator"""
+from PySide2.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+# role of the raw label, address or value used for sorting
+SORT_ROLE = Qt.UserRole
+
+
+class SymbolTableModel(QAbstractTableModel):
+    """Labels of the symboltable with their address and the word stored there
+
+    set_symbols only resets the model if labels were added or removed,
+    moved labels are reported as changed rows. Values are read from the
+    memory given to set_memory whenever a view asks for them.
+    """
+
+    SYMBOL, ADDRESS, VALUE = range(3)
+    HEADERS = ("Symbol", "Address", "Value")
+
+    def __init__(self, parent=None):
+        QAbstractTableModel.__init__(self, parent)
+
+        self.__labels = []
+        self.__addresses = []
+        self.__rows = {}  # label -> row
+        self.__word_rows = {}  # word index -> rows
+        self.__memory = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.__labels)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.tr(self.HEADERS[section])
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row, column = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            if column == self.SYMBOL:
+                return self.__labels[row]
+            if column == self.ADDRESS:
+                return "{:08X}".format(self.__addresses[row])
+            value = self.value(row)
+            return "-" if value is None else "{:08X}".format(value)
+        if role == SORT_ROLE:
+            if column == self.SYMBOL:
+                return self.__labels[row]
+            if column == self.ADDRESS:
+                return self.__addresses[row]
+            value = self.value(row)
+            return -1 if value is None else value
+        if role == Qt.TextAlignmentRole and column != self.SYMBOL:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def symbol(self, row: int):
+        """label and address of row"""
+        return self.__labels[row], self.__addresses[row]
+
+    def value(self, row: int):
+        """word at the address of row, None without memory or outside of it"""
+        if self.__memory is None:
+            return None
+
+        index = self.__addresses[row] // 4
+        return self.__memory[index] if index < len(self.__memory) else None
+
+    def set_symbols(self, symboltable: dict):
+        """Shows the labels of symboltable, ordered by address"""
+        if set(symboltable) != set(self.__rows):
+            self.beginResetModel()
+            self.__labels = sorted(symboltable, key=lambda label: (symboltable[label], label))
+            self.__addresses = [symboltable[label] for label in self.__labels]
+            self.__rows = {label: row for row, label in enumerate(self.__labels)}
+            self.__index_words()
+            self.endResetModel()
+            return
+
+        changed = [
+            self.__rows[label] for label, address in symboltable.items()
+            if self.__addresses[self.__rows[label]] != address
+        ]
+        for row in changed:
+            self.__addresses[row] = symboltable[self.__labels[row]]
+        if changed:
+            self.__index_words()
+            self.dataChanged.emit(
+                self.index(min(changed), self.ADDRESS), self.index(max(changed), self.VALUE))
+
+    def set_memory(self, memory, index: int = None):
+        """Reads values from memory, a MachineImage or None.
+
+        Only the rows at the word index are updated if it is given and
+        the memory did not change.
+        """
+        if not self.__labels:
+            self.__memory = memory
+            return
+
+        rows = range(len(self.__labels))
+        if index is not None and memory is self.__memory:
+            rows = self.__word_rows.get(index)
+            if rows is None:
+                return
+
+        self.__memory = memory
+        self.dataChanged.emit(
+            self.index(min(rows), self.VALUE), self.index(max(rows), self.VALUE))
+
+    def __index_words(self):
+        self.__word_rows = {}
+        for row, address in enumerate(self.__addresses):
+            self.__word_rows.setdefault(address // 4, []).append(row)
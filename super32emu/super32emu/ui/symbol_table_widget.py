@@ -0,0 +1,58 @@
+"""python emulator"""
+from PySide2.QtCore import QSortFilterProxyModel, Qt, Signal, Slot
+from PySide2.QtWidgets import QAbstractItemView, QHeaderView, QLineEdit, QTableView, QVBoxLayout, \
+    QWidget
+
+from .symbol_table_model import SORT_ROLE, SymbolTableModel
+from .ui_style import UiStyle
+
+
+class SymbolTableWidget(QWidget):
+    """Sortable symbol table with a filter for the labels
+
+    Clicking a row emits symbol_activated with its label and address.
+    """
+
+    symbol_activated = Signal(str, int)  # label, address
+
+    def __init__(self):
+        QWidget.__init__(self)
+
+        self.model = SymbolTableModel(self)
+
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(SORT_ROLE)
+        self.proxy.setFilterKeyColumn(SymbolTableModel.SYMBOL)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+        self.filter = QLineEdit()
+        self.filter.setPlaceholderText(self.tr("Filter"))
+        self.filter.setClearButtonEnabled(True)
+        self.filter.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        self.view.setFont(UiStyle.get_font())
+        self.view.setSortingEnabled(True)
+        self.view.sortByColumn(SymbolTableModel.ADDRESS, Qt.AscendingOrder)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.view.verticalHeader().hide()
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.view.horizontalHeader().setSectionResizeMode(
+            SymbolTableModel.SYMBOL, QHeaderView.Stretch)
+        self.view.clicked.connect(self.__on_clicked)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.filter)
+        layout.addWidget(self.view)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.setLayout(layout)
+
+    @Slot()
+    def __on_clicked(self, index):
+        label, address = self.model.symbol(self.proxy.mapToSource(index).row())
+        self.symbol_activated.emit(label, address)
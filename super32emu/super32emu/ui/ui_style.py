@@ -1,16 +1,31 @@
-from PySide2.QtGui import QFont, QFontDatabase
+from PySide2.QtGui import QFont, QFontDatabase, QFontMetrics
 
 
 class UiStyle:
+    """ Fonts and metrics are created once and shared by all widgets """
+
+    __fonts = {}
+    __character_widths = {}
 
     @staticmethod
     def get_font(point_size: int = 10) -> QFont:
         """ Returns fixed font that the system recommends with medium weight """
-        fixed_font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
-        fixed_font.setPointSize(point_size)
-        fixed_font.setWeight(QFont.Bold)
+        if point_size not in UiStyle.__fonts:
+            fixed_font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+            fixed_font.setPointSize(point_size)
+            fixed_font.setWeight(QFont.Bold)
+            UiStyle.__fonts[point_size] = fixed_font
+
+        return QFont(UiStyle.__fonts[point_size])
+
+    @staticmethod
+    def character_width(point_size: int = 10) -> int:
+        """ Returns the width of one character of the fixed font """
+        if point_size not in UiStyle.__character_widths:
+            metrics = QFontMetrics(UiStyle.get_font(point_size))
+            UiStyle.__character_widths[point_size] = metrics.width('0')
 
-        return fixed_font
+        return UiStyle.__character_widths[point_size]
 
     @staticmethod
     def set_font_weight(font):
@@ -7,6 +7,15 @@ reads assembler code and returns a python dictionary
 read_json(path)
 reads json files and returns a python dictionary
 
+read_bytes(path)
+reads a binary file and returns its content
+
 write(path, content)
 write content to file
+
+write_bytes(path, content)
+write binary content to file, atomically
+
+open_atomic(path)
+buffered binary file handle, replaces path once closed
 """
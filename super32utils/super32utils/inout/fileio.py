@@ -2,6 +2,8 @@
 
 import logging
 import json
+import os
+from contextlib import contextmanager
 from super32utils.manager.resource_manager import ResourceManager
 
 
@@ -20,11 +22,12 @@ class FileIO:
 
     @staticmethod
     def read_code(path):
-        """ read assembler code. return python list. each element equals one line of code """
+        """ read assembler code. return python list. each element equals one line of code.
+        code is converted to upper case, "quoted" strings like file names are kept """
         code = []
         with ResourceManager(path, "r") as file:
             code = file.read().splitlines()
-            code = [str.upper(line) for line in code]
+            code = [FileIO.__upper(line) for line in code]
             logging.debug(
                 "code file loaded: {filename}".format(filename=file.name))
         return code
@@ -40,6 +43,15 @@ class FileIO:
                 "text file loaded: {filename}".format(filename=file.name))
         return string
 
+    @staticmethod
+    def read_bytes(path):
+        """ read binary file """
+
+        content = b""
+        with ResourceManager(path, "rb") as file:
+            content = file.read()
+        return content
+
     @staticmethod
     def write(path, content):
         """ write content to file """
@@ -47,3 +59,36 @@ class FileIO:
         with ResourceManager(path, "w") as file:
             file.write(content)
             logging.debug("wrote file: {filename}".format(filename=file.name))
+
+    @staticmethod
+    def write_bytes(path, content):
+        """ write binary content to file, atomically """
+
+        with FileIO.open_atomic(path) as file:
+            file.write(content)
+
+    @staticmethod
+    @contextmanager
+    def open_atomic(path, buffering=2**16):
+        """ buffered binary file handle for writing path.
+        content goes to a temporary file next to path, which replaces path
+        once the block completes. readers never see half written files """
+
+        temp_path = "{path}.{id}.tmp".format(path=path, id=os.urandom(6).hex())
+        try:
+            with open(temp_path, "xb", buffering=buffering) as file:
+                yield file
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        logging.debug("wrote file: {filename}".format(filename=path))
+
+    @staticmethod
+    def __upper(line):
+        parts = line.split('"')
+        parts[::2] = [part.upper() for part in parts[::2]]
+        return '"'.join(parts)
@@ -2,8 +2,6 @@
 
 import os
 import logging
-from pathlib import Path
-from dotenv import load_dotenv
 
 
 APP_ROOT = os.path.abspath('.')
@@ -16,6 +14,9 @@ class Settings:
     def load():
         """ load global settings.env file """
 
-        env_path = Path(APP_ROOT) / 'settings.env'
-        load_dotenv(dotenv_path=env_path, verbose=True)
+        env_path = os.path.join(APP_ROOT, 'settings.env')
+        if os.path.isfile(env_path):
+            # python-dotenv is only imported if there are settings to load
+            from dotenv import load_dotenv
+            load_dotenv(dotenv_path=env_path, verbose=True)
         logging.basicConfig(level=os.getenv('LOGLEVEL'))